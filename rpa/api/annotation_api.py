@@ -20,7 +20,7 @@ from rpa.delegate_mngr import DelegateMngr
 from rpa.session_state.annotations import \
     StrokePoint, Stroke, Text, Annotation
 from rpa.session_state.utils import Color, Point
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 
 class AnnotationApi(QtCore.QObject):
@@ -199,6 +199,21 @@ class AnnotationApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_ro_annotations, [clip_id, frame])
 
+    def get_ro_annotations_many(
+        self, ids:List[Tuple[str, int]])-> List[List[Annotation]]:
+        """
+        Retrieves the lists of read-only annotations for the given clips and
+        frames in a single batch. Permission delegates of get_ro_annotations
+        are evaluated once for the whole batch.
+
+        Args:
+            ids (list) : List of tuples containing clip id and clip frame.
+
+        Returns:
+            (list) : Read-only Annotations for each of the given ids.
+        """
+        return self.__delegate_mngr.call_many(self.get_ro_annotations, ids)
+
     def delete_ro_annotations(self, clips:list)->bool:
         """
         This method deletes the read-only annotations from given clips.
@@ -226,6 +241,22 @@ class AnnotationApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_ro_frames, [clip_id])
 
+    def get_ro_frames_many(self, clip_ids:List[str])->List[List[int]]:
+        """
+        Retrieves the frames that contain read-only annotations for each of
+        the given clips in a single batch. Permission delegates of
+        get_ro_frames are evaluated once for the whole batch.
+
+        Args:
+            clip_ids (list): Ids of clips.
+
+        Returns:
+            list[list[int]] :
+                Frame numbers with read-only annotations for each clip.
+        """
+        return self.__delegate_mngr.call_many(
+            self.get_ro_frames, [[clip_id] for clip_id in clip_ids])
+
     def get_ro_note_frames(self, clip_id:str)->List[int]:
         """
         Retrieves the frames that contain read-only annotations with notes within
@@ -272,6 +303,44 @@ class AnnotationApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.set_rw_annotations, [annotations])
 
+    def set_rw_transform_preview(
+        self, clip_id:str, frame:int, matrix:List[List[float]],
+        width_scale:float=1.0)->bool:
+        """
+        Previews the read-write strokes of the specified clip and frame
+        with the given transform applied to them, without changing the
+        read-write annotation itself. Meant to be called while the strokes
+        are being dragged, followed by a single set_rw_annotations call
+        with the transformed annotation once the drag is done.
+
+        Here is an example of a matrix that previews the strokes moved by
+        0.1 to the right,
+
+        .. code-block:: python
+
+            [
+                [1.0, 0.0, 0.1],
+                [0.0, 1.0, 0.0],
+                [0.0, 0.0, 1.0]
+            ]
+
+        Args:
+            clip_id (str): Id of a clip.
+            frame (int): Frame number.
+            matrix (List[List[float]]):
+                3x3 affine matrix in itview coordinates that is applied
+                to the points of the strokes. None ends the preview and
+                shows the read-write annotation again.
+
+        Kwargs:
+            width_scale (float): Scale applied to the width of the strokes.
+
+        Returns:
+            (bool) : True if success False otherwise
+        """
+        return self.__delegate_mngr.call(
+            self.set_rw_transform_preview, [clip_id, frame, matrix, width_scale])
+
     def get_rw_annotation(self, clip_id:str, frame:int)-> Annotation:
         """
         Retrieves the read-write annotations for a specified clip and frame.
@@ -286,6 +355,21 @@ class AnnotationApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_rw_annotation, [clip_id, frame])
 
+    def get_rw_annotation_many(
+        self, ids:List[Tuple[str, int]])-> List[Annotation]:
+        """
+        Retrieves the read-write annotations for the given clips and frames
+        in a single batch. Permission delegates of get_rw_annotation are
+        evaluated once for the whole batch.
+
+        Args:
+            ids (list) : List of tuples containing clip id and clip frame.
+
+        Returns:
+            (list) : RPA Annotation (or None) for each of the given ids.
+        """
+        return self.__delegate_mngr.call_many(self.get_rw_annotation, ids)
+
     def delete_rw_annotation(self, clip_id:str, frame:int)->bool:
         """
         This method deletes the read-write annotation from a specified clip and frame.
@@ -314,6 +398,22 @@ class AnnotationApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_rw_frames, [clip_id])
 
+    def get_rw_frames_many(self, clip_ids:List[str])->List[List[int]]:
+        """
+        Retrieves the frames that contain read-write annotations for each of
+        the given clips in a single batch. Permission delegates of
+        get_rw_frames are evaluated once for the whole batch.
+
+        Args:
+            clip_ids (list): Ids of clips.
+
+        Returns:
+            list[list[int]] :
+                Frame numbers with read-write annotations for each clip.
+        """
+        return self.__delegate_mngr.call_many(
+            self.get_rw_frames, [[clip_id] for clip_id in clip_ids])
+
     def clear_frame(self, clip_id:str, frame:int)-> bool:
         """
         This method clears all annotations in a specified clip and frame.
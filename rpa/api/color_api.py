@@ -441,6 +441,20 @@ class ColorApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.is_modified, [clip_id, cc_id])
 
+    def is_modified_many(self, ids:List[Tuple[str, str]]) -> List[bool]:
+        """
+        Checks whether the color corrections with the given ids are modified
+        in a single batch. Permission delegates of is_modified are evaluated
+        once for the whole batch.
+
+        Args:
+            ids (list): List of tuples containing clip id and cc id.
+
+        Returns:
+            List[bool]: Modified state of each of the given color corrections.
+        """
+        return self.__delegate_mngr.call_many(self.is_modified, ids)
+
     def set_name(self, clip_id:str, cc_id:str, name:str) -> bool:
         """
         Update the name of the color correction setting.
@@ -712,6 +726,21 @@ class ColorApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_rw_frames, [clip_id])
 
+    def get_rw_frames_many(self, clip_ids:List[str]) -> List[List[int]]:
+        """
+        Retrieves the frames that contain read-write color corrections for
+        each of the given clips in a single batch. Permission delegates of
+        get_rw_frames are evaluated once for the whole batch.
+
+        Args:
+            clip_ids (list): Ids of the clips.
+
+        Returns:
+            List[List[int]]: list of frame numbers for each clip
+        """
+        return self.__delegate_mngr.call_many(
+            self.get_rw_frames, [[clip_id] for clip_id in clip_ids])
+
     def get_ro_frames(self, clip_id:str) -> List[int]:
         """
         Retrieves the frames that contain read-only color corrections within
@@ -725,6 +754,21 @@ class ColorApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_ro_frames, [clip_id])
 
+    def get_ro_frames_many(self, clip_ids:List[str]) -> List[List[int]]:
+        """
+        Retrieves the frames that contain read-only color corrections for
+        each of the given clips in a single batch. Permission delegates of
+        get_ro_frames are evaluated once for the whole batch.
+
+        Args:
+            clip_ids (list): Ids of the clips.
+
+        Returns:
+            List[List[int]]: list of frame numbers for each clip
+        """
+        return self.__delegate_mngr.call_many(
+            self.get_ro_frames, [[clip_id] for clip_id in clip_ids])
+
     def set_ro_ccs(self, ccs:dict) -> bool:
         """
         Removes all existing read only color corrections in the given clips and
@@ -773,6 +817,23 @@ class ColorApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_ro_ccs, [clip_id, frame])
 
+    def get_ro_ccs_many(
+        self, ids:List[Tuple[str, Optional[int]]])->List[List[ColorCorrection]]:
+        """
+        Get the lists of read-only color-corrections of the given clips and
+        frames in a single batch. Permission delegates of get_ro_ccs are
+        evaluated once for the whole batch.
+
+        Args:
+            ids (list):
+                List of tuples containing clip id and frame. If frame is
+                None, the clip level ccs are returned for that clip.
+
+        Returns:
+            List[List[RPA ColorCorrection]]: Color corrections for each id.
+        """
+        return self.__delegate_mngr.call_many(self.get_ro_ccs, ids)
+
     def set_rw_ccs(self, ccs:dict) -> bool:
         """
         Removes all existing read write color corrections in the given clips
@@ -821,6 +882,23 @@ class ColorApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_rw_ccs, [clip_id, frame])
 
+    def get_rw_ccs_many(
+        self, ids:List[Tuple[str, Optional[int]]])->List[List[ColorCorrection]]:
+        """
+        Get the lists of read-write color-corrections of the given clips and
+        frames in a single batch. Permission delegates of get_rw_ccs are
+        evaluated once for the whole batch.
+
+        Args:
+            ids (list):
+                List of tuples containing clip id and frame. If frame is
+                None, the clip level ccs are returned for that clip.
+
+        Returns:
+            List[List[RPA ColorCorrection]]: Color corrections for each id.
+        """
+        return self.__delegate_mngr.call_many(self.get_rw_ccs, ids)
+
     def delete_ro_ccs(self, clips) -> bool:
         """
         Deletes all existing read only color corrections in the given clips.
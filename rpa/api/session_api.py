@@ -12,7 +12,7 @@ try:
     from PySide2 import QtCore
 except ImportError:
     from PySide6 import QtCore
-from typing import List, Optional, Tuple, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from rpa.delegate_mngr import DelegateMngr
 import uuid
 
@@ -725,6 +725,21 @@ class SessionApi(QtCore.QObject):
         return self.__delegate_mngr.call(
             self.get_custom_clip_attr, [clip_id, attr_id])
 
+    def get_custom_clip_attr_many(self, ids:List[Tuple[str, str]])->List[Any]:
+        """
+        Get the values of the custom attributes of the clips whose
+        respective ids are given, in a single batch. Permission delegates of
+        get_custom_clip_attr are evaluated once for the whole batch.
+
+        Args:
+            ids (List[Tuple[str, str]]):
+                List of tuples containing clip id and custom attr id.
+
+        Returns:
+            List[Any]: Values of the custom attributes in the order of given ids
+        """
+        return self.__delegate_mngr.call_many(self.get_custom_clip_attr, ids)
+
     def get_custom_clip_attr_ids(self, clip_id)->List[str]:
         """
         Get custom attribute ids that are associated with the clip of the
@@ -739,6 +754,89 @@ class SessionApi(QtCore.QObject):
         return self.__delegate_mngr.call(
             self.get_custom_clip_attr_ids, [clip_id])
 
+    def get_clips_snapshot(
+        self, clip_ids:List[str], attr_ids:Optional[List[str]]=None)->Dict:
+        """
+        Get a snapshot of the clips of the given ids, which can be used to
+        recreate them with restore_clips_snapshot. The snapshot is made of
+        the read-write attrs, the media_path attr, the custom attrs, the
+        annotations and the color corrections of each clip, all captured in
+        a single call. It only contains json serializable values.
+
+        .. code-block:: python
+
+            {
+                clip_id_1: {
+                    "attrs": {attr_id_1: value, "media_path": value},
+                    "custom_attrs": {custom_attr_id_1: value},
+                    "annotations": {
+                        "ro": {frame: [ro_annotation_state, ...]},
+                        "rw": {frame: rw_annotation_state}
+                    },
+                    "color_corrections": {
+                        "ro": [(frame or None, cc_state), ...],
+                        "rw": [(frame or None, cc_state), ...]
+                    }
+                },
+                clip_id_2: {...}
+            }
+
+        Args:
+            clip_ids (List[str]): Ids of the clips
+
+        Kwargs:
+            attr_ids (Optional[List[str]]):
+                Ids of additional attrs to capture, like read-only attrs
+                that hold the path of the media.
+
+        Returns:
+            (Dict): Snapshot of the clips by clip id
+        """
+        if attr_ids is None: attr_ids = []
+        return self.__delegate_mngr.call(
+            self.get_clips_snapshot, [clip_ids, attr_ids])
+
+    def restore_clips_snapshot(
+        self, playlist_id:str, snapshot:Dict, index:Optional[int]=None,
+        ids:Optional[List[str]]=None)->List[str]:
+        """
+        Create new clips from a snapshot taken with get_clips_snapshot, in
+        the playlist of the given id. The clips are created from the
+        media_path attrs of the snapshot, then all their attrs, custom
+        attrs, annotations and color corrections are set in one batch. The
+        color corrections get new ids.
+
+        The clips, attrs, annotations and color corrections are set by the
+        core of this method directly, not through create_clips,
+        set_attr_values, AnnotationApi.set_ro_annotations,
+        AnnotationApi.set_rw_annotations, ColorApi.set_ro_ccs and
+        ColorApi.set_rw_ccs. Hence the permission, pre and post delegates
+        of those methods are not called for the restored clips, and
+        delegates that need to observe or veto a restore need to be added
+        to restore_clips_snapshot itself. SIG_PLAYLIST_MODIFIED and
+        SIG_ATTR_VALUES_CHANGED are still emitted for the restored clips.
+
+        Args:
+            playlist_id (str): Id of the playlist to create the clips in
+            snapshot (Dict): Snapshot of the clips to create
+
+        Kwargs:
+            index (Optional[int]):
+                Optional positional index where the
+                clips need to be inserted.
+
+            ids (Optional[List[str]]):
+                Optional unique ids that need to be used for
+                each of the created clips.
+
+        Returns:
+            list[str]: Ids of the created clips
+        """
+        if ids is None:
+            ids = [uuid.uuid4().hex for _ in snapshot]
+        return self.__delegate_mngr.call(
+            self.restore_clips_snapshot, [playlist_id, snapshot, index, ids])
+
     ###########################################################################
     # Clip Attr Methods                                                       #
     ###########################################################################
@@ -791,6 +889,48 @@ class SessionApi(QtCore.QObject):
         return self.__delegate_mngr.call(
             self.get_attr_value, [clip_id, attr_id])
 
+    def get_attr_value_many(self, ids:List[Tuple[str, str]])->List[object]:
+        """
+        Get the values of the attributes of the clips whose respective ids
+        are given, in a single batch. Permission delegates of get_attr_value
+        are evaluated once for the whole batch.
+
+        Example of how ids should look like,
+
+        .. code-block:: python
+
+            [
+                (clip_id_1, attr_id_1),
+                (clip_id_1, attr_id_2),
+                (clip_id_2, attr_id_1)
+            ]
+
+        Args:
+            ids (List[Tuple[str, str]]):
+                List of tuples containing clip id and attr id.
+
+        Returns:
+            List[object]: Values of the attributes in the order of given ids
+        """
+        return self.__delegate_mngr.call_many(self.get_attr_value, ids)
+
+    def get_attr_column(self, playlist_id:str, attr_id:str)->List[object]:
+        """
+        Get the values of the attribute of all the clips of the playlist
+        whose respective ids are given. Values are in the same order as
+        the clips of the playlist, which is useful for sorting and filtering
+        the clips of a playlist by an attribute.
+
+        Args:
+            playlist_id (str): Id of the Playlist
+            attr_id (str): Id of the Attr
+
+        Returns:
+            List[object]: Values of the attribute for each clip
+        """
+        return self.__delegate_mngr.call(
+            self.get_attr_column, [playlist_id, attr_id])
+
     def get_default_attr_value(self, id:str)->object:
         """
         Get the default value which is metadata of the
@@ -965,6 +1105,31 @@ class SessionApi(QtCore.QObject):
             self.get_attr_value_at, [clip_id, attr_id, key])
         return value
 
+    def get_attr_value_at_many(self, ids:List[Tuple[str, str, int]])->List[object]:
+        """
+        Get the values of the keyable attributes of the clips at the given
+        keys (frames), in a single batch. Permission delegates of
+        get_attr_value_at are evaluated once for the whole batch.
+
+        Example of how ids should look like,
+
+        .. code-block:: python
+
+            [
+                (clip_id_1, attr_id_1, key),
+                (clip_id_1, attr_id_2, key),
+                (clip_id_2, attr_id_1, key)
+            ]
+
+        Args:
+            ids (List[Tuple[str, str, int]]):
+                List of tuples containing clip id, attr id and key (frame).
+
+        Returns:
+            List[object]: Values of the attributes in the order of given ids
+        """
+        return self.__delegate_mngr.call_many(self.get_attr_value_at, ids)
+
     def set_attr_values_at(self, attr_values_at:List[Tuple])->bool:
         """
         Set the value of the keyable attributes at the given frame.
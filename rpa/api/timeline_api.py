@@ -8,7 +8,7 @@ Also convert current frame of a clip to its frame number relative to the
 current timeline sequence and vice versa.
 """
 
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 try:
     from PySide2 import QtCore
 except ImportError:
@@ -109,6 +109,37 @@ class TimelineApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.get_seq_frames, [clip_id, frames])
 
+    def get_seq_frames_for_clips(
+        self, frames: Dict[str, Optional[List[int]]])->Dict[str, List[int]]:
+        """
+        Get the first frame relative to the current timeline sequence that
+        corresponds to each of the given clip frames of each of the given
+        clips. If the frames of a clip are None, then the first sequence
+        frame of all its clip frames will be returned.
+
+        Unlike get_seq_frames, the lookups of all the clips are done in a
+        single call, which is useful for drawing keys of the whole timeline.
+
+        Args:
+            frames (Dict[str, Optional[List[int]]]):
+                Dict with ids of clips in timeline as keys and their clip
+                frames that need to be converted as values.
+
+        Returns:
+            Dict[str, List[int]]:
+                Dict with the given clip ids as keys and the sorted first
+                sequence frames of their clip frames as values. Clip frames
+                that are not in the timeline are left out.
+
+        Example of how the returned dict will look like,
+
+        .. code-block:: python
+
+            {"clip_id_1": [1, 4, 7], "clip_id_2": [9, 10]}
+        """
+        return self.__delegate_mngr.call(
+            self.get_seq_frames_for_clips, [frames])
+
     def get_clip_frames(self, frames: Optional[List[int]]=None)->List[Tuple[str, int, int]]:
         """
         Get the frames relative to the clips in the timeline corresponding
@@ -154,6 +154,27 @@ class ViewportApi(QtCore.QObject):
         """
         return self.__delegate_mngr.call(self.delete_html_overlays, [ids])
 
+    def get_html_texture_stats(self)->Dict:
+        """
+        Returns the stats of the cache of rendered HTML overlay textures.
+        Overlays whose HTML, size and scale were already rendered reuse the
+        cached texture instead of being rendered again.
+
+        .. code-block:: python
+
+            {
+                "hits": 12,
+                "misses": 3,
+                "evictions": 0,
+                "textures": 3,
+                "bytes": 840000
+            }
+
+        Returns:
+            (Dict): Stats of the HTML overlay texture cache.
+        """
+        return self.__delegate_mngr.call(self.get_html_texture_stats)
+
     def create_opengl_overlay(self, recipe: dict) -> str:
         """
         Create OpenGL overlay based on provided recipe
@@ -104,9 +104,264 @@ Hence signature of the callable should look like this,
 
 Instead of args and kwargs you can have the actual args and kwargs
 based on the rpa_method.
+
+Dispatch Plans:
+---------------
+The delegates of an RPA method are flattened into a dispatch plan the first
+time the method is called. The plan is reused by every subsequent call and is
+only rebuilt after a delegate of that method is added, removed or cleared.
+Methods that only have a core delegate are dispatched straight to it.
+Permission delegates are evaluated in the order they were added and
+evaluation stops at the first one that does not return True.
+
+As the plans are built from the delegates registered through this manager,
+the lists returned by the get_*_delegates methods are copies. Use the
+add/remove/clear methods to change the delegates of an RPA method.
+
+Batches:
+--------
+An RPA method can also be called for a list of args in a single batch with
+call_many. The permission delegates are evaluated once for the whole batch
+and the pre and post delegates that were added with accepts_batch=True
+receive the whole batch instead of being called once per list of args.
+
+Tracing:
+--------
+Calls made through a delegate manager can be traced by enabling tracing on
+it. While tracing is enabled, the number of calls and the time spent in the
+permission, pre, core and post delegates of every RPA method are recorded
+along with the time spent in each individual delegate, which makes slow
+delegates easy to spot. The last few calls are also kept with a summary of
+their arguments. When tracing is disabled the dispatch plans do not contain
+any instrumentation and calls cost exactly the same as without tracing.
+
+.. code-block:: python
+
+    delegate_mngr = rpa.session_api.delegate_mngr
+    delegate_mngr.enable_tracing()
+    ...
+    print(delegate_mngr.dump_trace_stats())
+    delegate_mngr.disable_tracing()
 """
 
 from typing import Any, Callable, Optional, List, Dict
+from collections import deque
+import json
+import math
+import reprlib
+import time
+
+
+_NO_ARGS = ()
+_NO_KWARGS = {}
+# Batch dispatch plan hooks of a traced method, whose core runs the batch.
+_TRACED = object()
+_PHASES = ("permission", "pre", "core", "post")
+
+
+def _get_name(callable_obj):
+    module = getattr(callable_obj, "__module__", None)
+    name = getattr(callable_obj, "__qualname__", None)
+    if name is None:
+        return repr(callable_obj)
+    return f"{module}.{name}" if module else name
+
+
+class _LatencyHistogram:
+    """
+    Log-linear histogram of durations in seconds. Every power of two is
+    split into 8 buckets, so percentiles are within ~6% of the recorded
+    durations while using constant memory.
+    """
+    __slots__ = ("count", "total", "max", "__buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.__buckets = {}
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        if duration > 0.0:
+            mantissa, exponent = math.frexp(duration)
+            bucket = (exponent, int((mantissa - 0.5) * 16))
+        else:
+            bucket = (-math.inf, 0)
+        self.__buckets[bucket] = self.__buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.__buckets):
+            seen += self.__buckets[bucket]
+            if seen >= rank:
+                break
+        exponent, step = bucket
+        if exponent == -math.inf:
+            return 0.0
+        mid = math.ldexp(0.5 + (step + 0.5) / 16, exponent)
+        return min(mid, self.max)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000.0,
+            "p50_ms": self.percentile(0.50) * 1000.0,
+            "p95_ms": self.percentile(0.95) * 1000.0,
+            "p99_ms": self.percentile(0.99) * 1000.0,
+            "max_ms": self.max * 1000.0
+        }
+
+
+class _MethodTrace:
+    __slots__ = ("calls", "denied", "errors", "phases", "delegates")
+
+    def __init__(self):
+        self.calls = 0
+        self.denied = 0
+        self.errors = 0
+        self.phases = {
+            phase: _LatencyHistogram() for phase in _PHASES + ("total",)}
+        # (phase, delegate name) -> _LatencyHistogram
+        self.delegates = {}
+
+    def record(self, timings, total, status):
+        self.calls += 1
+        if status == "denied": self.denied += 1
+        elif status == "error": self.errors += 1
+        phase_totals = dict.fromkeys(_PHASES, 0.0)
+        for phase, name, duration in timings:
+            phase_totals[phase] += duration
+            if name is None: continue
+            histogram = self.delegates.get((phase, name))
+            if histogram is None:
+                histogram = self.delegates[(phase, name)] = \
+                    _LatencyHistogram()
+            histogram.add(duration)
+        for phase, duration in phase_totals.items():
+            self.phases[phase].add(duration)
+        self.phases["total"].add(total)
+
+    def to_dict(self):
+        delegates = {phase: {} for phase in _PHASES}
+        for (phase, name), histogram in self.delegates.items():
+            delegates[phase][name] = histogram.to_dict()
+        return {
+            "calls": self.calls,
+            "denied": self.denied,
+            "errors": self.errors,
+            "phases": {
+                phase: histogram.to_dict() \
+                for phase, histogram in self.phases.items()},
+            "delegates": delegates
+        }
+
+
+class _DelegateTracer:
+    """
+    Builds the traced counterparts of dispatch plans and holds the stats
+    they record.
+    """
+
+    def __init__(self, max_recent_calls):
+        self.__method_traces = {}
+        self.__recent_calls = deque(maxlen=max_recent_calls)
+        self.__repr = reprlib.Repr()
+        self.__repr.maxlevel = 3
+        self.__repr.maxstring = 60
+        self.__repr.maxother = 60
+
+    def trace(
+        self, rpa_method, core, hooks, delegate_names, on_denied,
+        batch=False):
+        """
+        Returns a callable that runs the given plan just like
+        DelegateMngr.call does, while recording the time spent in each
+        delegate. When batch is True, the returned callable runs the plan
+        for a list of args like DelegateMngr.call_many does.
+        """
+        method_name = getattr(rpa_method, "__qualname__", None) or \
+            repr(rpa_method)
+        method_trace = self.__method_traces.get(method_name)
+        if method_trace is None:
+            method_trace = self.__method_traces[method_name] = _MethodTrace()
+        if hooks is None:
+            hooks = delegate_names = ((), (), ())
+        permission_delegates, pre_delegates, post_delegates = \
+            (tuple(zip(names, delegates)) \
+            for names, delegates in zip(delegate_names, hooks))
+        if batch:
+            def run_core(args_list):
+                return [core(*args) for args in args_list]
+        else:
+            run_core = core
+        recent_calls = self.__recent_calls
+        summarize = self.__repr.repr
+        clock = time.perf_counter
+
+        def traced_call(*args, **kwargs):
+            timings = []
+            status = "ok"
+            start = clock()
+            try:
+                for name, delegate in permission_delegates:
+                    begin = clock()
+                    allowed = delegate(*args, **kwargs)
+                    timings.append(("permission", name, clock() - begin))
+                    if not allowed:
+                        status = "denied"
+                        return on_denied(*args)
+                for name, delegate in pre_delegates:
+                    begin = clock()
+                    delegate(*args, **kwargs)
+                    timings.append(("pre", name, clock() - begin))
+                begin = clock()
+                out = run_core(*args, **kwargs)
+                timings.append(("core", None, clock() - begin))
+                for name, delegate in post_delegates:
+                    begin = clock()
+                    delegate(out, *args, **kwargs)
+                    timings.append(("post", name, clock() - begin))
+                return out
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                total = clock() - start
+                method_trace.record(timings, total, status)
+                recent_call = {
+                    "method": method_name,
+                    "args": summarize(args),
+                    "kwargs": summarize(kwargs),
+                    "status": status,
+                    "duration_ms": total * 1000.0,
+                    "time": time.time()
+                }
+                if batch: recent_call["batch_size"] = len(args[0])
+                recent_calls.append(recent_call)
+
+        return traced_call
+
+    def get_stats(self):
+        return {
+            method_name: method_trace.to_dict() \
+            for method_name, method_trace in self.__method_traces.items()}
+
+    def get_recent_calls(self):
+        return [dict(recent_call) for recent_call in self.__recent_calls]
+
+    def reset(self):
+        # The traced plans hold on to their _MethodTrace, so reset them in
+        # place instead of dropping them.
+        for method_trace in self.__method_traces.values():
+            method_trace.__init__()
+        self.__recent_calls.clear()
 
 
 class DelegateMngr:
@@ -116,9 +371,20 @@ class DelegateMngr:
         self.__pre_delegates = {}
         self.__core_delegates = {}
         self.__post_delegates = {}
+        # rpa_method -> set of (delegate type, delegate) that have opted
+        # into receiving the whole batch in call_many.
+        self.__batch_delegates = {}
+        # rpa_method -> (core, hooks). hooks is None when the method only
+        # has a core delegate, otherwise a tuple of
+        # (permission delegates, pre delegates, post delegates).
+        self.__dispatch_plans = {}
+        self.__batch_dispatch_plans = {}
+        self.__tracer = None
+        self.__is_tracing_enabled = False
 
     def add_permission_delegate(
-        self, rpa_method:Callable, delegate:Callable)->None:
+        self, rpa_method:Callable, delegate:Callable,
+        accepts_batch:bool=False)->None:
         """
         An RPA method can have 0 or more permission delegates. In order for
         the Pre Delegates, Core Delegate and Post Delegates of a given method
@@ -144,11 +410,21 @@ class DelegateMngr:
 
             delegate (callable):
                 Callable that returns a boolean value of True or False.
+
+        Kwargs:
+            accepts_batch (bool):
+                If True, the delegate receives the whole batch when the
+                rpa_method is called through call_many. See call_many for
+                the signature of batch delegates.
         Returns:
             None
         """
         self.__permission_delegates.setdefault(
             rpa_method, []).append(delegate)
+        if accepts_batch:
+            self.__batch_delegates.setdefault(
+                rpa_method, set()).add(("permission", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def get_permission_delegates(self, rpa_method:Callable)->List[Callable]:
         """
@@ -160,7 +436,7 @@ class DelegateMngr:
         Returns:
             None
         """
-        return self.__permission_delegates.get(rpa_method, [])
+        return list(self.__permission_delegates.get(rpa_method, []))
 
     def remove_permission_delegate(
         self, rpa_method:Callable, delegate:Callable)->None:
@@ -182,6 +458,10 @@ class DelegateMngr:
             self.__permission_delegates.setdefault(
                 rpa_method, []).remove(delegate)
         except ValueError: pass
+        if delegate not in self.__permission_delegates[rpa_method]:
+            self.__batch_delegates.get(rpa_method, set()).discard(
+                ("permission", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def clear_permission_delegates(self, rpa_method:Callable)->None:
         """
@@ -194,9 +474,12 @@ class DelegateMngr:
             None
         """
         self.__permission_delegates.setdefault(rpa_method, []).clear()
+        self.__discard_batch_delegates(rpa_method, "permission")
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def add_pre_delegate(
-        self, rpa_method:Callable, delegate:Callable)->None:
+        self, rpa_method:Callable, delegate:Callable,
+        accepts_batch:bool=False)->None:
         """
         An RPA method can have 0 or more pre delegates. These are the
         delegates that get called before the core delegate is called.
@@ -221,10 +504,20 @@ class DelegateMngr:
 
             delegate (callable):
                 Callable that needs to be called before core delegate
+
+        Kwargs:
+            accepts_batch (bool):
+                If True, the delegate receives the whole batch when the
+                rpa_method is called through call_many. See call_many for
+                the signature of batch delegates.
         Returns:
             None
         """
         self.__pre_delegates.setdefault(rpa_method, []).append(delegate)
+        if accepts_batch:
+            self.__batch_delegates.setdefault(
+                rpa_method, set()).add(("pre", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def get_pre_delegates(self, rpa_method:Callable)->List[Callable]:
         """
@@ -236,7 +529,7 @@ class DelegateMngr:
         Returns:
             None
         """
-        return self.__pre_delegates.get(rpa_method, [])
+        return list(self.__pre_delegates.get(rpa_method, []))
 
     def remove_pre_delegate(
         self, rpa_method:Callable, delegate:Callable)->None:
@@ -258,6 +551,10 @@ class DelegateMngr:
             self.__pre_delegates.setdefault(
                 rpa_method, []).remove(delegate)
         except ValueError: pass
+        if delegate not in self.__pre_delegates[rpa_method]:
+            self.__batch_delegates.get(rpa_method, set()).discard(
+                ("pre", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def clear_pre_delegates(self, rpa_method:Callable)->None:
         """
@@ -270,6 +567,8 @@ class DelegateMngr:
             None
         """
         self.__pre_delegates.setdefault(rpa_method, []).clear()
+        self.__discard_batch_delegates(rpa_method, "pre")
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def _set_core_delegate(
         self, rpa_method:Callable, delegate:Callable)->None:
@@ -295,6 +594,7 @@ class DelegateMngr:
             None
         """
         self.__core_delegates[rpa_method] = delegate
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def _get_core_delegate(self, rpa_method:Callable)->Optional[Callable]:
         """
@@ -324,9 +624,11 @@ class DelegateMngr:
             None
         """
         self.__core_delegates.pop(rpa_method, None)
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def add_post_delegate(
-        self, rpa_method:Callable, delegate:Callable)->None:
+        self, rpa_method:Callable, delegate:Callable,
+        accepts_batch:bool=False)->None:
         """
         An RPA method can have 0 or more post delegates. These are the
         delegates that get called after the core delegate is called.
@@ -350,10 +652,20 @@ class DelegateMngr:
 
             delegate (callable):
                 Callable that needs to be called after core delegate
+
+        Kwargs:
+            accepts_batch (bool):
+                If True, the delegate receives the whole batch when the
+                rpa_method is called through call_many. See call_many for
+                the signature of batch delegates.
         Returns:
             None
         """
         self.__post_delegates.setdefault(rpa_method, []).append(delegate)
+        if accepts_batch:
+            self.__batch_delegates.setdefault(
+                rpa_method, set()).add(("post", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def get_post_delegates(self, rpa_method:Callable)->List[Callable]:
         """
@@ -365,7 +677,7 @@ class DelegateMngr:
         Returns:
             None
         """
-        return self.__post_delegates.get(rpa_method, [])
+        return list(self.__post_delegates.get(rpa_method, []))
 
     def remove_post_delegate(
         self, rpa_method:Callable, delegate:Callable)->None:
@@ -387,6 +699,10 @@ class DelegateMngr:
             self.__post_delegates.setdefault(
                 rpa_method, []).remove(delegate)
         except ValueError: pass
+        if delegate not in self.__post_delegates[rpa_method]:
+            self.__batch_delegates.get(rpa_method, set()).discard(
+                ("post", delegate))
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def clear_post_delegates(self, rpa_method:Callable)->None:
         """
@@ -399,6 +715,8 @@ class DelegateMngr:
             None
         """
         self.__post_delegates.setdefault(rpa_method, []).clear()
+        self.__discard_batch_delegates(rpa_method, "post")
+        self.__invalidate_dispatch_plans(rpa_method)
 
     def call(
         self, rpa_method:Callable,
@@ -420,35 +738,352 @@ class DelegateMngr:
         Returns:
             (Any): Value returned by core delegate callable
         """
-        args = [] if args is None else args
-        kwargs = {} if kwargs is None else kwargs
+        try:
+            core, hooks = self.__dispatch_plans[rpa_method]
+        except KeyError:
+            core, hooks = self.__compile_dispatch_plan(rpa_method)
+        if args is None: args = _NO_ARGS
+        if kwargs is None: kwargs = _NO_KWARGS
+
+        if hooks is None:
+            return core(*args, **kwargs)
+
+        permission_delegates, pre_delegates, post_delegates = hooks
+        for permission_delegate in permission_delegates:
+            if not permission_delegate(*args, **kwargs):
+                self.__logger.warning(
+                    f"Permission not available to call this API method! {rpa_method}")
+                return None
+        for delegate in pre_delegates:
+            delegate(*args, **kwargs)
+        out = core(*args, **kwargs)
+        for delegate in post_delegates:
+            delegate(out, *args, **kwargs)
+        return out
+
+    def call_many(
+        self, rpa_method:Callable, args_list:List[List])->List[Any]:
+        """
+        Call the rpa_method once for each of the given list of args, as a
+        single batch.
+
+        The permission delegates are evaluated once for the whole batch
+        before any other delegate is called. If any of them does not
+        return True, none of the calls in the batch are made. Then the pre
+        delegates are called for the batch, followed by the core delegate
+        for each list of args and finally the post delegates for the batch.
+
+        Delegates that were added with accepts_batch=True are called once
+        per batch and hence their signature should look like this,
+
+        .. code-block:: python
+
+            def batch_permission_delegate(self, args_list):
+                return True
+
+            def batch_pre_delegate(self, args_list):
+                pass
+
+            def batch_post_delegate(self, outs, args_list):
+                pass
+
+        where outs is the list of values returned by the core delegate for
+        each list of args in args_list. All the other delegates are called
+        once for each list of args in the batch, just like in call. When a
+        batch delegate is triggered through call, it receives a batch of the
+        single list of args (keyword arguments are not forwarded to it).
+
+        Args:
+            rpa_method (callable):
+                A method of an RPA module
+
+            args_list (List[List[Any]]):
+                List of the list of arguments for each call in the batch
+
+        Returns:
+            (List[Any]):
+                Values returned by core delegate callable for each list of
+                args in the same order as args_list
+        """
+        try:
+            core, hooks = self.__batch_dispatch_plans[rpa_method]
+        except KeyError:
+            core, hooks = self.__compile_batch_dispatch_plan(rpa_method)
 
-        if not self.__core_delegates.get(rpa_method):
+        if core is None:
             self.__logger.warning(
                 f"API method does not have core delegate! {rpa_method}")
-            out = None
-        elif self.__is_allowed(rpa_method, args, kwargs):
-            self.__call_pre_delegates(rpa_method, args, kwargs)
-            out = self.__core_delegates[rpa_method](*args, **kwargs)
-            self.__call_post_delegates(rpa_method, out, args, kwargs)
+            return [None] * len(args_list)
+        if hooks is None:
+            return [core(*args) for args in args_list]
+        if hooks is _TRACED:
+            return core(args_list)
+
+        permission_delegates, pre_delegates, post_delegates = hooks
+        for permission_delegate in permission_delegates:
+            if not permission_delegate(args_list):
+                self.__logger.warning(
+                    f"Permission not available to call this API method! {rpa_method}")
+                return [None] * len(args_list)
+        for delegate in pre_delegates:
+            delegate(args_list)
+        outs = [core(*args) for args in args_list]
+        for delegate in post_delegates:
+            delegate(outs, args_list)
+        return outs
+
+    def enable_tracing(self, max_recent_calls:int=100)->None:
+        """
+        Start recording the calls made through this delegate manager. Stats
+        recorded before tracing was previously disabled are kept, use
+        reset_trace_stats to start afresh.
+
+        Kwargs:
+            max_recent_calls (int):
+                Number of most recent calls to keep. If tracing is already
+                enabled, the recent calls are only resized when the stats
+                are reset.
+        Returns:
+            None
+        """
+        if self.__tracer is None:
+            self.__tracer = _DelegateTracer(max_recent_calls)
+        if self.__is_tracing_enabled: return
+        self.__is_tracing_enabled = True
+        self.__dispatch_plans.clear()
+        self.__batch_dispatch_plans.clear()
+
+    def disable_tracing(self)->None:
+        """
+        Stop recording the calls made through this delegate manager. The
+        stats recorded so far are kept until reset_trace_stats is called.
+
+        Returns:
+            None
+        """
+        if not self.__is_tracing_enabled: return
+        self.__is_tracing_enabled = False
+        self.__dispatch_plans.clear()
+        self.__batch_dispatch_plans.clear()
+
+    def is_tracing_enabled(self)->bool:
+        """
+        Returns True if the calls made through this delegate manager are
+        being traced.
+
+        Returns:
+            (bool): True if tracing is enabled
+        """
+        return self.__is_tracing_enabled
+
+    def get_trace_stats(self)->Dict:
+        """
+        Get a snapshot of the stats recorded while tracing was enabled.
+
+        The snapshot has an entry for each traced RPA method, keyed by the
+        qualified name of the method. All durations are in milliseconds and
+        the percentiles are approximate.
+
+        .. code-block:: python
+
+            {
+                "SessionApi.get_attr_value": {
+                    "calls": 120,
+                    "denied": 0,
+                    "errors": 0,
+                    "phases": {
+                        "permission": {
+                            "count": 120, "total_ms": 0.4,
+                            "p50_ms": 0.003, "p95_ms": 0.004,
+                            "p99_ms": 0.009, "max_ms": 0.01},
+                        "pre": {...},
+                        "core": {...},
+                        "post": {...},
+                        "total": {...}
+                    },
+                    "delegates": {
+                        "permission": {},
+                        "pre": {"plugin.Plugin.on_get_attr_value": {...}},
+                        "core": {},
+                        "post": {}
+                    }
+                }
+            }
+
+        Returns:
+            (Dict): Stats of every traced RPA method
+        """
+        if self.__tracer is None: return {}
+        return self.__tracer.get_stats()
+
+    def get_recent_calls(self)->List[Dict]:
+        """
+        Get the most recent calls made while tracing was enabled, oldest
+        first. Each call is a dict with the method name, a summary of
+        the args and kwargs, the status of the call ("ok", "denied" or
+        "error"), its duration in milliseconds and the time at which it
+        finished. Calls made through call_many also have a batch_size.
+
+        Returns:
+            (List[Dict]): Most recent calls
+        """
+        if self.__tracer is None: return []
+        return self.__tracer.get_recent_calls()
+
+    def reset_trace_stats(self)->None:
+        """
+        Clear all the stats and recent calls recorded so far.
+
+        Returns:
+            None
+        """
+        if self.__tracer is not None:
+            self.__tracer.reset()
+
+    def dump_trace_stats(self, file_path:Optional[str]=None)->str:
+        """
+        Dump the stats and recent calls recorded so far as JSON.
+
+        Kwargs:
+            file_path (str):
+                If given, the JSON is also written to this file.
+        Returns:
+            (str): JSON with "stats" and "recent_calls" keys
+        """
+        dump = json.dumps({
+            "stats": self.get_trace_stats(),
+            "recent_calls": self.get_recent_calls()
+        }, indent=4)
+        if file_path is not None:
+            with open(file_path, "w") as f:
+                f.write(dump)
+        return dump
+
+    def __deny(self, rpa_method, size=None):
+        self.__logger.warning(
+            f"Permission not available to call this API method! {rpa_method}")
+        return None if size is None else [None] * size
+
+    def __get_delegate_names(self, rpa_method):
+        return tuple(
+            tuple(_get_name(delegate) for delegate in delegates.get(
+                rpa_method, ())) for delegates in (
+            self.__permission_delegates,
+            self.__pre_delegates,
+            self.__post_delegates))
+
+    def __invalidate_dispatch_plans(self, rpa_method):
+        self.__dispatch_plans.pop(rpa_method, None)
+        self.__batch_dispatch_plans.pop(rpa_method, None)
+
+    def __discard_batch_delegates(self, rpa_method, delegate_type):
+        batch_delegates = self.__batch_delegates.get(rpa_method)
+        if not batch_delegates: return
+        for batch_delegate in list(batch_delegates):
+            if batch_delegate[0] == delegate_type:
+                batch_delegates.discard(batch_delegate)
+
+    def __is_batch_delegate(self, rpa_method, delegate_type, delegate):
+        batch_delegates = self.__batch_delegates.get(rpa_method)
+        return bool(batch_delegates) and \
+            (delegate_type, delegate) in batch_delegates
+
+    def __compile_dispatch_plan(self, rpa_method):
+        """
+        Flatten the delegates of the given rpa_method into the plan that
+        call() executes. Plans are cached until a delegate of the
+        rpa_method is added, removed or cleared.
+        """
+        def as_single(delegate_type, delegate):
+            # batch delegates receive a batch of just this call
+            if not self.__is_batch_delegate(
+                rpa_method, delegate_type, delegate):
+                return delegate
+            if delegate_type == "post":
+                return lambda out, *args, **kwargs: \
+                    delegate([out], [list(args)])
+            return lambda *args, **kwargs: delegate([list(args)])
+
+        core = self.__core_delegates.get(rpa_method)
+        permission_delegates = tuple(
+            as_single("permission", delegate) for delegate in \
+            self.__permission_delegates.get(rpa_method, ()))
+        pre_delegates = tuple(
+            as_single("pre", delegate) for delegate in \
+            self.__pre_delegates.get(rpa_method, ()))
+        post_delegates = tuple(
+            as_single("post", delegate) for delegate in \
+            self.__post_delegates.get(rpa_method, ()))
+
+        if not core:
+            def core(*args, **kwargs):
+                self.__logger.warning(
+                    f"API method does not have core delegate! {rpa_method}")
+                return None
+            hooks = None
+        elif permission_delegates or pre_delegates or post_delegates:
+            hooks = (permission_delegates, pre_delegates, post_delegates)
         else:
-            self.__logger.warning(
-                f"Permission not available to call this API method! {rpa_method}")
-            out = None
-        return out
+            hooks = None
 
-    def __is_allowed(self, rpa_method, args, kwargs):
-        permission_delegates = self.__permission_delegates.get(rpa_method)
-        if permission_delegates:
-            is_allowed = all([permission_delegate(*args, **kwargs) \
-                for permission_delegate in permission_delegates])
-        else: is_allowed = True
-        return is_allowed
+        if self.__is_tracing_enabled and \
+        self.__core_delegates.get(rpa_method):
+            core = self.__tracer.trace(
+                rpa_method, core, hooks,
+                self.__get_delegate_names(rpa_method),
+                lambda *args: self.__deny(rpa_method))
+            hooks = None
 
-    def __call_pre_delegates(self, rpa_method, args, kwargs):
-        for delegate in self.__pre_delegates.get(rpa_method, []):
-            delegate(*args, **kwargs)
+        plan = (core, hooks)
+        self.__dispatch_plans[rpa_method] = plan
+        return plan
 
-    def __call_post_delegates(self, rpa_method, out, args, kwargs):
-        for delegate in self.__post_delegates.get(rpa_method, []):
-            delegate(out, *args, **kwargs)
+    def __compile_batch_dispatch_plan(self, rpa_method):
+        """
+        Same as __compile_dispatch_plan but every delegate in the plan
+        takes the whole batch, delegates that have not opted into batches
+        are wrapped to be called once per list of args.
+        """
+        def as_batch(delegate_type, delegate):
+            if self.__is_batch_delegate(rpa_method, delegate_type, delegate):
+                return delegate
+            if delegate_type == "permission":
+                return lambda args_list: \
+                    all(delegate(*args) for args in args_list)
+            if delegate_type == "post":
+                def post_delegate(outs, args_list):
+                    for out, args in zip(outs, args_list):
+                        delegate(out, *args)
+                return post_delegate
+            def pre_delegate(args_list):
+                for args in args_list:
+                    delegate(*args)
+            return pre_delegate
+
+        core = self.__core_delegates.get(rpa_method) or None
+        permission_delegates = tuple(
+            as_batch("permission", delegate) for delegate in \
+            self.__permission_delegates.get(rpa_method, ()))
+        pre_delegates = tuple(
+            as_batch("pre", delegate) for delegate in \
+            self.__pre_delegates.get(rpa_method, ()))
+        post_delegates = tuple(
+            as_batch("post", delegate) for delegate in \
+            self.__post_delegates.get(rpa_method, ()))
+
+        if permission_delegates or pre_delegates or post_delegates:
+            hooks = (permission_delegates, pre_delegates, post_delegates)
+        else:
+            hooks = None
+
+        if self.__is_tracing_enabled and core is not None:
+            core = self.__tracer.trace(
+                rpa_method, core, hooks,
+                self.__get_delegate_names(rpa_method),
+                lambda args_list: self.__deny(rpa_method, len(args_list)),
+                batch=True)
+            hooks = _TRACED
+
+        plan = (core, hooks)
+        self.__batch_dispatch_plans[rpa_method] = plan
+        return plan
@@ -1,6 +1,7 @@
 import math
 import time
 from collections import deque
+import numpy as np
 try:
     from PySide2 import QtCore
 except ImportError:
@@ -11,11 +12,13 @@ from rv import commands as rvc
 from rv import extra_commands as rve
 
 from rpa.session_state.annotations import \
-    Stroke, StrokeMode, StrokeBrush, Text
+    Stroke, StrokeMode, StrokeBrush, Text, PointArray
 from rpa.session_state.utils import Color, Point, itview_to_screen, image_to_itview
 from rpa.open_rv.rpa_core.api.utils import \
     rv_to_image, rv_to_itview, image_to_rv, itview_to_rv
 from rpa.open_rv.rpa_core.api import prop_util
+from rpa.open_rv.rpa_core.api.stroke_buffer import TransientStrokeBuffer
+from rpa.open_rv.rpa_core.api.paint_frames import PaintComponent, PaintFrames
 
 
 LASER_POINT_DELAY = 1.0
@@ -43,6 +46,20 @@ class AnnotationApiCore(QtCore.QObject):
         self.__laser_timer.setSingleShot(True)
         self.__laser_timer.timeout.connect(lambda: rvc.redraw())
         self.__pen_stroke_point = None
+        self.__transient_strokes = TransientStrokeBuffer()
+        # Remembers what was written to the paint node frames of the RO
+        # and RW annotations of each clip, so that only changes get written
+        self.__paint_frames = PaintFrames(prop_util)
+        # RW strokes of the paint node frame whose transform is previewed
+        self.__rw_preview = None
+        # source node -> (width, height) of its media
+        self.__resolutions = {}
+        # Transient points are written to the paint nodes once all the
+        # points that came in before the next redraw have been appended.
+        self.__flush_timer = QtCore.QTimer(self)
+        self.__flush_timer.setSingleShot(True)
+        self.__flush_timer.setInterval(0)
+        self.__flush_timer.timeout.connect(self.__flush_transient_strokes)
 
     def _update_visibility(self, clip_id=None):
         is_visible = self.__session.viewport.feedback.is_visible
@@ -62,39 +79,41 @@ class AnnotationApiCore(QtCore.QObject):
         source_node, paint_node = self.__get_source_and_paint_node(clip_id)
         if None in (source_node, paint_node):
             return False
-        smi = rvc.sourceMediaInfo(source_node)
-        width = smi["width"]
-        height = smi["height"]
-        name = self.__get_transient_stroke_name(paint_node, frame, token, True)
-        prop_util.set_property(f"{paint_node}.{name}.width", [image_to_rv(width, height, stroke_point.width)])
-        prop_util.set_property(f"{paint_node}.{name}.color", [stroke_point.color.__getstate__()])
-        prop_util.set_property(f"{paint_node}.{name}.brush", [stroke_point.brush])
-        prop_util.set_property(f"{paint_node}.{name}.mode", [stroke_point.mode])
-        prop = f"{paint_node}.{name}.points"
+        width, height = self.__get_resolution(source_node)
+        stroke = self.__transient_strokes.get(paint_node, frame, token)
+        name = stroke.name if stroke else \
+            self.__get_transient_stroke_name(paint_node, frame, token, True)
+        style = (
+            image_to_rv(width, height, stroke_point.width),
+            stroke_point.color.__getstate__(),
+            stroke_point.brush, stroke_point.mode)
         point = itview_to_rv(width, height, *(stroke_point.point.__getstate__()))
-        if is_line:
-            if rvc.propertyExists(prop):
-                points = prop_util.get_property(prop)
-                rvc.deleteProperty(prop)
-                prop_util.set_property(prop, [points[0], point])
-            else:
-                prop_util.set_property(prop, [point])
-        else:
-            prop_util.append_property(prop, [point])
-        if name not in prop_util.get_property(f"{paint_node}.frame:{frame}.order"):
-            prop_util.append_property(f"{paint_node}.frame:{frame}.order", [name])
+        self.__transient_strokes.append_point(
+            paint_node, frame, token, name, point, style, is_line=is_line)
+        if not self.__flush_timer.isActive():
+            self.__flush_timer.start()
         return True
 
     def get_transient_stroke(self, clip_id, frame, token):
         source_node, paint_node = self.__get_source_and_paint_node(clip_id)
         if None in (source_node, paint_node):
             return None
+        width, height = self.__get_resolution(source_node)
+        stroke = self.__transient_strokes.get(paint_node, frame, token)
+        if stroke is not None:
+            stroke_width, color, brush, mode = stroke.style
+            xy = np.array(stroke.points, dtype=float).reshape(-1, 2)
+            return Stroke(
+                mode=StrokeMode(mode),
+                brush=StrokeBrush(brush),
+                width=rv_to_image(width, height, stroke_width),
+                color=Color(*color),
+                points=PointArray.from_xy(np.column_stack(
+                    rv_to_itview(width, height, xy[:, 0], xy[:, 1])))
+            )
         name = self.__get_transient_stroke_name(paint_node, frame, token)
         if name is None:
             return None
-        smi = rvc.sourceMediaInfo(source_node)
-        width = smi["width"]
-        height = smi["height"]
         return Stroke(
             mode=StrokeMode(prop_util.get_property(f"{paint_node}.{name}.mode")[0]),
             brush=StrokeBrush(prop_util.get_property(f"{paint_node}.{name}.brush")[0]),
@@ -107,6 +126,8 @@ class AnnotationApiCore(QtCore.QObject):
         source_node, paint_node = self.__get_source_and_paint_node(clip_id)
         if None in (source_node, paint_node):
             return False
+        self.__transient_strokes.pop(paint_node, frame, token)
+        self.__resolutions.pop(source_node, None)
         names = []
         transient_token = f":transient:{token}"
         for name in prop_util.get_property(f"{paint_node}.frame:{frame}.order"):
@@ -140,7 +161,14 @@ class AnnotationApiCore(QtCore.QObject):
         text = clip.annotations.set_text(frame, text)
 
         rv_name = text.get_custom_attr("rv_text")
-        if rv_name: self.__set_text_properties(source_node, paint_node, text)
+        if rv_name:
+            annotation = clip.annotations.get_rw_annotation(frame)
+            creator_name = annotation.creator if annotation else "not_available"
+            smi = rvc.sourceMediaInfo(source_node)
+            width, height = smi["width"], smi["height"]
+            self.__paint_frames.update(
+                paint_node, frame, rv_name,
+                PaintComponent.from_text(text, creator_name, width, height))
         else:
             annotation = clip.annotations.get_rw_annotation(frame)
             if annotation: creator_name = annotation.creator
@@ -213,6 +241,7 @@ class AnnotationApiCore(QtCore.QObject):
         return clip.annotations.get_ro_note_frames()
 
     def set_rw_annotations(self, annotations):
+        self.__rw_preview = None
         for clip_id, frame_annotations in annotations.items():
             for frame, annotation in frame_annotations.items():
                 clip = self.__session.get_clip(clip_id)
@@ -222,6 +251,51 @@ class AnnotationApiCore(QtCore.QObject):
                 self.SIG_MODIFIED.emit()
         return True
 
+    def set_rw_transform_preview(self, clip_id, frame, matrix, width_scale=1.0):
+        source_node, paint_node = self.__get_source_and_paint_node(clip_id)
+        if source_node is None: return False
+        if matrix is None:
+            self.__rw_preview = None
+            self._redraw_rw_annotations(clip_id, frame)
+            rvc.redraw()
+            return True
+
+        preview = self.__rw_preview
+        if preview is None or preview[0] != (paint_node, frame):
+            if self.__paint_frames.get_components(paint_node, frame) is None:
+                self._redraw_rw_annotations(clip_id, frame)
+            smi = rvc.sourceMediaInfo(source_node)
+            aspect = smi["width"] / smi["height"]
+            # itview to RV coordinates
+            to_rv = np.array(
+                [[aspect, 0.0, -0.5 * aspect], [0.0, 1.0, -0.5], [0.0, 0.0, 1.0]])
+            strokes = []
+            for name, component in \
+                self.__paint_frames.get_components(paint_node, frame) or []:
+                if component.kind != "pen": continue
+                props = dict(component.props)
+                points = np.array(props["points"], dtype=float).reshape(-1, 2)
+                strokes.append((name, points, props["width"][0]))
+            # The preview is written around the paint frames, which write
+            # the whole frame again when the preview ends.
+            self.__paint_frames.forget(paint_node, frame)
+            preview = self.__rw_preview = \
+                ((paint_node, frame), strokes, to_rv, np.linalg.inv(to_rv), 1.0)
+
+        key, strokes, to_rv, to_itview, previous_width_scale = preview
+        matrix = to_rv @ np.asarray(matrix, dtype=float) @ to_itview
+        linear, offset = matrix[:2, :2].T, matrix[:2, 2]
+        for name, points, stroke_width in strokes:
+            if width_scale != previous_width_scale:
+                prop_util.set_property(
+                    f"{paint_node}.{name}.width", [stroke_width * width_scale])
+            rvc.setFloatProperty(
+                f"{paint_node}.{name}.points",
+                (points @ linear + offset).ravel().tolist(), True)
+        self.__rw_preview = (key, strokes, to_rv, to_itview, width_scale)
+        rvc.redraw()
+        return True
+
     def get_rw_annotation(self, clip_id, frame):
         clip = self.__session.get_clip(clip_id)
         if not clip: return
@@ -332,85 +406,50 @@ class AnnotationApiCore(QtCore.QObject):
         source_node, paint_node = self.__get_source_and_paint_node(clip_id)
         if source_node is None: return
 
-        next_id = prop_util.get_property(f"{paint_node}.paint.nextId")[0]
-        annotation_names = []
-        for annotation in annotations:
-            next_id += 1
-            if isinstance(annotation, Stroke):
-                name = f"pen:{next_id}:{frame}:{creator}"
-                annotation.set_custom_attr("rv_pen", name)
-                self.__set_stroke_properties(source_node, paint_node, annotation)
-            elif isinstance(annotation, Text):
-                name = f"text:{next_id}:{frame}:{creator}"
-                annotation.set_custom_attr("rv_text", name)
-                self.__set_text_properties(source_node, paint_node, annotation)
-            annotation_names.append(name)
-            prop_util.set_property(f"{paint_node}.paint.nextId", [next_id])
-        prop_util.append_property(f"{paint_node}.frame:{frame}.order", annotation_names)
+        smi = rvc.sourceMediaInfo(source_node)
+        width, height = smi["width"], smi["height"]
+        annotations = [
+            annotation for annotation in annotations \
+            if isinstance(annotation, (Stroke, Text))]
+        components = [
+            self.__get_paint_component(annotation, creator, width, height) \
+            for annotation in annotations]
+        names = self.__paint_frames.append(paint_node, frame, components)
+        self.__set_rv_names(annotations, names)
 
     def __redraw_annotations(self, source_node, paint_node, frame, annotations):
-        self.__delete_all_annotations(paint_node, frame)
-        next_id = prop_util.get_property(f"{paint_node}.paint.nextId")[0]
-        annotation_names = []
+        smi = rvc.sourceMediaInfo(source_node)
+        width, height = smi["width"], smi["height"]
+        feedback = self.__session.viewport.feedback
+        visible = []
+        components = []
         for annotation in annotations:
             creator = annotation.creator
             if not annotation.is_visible: continue
             for annotation in annotation.annotations:
                 if isinstance(annotation, Stroke):
-                    if self.__session.viewport.feedback.are_strokes_visible:
-                        next_id += 1
-                        name = f"pen:{next_id}:{frame}:{creator}"
-                        annotation_names.append(name)
-                        annotation.set_custom_attr("rv_pen", name)
-                        self.__set_stroke_properties(
-                            source_node, paint_node, annotation)
+                    if not feedback.are_strokes_visible: continue
                 elif isinstance(annotation, Text):
-                    if self.__session.viewport.feedback.are_texts_visible:
-                        next_id += 1
-                        name = f"text:{next_id}:{frame}:{creator}"
-                        annotation_names.append(name)
-                        annotation.set_custom_attr("rv_text", name)
-                        self.__set_text_properties(
-                            source_node, paint_node, annotation)
-                prop_util.set_property(f"{paint_node}.paint.nextId", [next_id])
-        prop_util.append_property(f"{paint_node}.frame:{frame}.order", annotation_names)
-
-    def __set_stroke_properties(self, source_node, paint_node, stroke):
-        smi = rvc.sourceMediaInfo(source_node)
-        width, height = smi["width"], smi["height"]
-        name = stroke.get_custom_attr("rv_pen")
-        prop_util.set_property(
-                f"{paint_node}.{name}.width",
-                [image_to_rv(width, height, stroke.width)])
-        prop_util.set_property(
-            f"{paint_node}.{name}.color",
-            [stroke.color.__getstate__()])
-        prop_util.set_property(
-            f"{paint_node}.{name}.brush", [stroke.brush])
-        prop_util.set_property(
-            f"{paint_node}.{name}.mode", [stroke.mode])
-        prop_util.set_property(
-            f"{paint_node}.{name}.points",
-            [itview_to_rv(width, height, *point.__getstate__()) \
-                for point in stroke.points])
-
-    def __set_text_properties(self, source_node, paint_node, text):
-        smi = rvc.sourceMediaInfo(source_node)
-        width, height = smi["width"], smi["height"]
-        name = text.get_custom_attr("rv_text")
-        prop_util.set_property(
-            f"{paint_node}.{name}.text", [text.text])
-        prop_util.set_property(
-            f"{paint_node}.{name}.color",
-            [text.color.__getstate__()])
-        prop_util.set_property(
-            f"{paint_node}.{name}.position",
-            [itview_to_rv(
-                width, height,
-                *text.position.__getstate__())])
-        prop_util.set_property(
-            f"{paint_node}.{name}.size",
-            [image_to_rv(width, height, text.size)])
+                    if not feedback.are_texts_visible: continue
+                else:
+                    continue
+                visible.append(annotation)
+                components.append(self.__get_paint_component(
+                    annotation, creator, width, height))
+        names = self.__paint_frames.write(paint_node, frame, components)
+        self.__set_rv_names(visible, names)
+
+    def __get_paint_component(self, annotation, creator, width, height):
+        if isinstance(annotation, Stroke):
+            return PaintComponent.from_stroke(annotation, creator, width, height)
+        return PaintComponent.from_text(annotation, creator, width, height)
+
+    def __set_rv_names(self, annotations, names):
+        for annotation, name in zip(annotations, names):
+            if isinstance(annotation, Stroke):
+                annotation.set_custom_attr("rv_pen", name)
+            else:
+                annotation.set_custom_attr("rv_text", name)
 
     def render(self, event):
         current_clip_id = self.__session.viewport.current_clip
@@ -623,20 +662,44 @@ class AnnotationApiCore(QtCore.QObject):
         return stack_node, paint_node
 
     def __delete_all_annotations(self, paint_node, frame):
-        for name in prop_util.get_property(f"{paint_node}.frame:{frame}.order"):
-            if "pen" in name:
-                prop_util.delete_property(f"{paint_node}.{name}.width")
-                prop_util.delete_property(f"{paint_node}.{name}.color")
-                prop_util.delete_property(f"{paint_node}.{name}.brush")
-                prop_util.delete_property(f"{paint_node}.{name}.mode")
-                prop_util.delete_property(f"{paint_node}.{name}.points")
-            if "text" in name:
-                prop_util.delete_property(f"{paint_node}.{name}.text")
-                prop_util.delete_property(f"{paint_node}.{name}.color")
-                prop_util.delete_property(f"{paint_node}.{name}.position")
-                prop_util.delete_property(f"{paint_node}.{name}.size")
-            prop_util.delete_property(f"{paint_node}.{name}")
-        prop_util.delete_property(f"{paint_node}.frame:{frame}.order")
+        self.__paint_frames.clear(paint_node, frame)
+
+    def __get_resolution(self, source_node):
+        resolution = self.__resolutions.get(source_node)
+        if resolution is None:
+            smi = rvc.sourceMediaInfo(source_node)
+            resolution = self.__resolutions[source_node] = \
+                (smi["width"], smi["height"])
+        return resolution
+
+    def __flush_transient_strokes(self):
+        if self.__transient_strokes.flush(self.__write_transient_stroke):
+            rvc.redraw()
+
+    def __write_transient_stroke(self, stroke):
+        paint_node, name = stroke.paint_node, stroke.name
+        prop = f"{paint_node}.{name}.points"
+        # The paint node frame could have been redrawn since the last flush
+        is_new = stroke.num_written == 0 or not rvc.propertyExists(prop)
+        if is_new or stroke.style != stroke.written_style:
+            width, color, brush, mode = stroke.style
+            prop_util.set_property(f"{paint_node}.{name}.width", [width])
+            prop_util.set_property(f"{paint_node}.{name}.color", [color])
+            prop_util.set_property(f"{paint_node}.{name}.brush", [brush])
+            prop_util.set_property(f"{paint_node}.{name}.mode", [mode])
+        if is_new:
+            if not rvc.propertyExists(prop):
+                rvc.newProperty(prop, rvc.FloatType, 2)
+            rvc.setFloatProperty(prop, stroke.points, True)
+        else:
+            rvc.insertFloatProperty(
+                prop, stroke.points[stroke.num_written:])
+        # Redrawing the paint node frame rewrites its order without the
+        # stroke even when its points are kept, so it is checked on every
+        # flush
+        order = f"{paint_node}.frame:{stroke.frame}.order"
+        if name not in prop_util.get_property(order):
+            prop_util.append_property(order, [name])
 
     def __get_transient_stroke_name(self, paint_node, frame, token, create=False):
         transient_token = f":transient:{token}"
@@ -7,6 +7,7 @@ try:
     from PySide2 import QtCore
 except ImportError:
     from PySide6 import QtCore
+from rpa.open_rv.rpa_core.api.gpu_resources import GpuResourcePool
 from rpa.open_rv.rpa_core.api.utils import itview_to_rv
 from rpa.session_state.color_corrections import ColorTimer, Grade
 from rpa.session_state.utils import itview_to_screen
@@ -167,8 +168,8 @@ class ColorApiCore(QtCore.QObject):
         super().__init__()
         self.__session = session
 
-        self.__ssbo = None
-        self.__textures = []
+        self.__gpu_resources = GpuResourcePool(GL)
+        self.__ssbo_binding_index = None
 
         if platform.system() == "Darwin":
             # Dont setup the shaders if we are on OSX, we need to get them re-written :(
@@ -546,42 +547,11 @@ class ColorApiCore(QtCore.QObject):
         source = sources[0]
         return source
 
-    def __create_fbo_and_textures(self, width, height):
-        fbo = GL.glGenFramebuffers(1)
+    def __bind_render_targets(self, width, height):
+        fbo, _, blur_texture = \
+            self.__gpu_resources.get_render_targets(width, height)
         GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, fbo)
 
-        stencil_texture = GL.glGenTextures(1)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, stencil_texture)
-        GL.glTexImage2D(
-            GL.GL_TEXTURE_2D,
-            0,
-            GL.GL_DEPTH24_STENCIL8,
-            width,
-            height,
-            0,
-            GL.GL_DEPTH_STENCIL,
-            GL.GL_UNSIGNED_INT_24_8,
-            None)
-        GL.glFramebufferTexture2D(
-            GL.GL_FRAMEBUFFER,
-            GL.GL_STENCIL_ATTACHMENT,
-            GL.GL_TEXTURE_2D,
-            stencil_texture,
-            0)
-
-        blur_texture = GL.glGenTextures(1)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, blur_texture)
-        GL.glTexImage2D(
-            GL.GL_TEXTURE_2D,
-            0,
-            GL.GL_RGBA,
-            width,
-            height,
-            0,
-            GL.GL_RGBA,
-            GL.GL_FLOAT,
-            None)
-
         GL.glViewport(0, 0, width, height)
         GL.glMatrixMode(GL.GL_PROJECTION)
         GL.glLoadIdentity()
@@ -590,7 +560,7 @@ class ColorApiCore(QtCore.QObject):
         GL.glLoadIdentity()
         GL.glColor(1.0, 1.0, 1.0)
 
-        return fbo, stencil_texture, blur_texture
+        return blur_texture
 
     def __render_polygon(self, width, height, points):
         GL.glBegin(GL.GL_POLYGON)
@@ -716,13 +686,50 @@ class ColorApiCore(QtCore.QObject):
                         *node.multiply,
                         *node.gamma,
                         mute))
-        self.__ssbo = GL.glGenBuffers(1)
-        GL.glBindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__ssbo)
-        GL.glBufferData(GL.GL_SHADER_STORAGE_BUFFER, len(data), bytes(data), GL.GL_STATIC_DRAW)
-        # Check if binding point 16 is valid before binding
-        max_bindings = GL.glGetIntegerv(GL.GL_MAX_SHADER_STORAGE_BUFFER_BINDINGS)
-        binding_index = min(16, max_bindings - 1)
-        GL.glBindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, binding_index, self.__ssbo)
+        if self.__ssbo_binding_index is None:
+            # Check if binding point 16 is valid before binding
+            max_bindings = GL.glGetIntegerv(GL.GL_MAX_SHADER_STORAGE_BUFFER_BINDINGS)
+            self.__ssbo_binding_index = min(16, max_bindings - 1)
+        # The data is only uploaded again when the ccs changed
+        self.__gpu_resources.upload_ssbo(bytes(data), self.__ssbo_binding_index)
+
+    def __get_mask_key(self, region, width, height):
+        shapes = tuple(
+            tuple(point.__getstate__() for point in shape.points) \
+            for shape in region.shapes)
+        return (shapes, region.falloff, width, height)
+
+    def __render_mask(self, width, height, region, texture, blur_texture):
+        GL.glUseProgram(0)
+        GL.glFramebufferTexture2D(
+            GL.GL_FRAMEBUFFER,
+            GL.GL_COLOR_ATTACHMENT0,
+            GL.GL_TEXTURE_2D,
+            texture,
+            0)
+
+        GL.glClearColor(0.0, 0.0, 0.0, 0.0)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+
+        for shape in region.shapes:
+            points = [point.__getstate__() for point in shape.points]
+            points = [itview_to_rv(width, height, *point) for point in points]
+            if not points:
+                continue
+
+            # draw polygon with stencil test
+            self.__render_polygon_with_stencil_test(width, height, points)
+
+        if not region.shapes:
+            points = [
+                itview_to_rv(width, height, -10.0, -10.0),
+                itview_to_rv(width, height, +10.0, -10.0),
+                itview_to_rv(width, height, +10.0, +10.0),
+                itview_to_rv(width, height, -10.0, +10.0)]
+            self.__render_polygon_with_stencil_test(width, height, points)
+
+        # apply blur
+        self.__apply_blur(width, height, texture, blur_texture, region.falloff)
 
     def __get_source_resolution(self, source):
         smi = rvc.sourceMediaInfo(source)
@@ -761,53 +768,19 @@ class ColorApiCore(QtCore.QObject):
         if not ccs: return
         try:
             width, height = self.__get_source_resolution(source)
-            fbo, stencil_texture, blur_texture = None, None, None
-            fbo, stencil_texture, blur_texture = self.__create_fbo_and_textures(width, height)
+            mask_keys = {
+                index: self.__get_mask_key(cc.region, width, height) \
+                for index, cc in enumerate(ccs) if cc.region}
+            blur_texture = None
             for index, cc in enumerate(ccs):
                 if not cc.region: continue
-                GL.glUseProgram(0)
-                texture = GL.glGenTextures(1)
-                self.__textures.append(texture)
-                GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
-                GL.glTexImage2D(
-                    GL.GL_TEXTURE_2D,
-                    0,
-                    GL.GL_RGBA,
-                    width,
-                    height,
-                    0,
-                    GL.GL_RGBA,
-                    GL.GL_FLOAT,
-                    None)
-                GL.glFramebufferTexture2D(
-                    GL.GL_FRAMEBUFFER,
-                    GL.GL_COLOR_ATTACHMENT0,
-                    GL.GL_TEXTURE_2D,
-                    texture,
-                    0)
-
-                GL.glClearColor(0.0, 0.0, 0.0, 0.0)
-                GL.glClear(GL.GL_COLOR_BUFFER_BIT)
-
-                for shape in cc.region.shapes:
-                    points = [point.__getstate__() for point in shape.points]
-                    points = [itview_to_rv(width, height, *point) for point in points]
-                    if not points:
-                        continue
-
-                    # draw polygon with stencil test
-                    self.__render_polygon_with_stencil_test(width, height, points)
-
-                if not cc.region.shapes:
-                    points = [
-                        itview_to_rv(width, height, -10.0, -10.0),
-                        itview_to_rv(width, height, +10.0, -10.0),
-                        itview_to_rv(width, height, +10.0, +10.0),
-                        itview_to_rv(width, height, -10.0, +10.0)]
-                    self.__render_polygon_with_stencil_test(width, height, points)
-
-                # apply blur
-                self.__apply_blur(width, height, texture, blur_texture, cc.region.falloff)
+                # Masks are cached so only new or changed regions are rendered
+                texture, is_new = self.__gpu_resources.get_mask(
+                    mask_keys[index], width, height, mask_keys.values())
+                if is_new:
+                    if blur_texture is None:
+                        blur_texture = self.__bind_render_targets(width, height)
+                    self.__render_mask(width, height, cc.region, texture, blur_texture)
 
                 # assign texture to a texture unit
                 self.__set_texture_unit(texture, GL.GL_TEXTURE0 + 16 + index)
@@ -818,15 +791,6 @@ class ColorApiCore(QtCore.QObject):
             GL.glUseProgram(0)
             GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
             GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-            if fbo is not None:
-                GL.glDeleteFramebuffers(1, [fbo])
-                fbo = None
-            if stencil_texture is not None:
-                GL.glDeleteTextures([stencil_texture])
-                stencil_texture = None
-            if blur_texture is not None:
-                GL.glDeleteTextures([blur_texture])
-                blur_texture = None
 
             # reset viewport and projections
             domain = event.domain()
@@ -908,15 +872,10 @@ class ColorApiCore(QtCore.QObject):
 
     def post_render(self, event):
         """
-        This function is triggered by the "post-render" RV's event. It cleans up the resources.
+        This function is triggered by the "post-render" RV's event. The
+        resources are kept for the next frames and only unbound.
         """
-        if self.__ssbo is not None:
-            GL.glBindBuffer(GL.GL_SHADER_STORAGE_BUFFER, 0)
-            GL.glDeleteBuffers(1, [self.__ssbo])
-            self.__ssbo = None
-        if self.__textures:
-            GL.glDeleteTextures(self.__textures)
-            self.__textures = []
+        GL.glBindBuffer(GL.GL_SHADER_STORAGE_BUFFER, 0)
 
     def __set_color_channel_mode(self, mode):
         groups = rvc.nodesOfType("RVViewPipelineGroup")
@@ -945,6 +904,7 @@ class ColorApiCore(QtCore.QObject):
         """
         Destructor to clean up resources.
         """
+        self.__gpu_resources.release()
         if self.__blur_shader_program is not None:
             GL.glDeleteProgram(self.__blur_shader_program)
             self.__blur_shader_program = None
@@ -0,0 +1,79 @@
+"""File with helper methods to build the EDL of an RV sequence"""
+import numpy as np
+from itertools import chain
+from typing import List, Tuple
+
+
+def build_edl(source_frame_maps)->Tuple[List[int], List[int], List[int], List[int]]:
+    """
+    Build the EDL of a sequence of clips. Each run of consecutive or
+    repeated source frames of a clip becomes one entry of the EDL.
+
+    Args:
+        source_frame_maps (List[FrameMap]):
+            Source frame map of each clip in sequence order
+
+    Returns:
+        Tuple[List[int], List[int], List[int], List[int]]:
+            The frame, source, in and out lists of the EDL, including the
+            last bound of the EDL.
+    """
+    num_of_runs = np.fromiter(
+        (len(frame_map.runs) for frame_map in source_frame_maps),
+        dtype=np.int64, count=len(source_frame_maps))
+    runs = np.fromiter(
+        chain.from_iterable(chain.from_iterable(
+            frame_map.runs for frame_map in source_frame_maps)),
+        dtype=np.int64, count=3 * int(num_of_runs.sum())).reshape(-1, 3)
+    first, length, step = runs.T
+
+    # The sequence frame at which each run starts
+    frame = np.cumsum(length) - length + 1
+    source = np.repeat(
+        np.arange(len(source_frame_maps), dtype=np.int64), num_of_runs)
+    out = first + (length - 1) * step
+
+    # EDL last bound
+    last_frame = int(length.sum()) + 1
+    return \
+        frame.tolist() + [last_frame], source.tolist() + [0], \
+        first.tolist() + [0], out.tolist() + [0]
+
+
+class EdlBuilder:
+    """
+    Builds the EDL of sequences of clips, and remembers the EDLs of the
+    last few sequences it has built, so that an EDL is only rebuilt when
+    the clips of its sequence or the frames of those clips change.
+    """
+    MAX_CACHED_EDLS = 8
+
+    def __init__(self):
+        # clip ids -> (source frame maps, edl)
+        self.__edls = {}
+
+    def build(self, clips)->Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Get the EDL of the given clips.
+
+        Args:
+            clips (List[Tuple[str, FrameMap]]):
+                Id and source frame map of each clip in sequence order
+
+        Returns:
+            Tuple[List[int], List[int], List[int], List[int]]:
+                The frame, source, in and out lists of the EDL, including
+                the last bound of the EDL.
+        """
+        clip_ids = tuple(clip_id for clip_id, _ in clips)
+        frame_maps = [frame_map for _, frame_map in clips]
+        cached = self.__edls.pop(clip_ids, None)
+        # Frame maps are replaced whenever the frames of a clip change
+        if cached is None or any(
+            frame_map is not cached_frame_map for frame_map, cached_frame_map \
+            in zip(frame_maps, cached[0])):
+            cached = (frame_maps, build_edl(frame_maps))
+        self.__edls[clip_ids] = cached
+        if len(self.__edls) > self.MAX_CACHED_EDLS:
+            del self.__edls[next(iter(self.__edls))]
+        return tuple(list(values) for values in cached[1])
@@ -0,0 +1,152 @@
+"""File with the pool of the GPU resources used to render color corrections"""
+from collections import OrderedDict
+from typing import Hashable, Iterable, Tuple
+
+
+class GpuResourcePool:
+    """
+    Keeps the GPU resources of the color corrections alive from one frame
+    to the next instead of creating and deleting them every frame.
+
+    - The framebuffer with its stencil and blur textures is kept for as
+      long as the resolution it was created for does not change.
+    - Region masks are cached by a key that identifies everything they are
+      rendered from, like the shapes, falloff and resolution of the region.
+      At most MAX_CACHED_MASKS masks are kept, the least recently used
+      ones being deleted first, except for the masks used by the frame
+      being rendered.
+    - A single shader storage buffer is reused and its data is only
+      uploaded again when it changes.
+
+    All GL calls go through the given gl module, so that the lifetime of
+    the resources can be tracked with a fake one.
+    """
+    MAX_CACHED_MASKS = 8
+
+    def __init__(self, gl):
+        self.__gl = gl
+        self.__render_targets = None # (width, height, fbo, stencil, blur)
+        self.__masks = OrderedDict() # key -> texture
+        self.__ssbo = None
+        self.__ssbo_data = None
+        self.__ssbo_size = 0
+
+    @property
+    def num_masks(self)->int:
+        return len(self.__masks)
+
+    def get_render_targets(self, width:int, height:int)->Tuple[int, int, int]:
+        """
+        Get the framebuffer, stencil texture and blur texture to render
+        masks of the given resolution with, creating them if needed.
+        """
+        gl = self.__gl
+        if self.__render_targets is not None:
+            target_width, target_height, fbo, stencil, blur = \
+                self.__render_targets
+            if (target_width, target_height) == (width, height):
+                return fbo, stencil, blur
+            self.__delete_render_targets()
+
+        fbo = gl.glGenFramebuffers(1)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, fbo)
+
+        stencil = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, stencil)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D, 0, gl.GL_DEPTH24_STENCIL8, width, height, 0,
+            gl.GL_DEPTH_STENCIL, gl.GL_UNSIGNED_INT_24_8, None)
+        gl.glFramebufferTexture2D(
+            gl.GL_FRAMEBUFFER, gl.GL_STENCIL_ATTACHMENT, gl.GL_TEXTURE_2D,
+            stencil, 0)
+
+        blur = self.__create_texture(width, height)
+        self.__render_targets = (width, height, fbo, stencil, blur)
+        return fbo, stencil, blur
+
+    def get_mask(
+        self, key:Hashable, width:int, height:int,
+        in_use:Iterable[Hashable]=())->Tuple[int, bool]:
+        """
+        Get the mask texture of the given key, creating one of the given
+        resolution if there is none.
+
+        Args:
+            key (Hashable): Key of the mask
+            width (int): Width of the mask
+            height (int): Height of the mask
+
+        Kwargs:
+            in_use (Iterable[Hashable]): Keys of the other masks that are
+                used by the frame being rendered, which are not evicted
+
+        Returns:
+            (Tuple[int, bool]): The texture and whether it was created, in
+                which case the mask needs to be rendered into it
+        """
+        texture = self.__masks.get(key)
+        if texture is not None:
+            self.__masks.move_to_end(key)
+            return texture, False
+        in_use = set(in_use)
+        for old_key in list(self.__masks):
+            if len(self.__masks) < self.MAX_CACHED_MASKS: break
+            if old_key in in_use: continue
+            self.__gl.glDeleteTextures([self.__masks.pop(old_key)])
+        texture = self.__masks[key] = self.__create_texture(width, height)
+        return texture, True
+
+    def upload_ssbo(self, data:bytes, binding_index:int)->bool:
+        """
+        Bind the shader storage buffer to the given binding index, after
+        uploading the given data to it if it changed since the last upload.
+
+        Returns:
+            (bool): True if the data was uploaded
+        """
+        gl = self.__gl
+        if self.__ssbo is None:
+            self.__ssbo = gl.glGenBuffers(1)
+        gl.glBindBuffer(gl.GL_SHADER_STORAGE_BUFFER, self.__ssbo)
+        is_uploaded = data != self.__ssbo_data
+        if is_uploaded:
+            if len(data) == self.__ssbo_size:
+                gl.glBufferSubData(gl.GL_SHADER_STORAGE_BUFFER, 0, len(data), data)
+            else:
+                gl.glBufferData(
+                    gl.GL_SHADER_STORAGE_BUFFER, len(data), data, gl.GL_DYNAMIC_DRAW)
+                self.__ssbo_size = len(data)
+            self.__ssbo_data = data
+        gl.glBindBufferBase(gl.GL_SHADER_STORAGE_BUFFER, binding_index, self.__ssbo)
+        return is_uploaded
+
+    def release(self):
+        """
+        Delete all the resources of the pool.
+        """
+        gl = self.__gl
+        self.__delete_render_targets()
+        if self.__masks:
+            gl.glDeleteTextures(list(self.__masks.values()))
+            self.__masks.clear()
+        if self.__ssbo is not None:
+            gl.glDeleteBuffers(1, [self.__ssbo])
+            self.__ssbo = None
+            self.__ssbo_data = None
+            self.__ssbo_size = 0
+
+    def __create_texture(self, width, height):
+        gl = self.__gl
+        texture = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, width, height, 0,
+            gl.GL_RGBA, gl.GL_FLOAT, None)
+        return texture
+
+    def __delete_render_targets(self):
+        if self.__render_targets is None: return
+        _, _, fbo, stencil, blur = self.__render_targets
+        self.__gl.glDeleteFramebuffers(1, [fbo])
+        self.__gl.glDeleteTextures([stencil, blur])
+        self.__render_targets = None
@@ -0,0 +1,244 @@
+"""File with helper classes to keep the annotations of RV paint nodes in sync"""
+import numpy as np
+from typing import List, Optional, Tuple
+from rpa.session_state.annotations import PointArray
+from rpa.open_rv.rpa_core.api.utils import image_to_rv, itview_to_rv
+
+
+class PaintComponent:
+    """
+    Properties of a single pen or text component of a paint node, in the
+    order in which they are written.
+    """
+    __slots__ = ("kind", "creator", "props", "__key")
+
+    def __init__(self, kind:str, creator:str, props:List[Tuple[str, list]]):
+        self.kind = kind
+        self.creator = creator
+        self.props = props
+        self.__key = None
+
+    @classmethod
+    def from_stroke(cls, stroke, creator, width, height)->"PaintComponent":
+        points = stroke.points
+        if not isinstance(points, PointArray): points = PointArray(points)
+        xy = points.xy
+        return cls("pen", creator, [
+            ("width", [image_to_rv(width, height, stroke.width)]),
+            ("color", [stroke.color.__getstate__()]),
+            ("brush", [stroke.brush]),
+            ("mode", [stroke.mode]),
+            ("points", np.column_stack(
+                itview_to_rv(width, height, xy[:, 0], xy[:, 1])).tolist())])
+
+    @classmethod
+    def from_text(cls, text, creator, width, height)->"PaintComponent":
+        return cls("text", creator, [
+            ("text", [text.text]),
+            ("color", [text.color.__getstate__()]),
+            ("position", [itview_to_rv(
+                width, height, *text.position.__getstate__())]),
+            ("size", [image_to_rv(width, height, text.size)])])
+
+    @property
+    def key(self):
+        # Components with the same key draw the same thing
+        if self.__key is None:
+            self.__key = (self.kind, self.creator, tuple(
+                (suffix, _freeze(values)) for suffix, values in self.props))
+        return self.__key
+
+
+def _freeze(values):
+    return tuple(
+        _freeze(value) if isinstance(value, (list, tuple)) else value \
+        for value in values)
+
+
+class PaintFrames:
+    """
+    Writes the components of paint node frames and remembers what was
+    written, so that redrawing a frame only writes the components that
+    changed since its last redraw.
+
+    The paint properties are read and written through the given store,
+    which needs the get_property, set_property and delete_property
+    functions of prop_util.
+    """
+
+    def __init__(self, store):
+        self.__store = store
+        # (paint node, frame) -> [(name, component)] in paint order
+        self.__frames = {}
+
+    def write(
+        self, paint_node:str, frame:int,
+        components:List[PaintComponent])->List[str]:
+        """
+        Make the given components the only components of the paint node
+        frame. Unchanged components are left as they are, changed ones
+        are rewritten in place and the rest are added or deleted.
+
+        Args:
+            paint_node (str): Name of the RV paint node
+            frame (int): Frame of the paint node
+            components (List[PaintComponent]): Components in paint order
+
+        Returns:
+            (List[str]): Name of each of the given components
+        """
+        key = (paint_node, frame)
+        old_entries = self.__get_entries(paint_node, frame)
+        if old_entries is None:
+            # What the frame has is unknown so it is cleared first
+            self.clear(paint_node, frame)
+            old_entries = []
+
+        unchanged = {}
+        for entry in old_entries:
+            unchanged.setdefault(entry[1].key, []).append(entry)
+        entries = [None] * len(components)
+        changed = []
+        for index, component in enumerate(components):
+            same_entries = unchanged.get(component.key)
+            if same_entries:
+                entries[index] = same_entries.pop(0)
+            else:
+                changed.append(index)
+
+        # Left over components of the same kind and creator are reused
+        reusable = {}
+        for same_entries in unchanged.values():
+            for name, component in same_entries:
+                reusable.setdefault(
+                    (component.kind, component.creator), []).append(
+                        (name, component))
+        next_id = None
+        for index in changed:
+            component = components[index]
+            reused = reusable.get((component.kind, component.creator))
+            if reused:
+                name, old_component = reused.pop(0)
+                self.__write_props(paint_node, name, component, old_component)
+            else:
+                if next_id is None: next_id = self.__get_next_id(paint_node)
+                next_id += 1
+                name = f"{component.kind}:{next_id}:{frame}:{component.creator}"
+                self.__write_props(paint_node, name, component)
+            entries[index] = (name, component)
+        if next_id is not None:
+            self.__store.set_property(f"{paint_node}.paint.nextId", [next_id])
+
+        for reused in reusable.values():
+            for name, component in reused:
+                self.__delete_props(paint_node, name, component)
+
+        names = [name for name, _ in entries]
+        if names != [name for name, _ in old_entries]:
+            self.__store.set_property(
+                f"{paint_node}.frame:{frame}.order", names)
+        self.__frames[key] = entries
+        return names
+
+    def append(
+        self, paint_node:str, frame:int,
+        components:List[PaintComponent])->List[str]:
+        """
+        Append the given components after the current components of the
+        paint node frame.
+
+        Returns:
+            (List[str]): Name of each of the given components
+        """
+        next_id = self.__get_next_id(paint_node)
+        entries = []
+        for component in components:
+            next_id += 1
+            name = f"{component.kind}:{next_id}:{frame}:{component.creator}"
+            self.__write_props(paint_node, name, component)
+            self.__store.set_property(f"{paint_node}.paint.nextId", [next_id])
+            entries.append((name, component))
+        names = [name for name, _ in entries]
+        order = f"{paint_node}.frame:{frame}.order"
+        self.__store.set_property(
+            order, self.__store.get_property(order) + names)
+        old_entries = self.__frames.get((paint_node, frame))
+        if old_entries is not None:
+            old_entries.extend(entries)
+        return names
+
+    def update(
+        self, paint_node:str, frame:int, name:str, component:PaintComponent):
+        """
+        Rewrite the changed properties of the named component of the paint
+        node frame.
+        """
+        entries = self.__frames.get((paint_node, frame), [])
+        for index, (entry_name, old_component) in enumerate(entries):
+            if entry_name == name:
+                self.__write_props(paint_node, name, component, old_component)
+                entries[index] = (name, component)
+                return
+        self.__write_props(paint_node, name, component)
+
+    def get_components(
+        self, paint_node:str, frame:int)->Optional[List[Tuple[str, PaintComponent]]]:
+        """
+        Get the name and component of each component that was written to
+        the paint node frame, or None if nothing is known about the frame.
+        """
+        entries = self.__frames.get((paint_node, frame))
+        return None if entries is None else list(entries)
+
+    def clear(self, paint_node:str, frame:int):
+        """
+        Delete all the components of the paint node frame.
+        """
+        for name in self.__store.get_property(
+            f"{paint_node}.frame:{frame}.order"):
+            suffixes = []
+            if "pen" in name:
+                suffixes.extend(("width", "color", "brush", "mode", "points"))
+            if "text" in name:
+                suffixes.extend(("text", "color", "position", "size"))
+            for suffix in suffixes:
+                self.__store.delete_property(f"{paint_node}.{name}.{suffix}")
+            self.__store.delete_property(f"{paint_node}.{name}")
+        self.__store.delete_property(f"{paint_node}.frame:{frame}.order")
+        self.__frames[(paint_node, frame)] = []
+
+    def forget(self, paint_node:Optional[str]=None, frame:Optional[int]=None):
+        """
+        Forget what was written to the given frame of the given paint node,
+        to all the frames of the given paint node or to all paint nodes,
+        so that those frames are cleared before they are written again.
+        """
+        if paint_node is None:
+            self.__frames.clear()
+        elif frame is not None:
+            self.__frames.pop((paint_node, frame), None)
+        else:
+            for key in [key for key in self.__frames if key[0] == paint_node]:
+                del self.__frames[key]
+
+    def __get_entries(self, paint_node, frame):
+        entries = self.__frames.get((paint_node, frame))
+        # The paint node could have been deleted and created again
+        if entries and not self.__store.get_property(
+            f"{paint_node}.frame:{frame}.order"):
+            return None
+        return entries
+
+    def __get_next_id(self, paint_node):
+        return self.__store.get_property(f"{paint_node}.paint.nextId")[0]
+
+    def __write_props(self, paint_node, name, component, old_component=None):
+        old_props = dict(old_component.props) if old_component else {}
+        for suffix, values in component.props:
+            if old_props.get(suffix) != values:
+                self.__store.set_property(f"{paint_node}.{name}.{suffix}", values)
+
+    def __delete_props(self, paint_node, name, component):
+        for suffix, _ in component.props:
+            self.__store.delete_property(f"{paint_node}.{name}.{suffix}")
+        self.__store.delete_property(f"{paint_node}.{name}")
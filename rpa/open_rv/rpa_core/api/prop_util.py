@@ -1,4 +1,5 @@
 """File with helper method related to property getters/setters"""
+from itertools import chain
 from rv import commands as rvc
 
 
@@ -53,7 +54,7 @@ def set_property(prop, values):
     width = 1
     if isinstance(value, list):
         width = len(value)
-        values = sum(values, [])
+        values = list(chain.from_iterable(values))
         value = value[0]
     if isinstance(value, int):
         return _(rvc.IntType, width, rvc.setIntProperty)
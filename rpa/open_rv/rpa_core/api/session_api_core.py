@@ -6,9 +6,12 @@ except ImportError:
 from rv import commands, runtime, extra_commands
 from typing import List, Any
 from rpa.open_rv.rpa_core.api import prop_util
+from rpa.open_rv.rpa_core.api.edl_util import EdlBuilder
 from rpa.open_rv.rpa_core.api.clip_attr_api_core.clip_attr_api_core \
     import ClipAttrApiCore
 from pymu import MuSymbol
+from rpa.session_state import clips_snapshot
+import uuid
 
 class SessionApiCore(QtCore.QObject):
     SIG_PLAYLISTS_MODIFIED = QtCore.Signal()
@@ -41,13 +44,15 @@ class SessionApiCore(QtCore.QObject):
     PRG_SET_ATTR_VALUE = QtCore.Signal(int, int) # progress_cnt, total_cnt
     PRG_SET_ATTR_VALUES_COMPLETED = QtCore.Signal()
 
-    def __init__(self, session, annotation_api):
+    def __init__(self, session, annotation_api, color_api):
         super().__init__()
         self.__session = session
         self.__annotation_api = annotation_api
+        self.__color_api = color_api
         self.__clip_attr_api = ClipAttrApiCore.get_instance()
         self.__clip_attr_api.init(session)
         self.__core_attrs = set()
+        self.__edl_builder = EdlBuilder()
         self.SIG_PLAYLISTS_MODIFIED.connect(self.__playlists_modified)
         self.SIG_CURRENT_CLIP_CHANGED.connect(self.__clip_changed)
         self._init()
@@ -241,10 +246,21 @@ class SessionApiCore(QtCore.QObject):
         return value
 
     def get_default_attr_value(self, id):
-        value = self.__session.attrs_metadata.get_default_value(id)
-        if self.__session.attrs_metadata.is_keyable(id):
-            value = {'value': value, 'key_values': {}, 'frame_values': {}}
-        return value
+        return self.__session.attrs_metadata.get_default_attr_value(id)
+
+    def get_attr_column(self, playlist_id, attr_id):
+        playlist = self.__session.get_playlist(playlist_id)
+        if playlist is None: return []
+        column = playlist.get_attr_column(attr_id)
+        if None not in column: return column
+        if self.__session.attrs_metadata.is_keyable(attr_id):
+            # keyable defaults are dicts, so each clip gets its own
+            return [
+                self.get_default_attr_value(attr_id) if value is None \
+                else value for value in column]
+        default_value = self.get_default_attr_value(attr_id)
+        return [
+            default_value if value is None else value for value in column]
 
     def create_clips(self, playlist_id, paths, index, ids):
         for id in ids:
@@ -456,6 +472,54 @@ class SessionApiCore(QtCore.QObject):
     def get_custom_clip_attr_ids(self, clip_id)->List[str]:
         return self.__session.get_custom_clip_attr_ids(clip_id)
 
+    def get_clips_snapshot(self, clip_ids, attr_ids):
+        return clips_snapshot.get_clips_snapshot(
+            self.__session, clip_ids, attr_ids)
+
+    def restore_clips_snapshot(self, playlist_id, snapshot, index, ids):
+        clips_data = list(snapshot.values())
+        paths = [clip_data["attrs"]["media_path"] for clip_data in clips_data]
+        ids = self.create_clips(playlist_id, paths, index, ids)
+        if not ids: return []
+
+        attr_values = []
+        ro_annos = {}
+        rw_annos = {}
+        ro_ccs = {}
+        rw_ccs = {}
+        for clip_id, clip_data in zip(ids, clips_data):
+            clip = self.__session.get_clip(clip_id)
+
+            for attr_id, value in clip_data.get("attrs", {}).items():
+                if attr_id == "media_path": continue
+                attr_values.append((playlist_id, clip_id, attr_id, value))
+
+            for attr_id, value in clip_data.get("custom_attrs", {}).items():
+                # Custom attrs set while creating the clip, like its rv
+                # nodes, belong to the new clip
+                if attr_id in clip.get_custom_attr_ids(): continue
+                clip.set_custom_attr(attr_id, value)
+
+            clip_ro_annos, clip_rw_annos, clip_ro_ccs, clip_rw_ccs = \
+                clips_snapshot.decode_clip_snapshot(clip_data)
+            if clip_ro_annos: ro_annos[clip_id] = clip_ro_annos
+            if clip_rw_annos: rw_annos[clip_id] = clip_rw_annos
+            for clip_ccs, ccs in ((ro_ccs, clip_ro_ccs), (rw_ccs, clip_rw_ccs)):
+                for _, cc in ccs:
+                    # The ccs of the new clip can not share ids with the
+                    # ccs of the clips they were copied from
+                    cc.id = uuid.uuid4().hex
+                if ccs: clip_ccs[clip_id] = ccs
+
+        # The batch goes to the cores directly, the delegates of these
+        # methods are not called, see SessionApi.restore_clips_snapshot
+        if attr_values: self.set_attr_values(attr_values)
+        if ro_annos: self.__annotation_api.set_ro_annotations(ro_annos)
+        if rw_annos: self.__annotation_api.set_rw_annotations(rw_annos)
+        if ro_ccs: self.__color_api.set_ro_ccs(ro_ccs)
+        if rw_ccs: self.__color_api.set_rw_ccs(rw_ccs)
+        return ids
+
     def get_attrs_metadata(self):
         self.__core_attrs.clear()
         for attr, metadata in self.__session.attrs_metadata.get_copy().items():
@@ -994,11 +1058,6 @@ class SessionApiCore(QtCore.QObject):
         seq_node_info = commands.nodeRangeInfo(seq_node)
 
         if seq_node:
-            new_frame = []
-            new_source = []
-            new_in = []
-            new_out = []
-
             active_clip_ids = playlist.active_clip_ids
 
             # Setting EDL - playlist with active clips
@@ -1007,77 +1066,14 @@ class SessionApiCore(QtCore.QObject):
                 commands.setIntProperty(f"{seq_node}.mode.autoEDL", [0])
                 commands.setIntProperty(f"{seq_node}.mode.useCutInfo", [0])
 
-                accum = 1
-                for idx, clip_id in enumerate(active_clip_ids):
+                clips = []
+                for clip_id in active_clip_ids:
                     clip = self.__session.get_clip(clip_id)
-                    src_node = clip.get_custom_attr("rv_source_group")
-                    src_info = commands.nodeRangeInfo(src_node)
-
-                    start = src_info.get("start")
-                    end = src_info.get("end")
-                    cutin = src_info.get("cutIn")
-                    cutout = src_info.get("cutOut")
-
-                    clip_start = clip.get_attr_value("media_start_frame")
-                    clip_end = clip.get_attr_value("media_end_frame")
-                    clip_keyin = clip.get_attr_value("key_in")
-                    clip_keyout = clip.get_attr_value("key_out")
                     # prepare local frame map if not available yet
-                    frame_map = clip.get_local_frame_map()
-
-                    converted_start = 1
-                    converted_end = clip_end - clip_start + 1
-                    converted_keyin = clip_keyin - clip_start + 1
-                    converted_keyout = clip_keyout - clip_start + 1
-
-                    src_frames = clip.get_source_frames()
-
-                    i = 0
-                    n = len(src_frames)
-                    total = n
-
-                    while i < n:
-                        j = i
-
-                        # consecutive
-                        while j + 1 < n and src_frames[j + 1] == src_frames[j] + 1:
-                            j += 1
-                        if j > i:
-                            new_frame.append(accum + i)
-                            new_in.append(src_frames[i])
-                            new_out.append(src_frames[j])
-                            new_source.append(idx)
-                            i = j + 1
-                            continue
-
-                        # repeats
-                        repeat = 1
-                        while j + 1 < n and src_frames[j] == src_frames[j + 1]:
-                            j += 1
-                            repeat += 1
-                        if repeat > 1:
-                            new_frame.append(accum + i)
-                            new_in.append(src_frames[i])
-                            new_out.append(src_frames[i])
-                            new_source.append(idx)
-                            i += repeat
-                            continue
-
-                        # single
-                        new_frame.append(accum + i)
-                        new_in.append(src_frames[i])
-                        new_out.append(src_frames[i])
-                        new_source.append(idx)
-                        i += 1
-
-                    accum += total
-
-
-                # EDL last bound
-                new_frame.append(accum)
-                new_source.append(0)
-                new_in.append(0)
-                new_out.append(0)
+                    clip.get_local_frame_map()
+                    clips.append((clip_id, clip.get_source_frame_map()))
+                new_frame, new_source, new_in, new_out = \
+                    self.__edl_builder.build(clips)
 
                 commands.setIntProperty(f"{seq_node}.edl.frame", new_frame, True)
                 commands.setIntProperty(f"{seq_node}.edl.source", new_source, True)
@@ -0,0 +1,118 @@
+"""File with the buffer of the transient strokes that are being drawn"""
+from typing import Callable, Optional, Tuple
+
+
+class TransientStroke:
+    """
+    Transient stroke of a paint node frame that is being drawn.
+
+    The points are kept as a flat list of RV coordinates, so appending a
+    point is amortized O(1). The points before num_written have already
+    been written to the paint node and only the ones after it need to be
+    written by the next flush.
+    """
+    __slots__ = (
+        "paint_node", "frame", "name", "style", "points",
+        "num_written", "written_style", "is_dirty")
+
+    def __init__(self, paint_node:str, frame:int, name:str):
+        self.paint_node = paint_node
+        self.frame = frame
+        self.name = name
+        self.style = None # (width, color, brush, mode)
+        self.points = []
+        self.num_written = 0
+        self.written_style = None
+        self.is_dirty = False
+
+
+class TransientStrokeBuffer:
+    """
+    Transient strokes being drawn, by paint node, frame and token.
+
+    Points are appended to the buffer as they come in and written to the
+    paint nodes by flush, which is meant to be called at most once per
+    redraw, so that the cost of a point does not depend on the length of
+    its stroke.
+    """
+
+    def __init__(self):
+        self.__strokes = {}
+        self.__num_dirty = 0
+
+    @property
+    def is_dirty(self)->bool:
+        return self.__num_dirty > 0
+
+    def get(
+        self, paint_node:str, frame:int, token:str)->Optional[TransientStroke]:
+        return self.__strokes.get((paint_node, frame, token))
+
+    def append_point(
+        self, paint_node:str, frame:int, token:str, name:str,
+        point:Tuple[float, float], style:Tuple, is_line:bool=False)->TransientStroke:
+        """
+        Append a point to the transient stroke of the given token, creating
+        the stroke with the given name if there is none yet.
+
+        Args:
+            paint_node (str): Paint node of the stroke
+            frame (int): Paint node frame of the stroke
+            token (str): Token of the stroke
+            name (str): Name of the stroke if it has to be created
+            point (Tuple[float, float]): Point in RV coordinates
+            style (Tuple): Width, color, brush and mode of the stroke
+
+        Kwargs:
+            is_line (bool): If True the point replaces all the points of
+                the stroke except the first one.
+
+        Returns:
+            (TransientStroke): The stroke that the point was appended to
+        """
+        key = (paint_node, frame, token)
+        stroke = self.__strokes.get(key)
+        if stroke is None:
+            stroke = self.__strokes[key] = \
+                TransientStroke(paint_node, frame, name)
+        stroke.style = style
+        if is_line and stroke.points:
+            del stroke.points[2:]
+            # Points that were already written are replaced
+            stroke.num_written = 0
+        stroke.points.extend(point)
+        if not stroke.is_dirty:
+            stroke.is_dirty = True
+            self.__num_dirty += 1
+        return stroke
+
+    def pop(
+        self, paint_node:str, frame:int, token:str)->Optional[TransientStroke]:
+        stroke = self.__strokes.pop((paint_node, frame, token), None)
+        if stroke is not None and stroke.is_dirty:
+            self.__num_dirty -= 1
+        return stroke
+
+    def flush(self, write:Callable[[TransientStroke], None])->int:
+        """
+        Write all the strokes that changed since the last flush.
+
+        Args:
+            write (Callable[[TransientStroke], None]):
+                Writes the given stroke to its paint node, using its
+                num_written and written_style to only write what changed.
+
+        Returns:
+            (int): Number of strokes that were written
+        """
+        if not self.__num_dirty: return 0
+        num_flushed = 0
+        for stroke in self.__strokes.values():
+            if not stroke.is_dirty: continue
+            write(stroke)
+            stroke.num_written = len(stroke.points)
+            stroke.written_style = stroke.style
+            stroke.is_dirty = False
+            num_flushed += 1
+        self.__num_dirty = 0
+        return num_flushed
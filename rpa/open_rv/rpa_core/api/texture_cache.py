@@ -0,0 +1,124 @@
+"""File with the cache of the textures of the rendered HTML overlays"""
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class TextureCache:
+    """
+    LRU cache of GL textures by key, bounded by the memory of its textures.
+
+    Textures are acquired by the overlays that show them and released when
+    the overlays show something else. Acquired textures are never deleted,
+    the least recently used of the others are deleted whenever the memory
+    of all the textures goes over max_bytes.
+
+    All GL calls go through the given gl module.
+    """
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, gl, max_bytes:int=DEFAULT_MAX_BYTES):
+        self.__gl = gl
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict() # key -> [texture, num_bytes, ref_count]
+        self.__num_bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @property
+    def stats(self)->Dict[str, int]:
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+            "textures": len(self.__entries),
+            "bytes": self.__num_bytes}
+
+    def acquire(self, key:Hashable)->Optional[int]:
+        """
+        Acquire the texture of the given key if it is cached.
+
+        Returns:
+            (Optional[int]): The texture or None if it is not cached
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        self.__entries.move_to_end(key)
+        entry[2] += 1
+        return entry[0]
+
+    def add(self, key:Hashable, texture:int, num_bytes:int)->int:
+        """
+        Add the texture of the given key to the cache and acquire it. If the
+        key already has a texture, the given one is deleted and the cached
+        one is acquired instead.
+
+        Returns:
+            (int): The acquired texture
+        """
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if entry[0] != texture:
+                self.__gl.glDeleteTextures([texture])
+            self.__entries.move_to_end(key)
+            entry[2] += 1
+            return entry[0]
+        self.__entries[key] = [texture, num_bytes, 1]
+        self.__num_bytes += num_bytes
+        self.__evict()
+        return texture
+
+    def replace(self, key:Hashable, texture:int, num_bytes:int)->Optional[int]:
+        """
+        Replace the texture of the given key, if it is cached, with the
+        given one, keeping the number of times it is acquired. The replaced
+        texture is deleted.
+
+        Returns:
+            (Optional[int]): The given texture or None if the key is not
+            cached, in which case nothing is done
+        """
+        entry = self.__entries.get(key)
+        if entry is None: return None
+        if entry[0] != texture:
+            self.__gl.glDeleteTextures([entry[0]])
+        self.__num_bytes += num_bytes - entry[1]
+        entry[0] = texture
+        entry[1] = num_bytes
+        self.__entries.move_to_end(key)
+        self.__evict()
+        return texture
+
+    def release(self, key:Optional[Hashable]):
+        """
+        Release the texture of the given key, which is then kept until it
+        is evicted.
+        """
+        entry = self.__entries.get(key)
+        if entry is None or entry[2] == 0: return
+        entry[2] -= 1
+        self.__evict()
+
+    def clear(self):
+        """
+        Delete all the textures, including the acquired ones.
+        """
+        if self.__entries:
+            self.__gl.glDeleteTextures(
+                [entry[0] for entry in self.__entries.values()])
+        self.__entries.clear()
+        self.__num_bytes = 0
+
+    def __evict(self):
+        if self.__num_bytes <= self.__max_bytes: return
+        for key in list(self.__entries):
+            if self.__num_bytes <= self.__max_bytes: break
+            texture, num_bytes, ref_count = self.__entries[key]
+            if ref_count: continue
+            self.__gl.glDeleteTextures([texture])
+            del self.__entries[key]
+            self.__num_bytes -= num_bytes
+            self.__evictions += 1
@@ -52,6 +52,9 @@ class TimelineApiCore(QtCore.QObject):
     def get_seq_frames(self, clip_id, frames=None):
         return self.__session.timeline.get_seq_frames(clip_id, frames)
 
+    def get_seq_frames_for_clips(self, frames):
+        return self.__session.timeline.get_seq_frames_for_clips(frames)
+
     def get_clip_frames(self, frames=None):
         return self.__session.timeline.get_clip_frames(frames)
 
@@ -1,7 +1,9 @@
+import hashlib
 import math
 import os
 import re
 from dataclasses import dataclass
+from functools import partial
 import imageio.v3 as iio
 import numpy as np
 from OpenGL import GL
@@ -13,6 +15,7 @@ from rv import commands as rvc
 from rv import extra_commands as rve
 from rv import runtime
 from rpa.open_rv.rpa_core.api import prop_util
+from rpa.open_rv.rpa_core.api.texture_cache import TextureCache
 from rpa.session_state.utils import Point, itview_to_screen
 
 
@@ -83,20 +86,41 @@ class FlipMode:
     VERT: str = "Vertically"
 
 
+@dataclass
+class ImageTransform:
+    """
+    Transforms of the current clip image at the current frame, which are
+    computed once per frame and shared by everything that is rendered
+    relative to the image.
+    """
+    key: tuple
+    clip_id: str
+    width: float
+    height: float
+    translate_x: float
+    translate_y: float
+    scale_x: float
+    scale_y: float
+    rotation: float
+    image_rect: tuple # lb, rb, rt, lt without the viewport rotation
+    image_to_screen: np.ndarray # 3x3, image space with the viewport rotation
+    pixel_size: np.ndarray
+
+
 class WebEngineRenderer:
 
     def __init__(self, callback):
         self.__callback = callback
-        self.__empty_image = QtGui.QImage(1, 1, QtGui.QImage.Format_ARGB32)
-        self.__empty_image.fill(QtCore.Qt.transparent)
         self.__timer = QtCore.QTimer()
         self.__timer.setSingleShot(True)
         self.__timer.setInterval(200)
-        self.__timer.timeout.connect(self.__render_finished)
+        self.__timer.timeout.connect(partial(self.__render_finished, False))
+        # The last grab catches the content that loads late, like images and
+        # web fonts
         self.__timer2 = QtCore.QTimer()
         self.__timer2.setSingleShot(True)
         self.__timer2.setInterval(1000)
-        self.__timer2.timeout.connect(self.__render_finished)
+        self.__timer2.timeout.connect(partial(self.__render_finished, True))
         self.__web_engine = QtWebEngineWidgets.QWebEngineView()
         self.__web_engine.setProperty("SHOW_IN_ITVIEW_MODE", True)
         self.__web_engine.setAttribute(QtCore.Qt.WA_DontShowOnScreen, True)
@@ -107,7 +131,6 @@ class WebEngineRenderer:
         self.__web_engine.show()
 
     def render(self, html, width, height):
-        self.__callback(self.__empty_image)
         self.__web_engine.resize(width, height)
         self.__web_engine.setHtml(html)
 
@@ -116,9 +139,9 @@ class WebEngineRenderer:
         self.__timer.start()
         self.__timer2.start()
 
-    def __render_finished(self):
+    def __render_finished(self, is_final):
         image = self.__web_engine.grab().toImage()
-        self.__callback(image)
+        self.__callback(image, is_final)
 
 
 class ViewportApiCore(QtCore.QObject):
@@ -156,6 +179,15 @@ class ViewportApiCore(QtCore.QObject):
         self.__last_geometry = None
 
         self.__web_engine_renderers = {}
+        # Textures of the rendered html overlays and the key of the texture
+        # that each html overlay is waiting for
+        self.__html_textures = TextureCache(GL)
+        self.__pending_html_textures = {}
+
+        self.__image_transform = None
+        self.__attrs_version = 0
+        self.__session_api.SIG_ATTR_VALUES_CHANGED.connect(
+            self.__attr_values_changed)
 
     def create_html_overlay(self, html_overlay):
         id = self.__session.viewport.create_html_overlay(html_overlay)
@@ -172,17 +204,24 @@ class ViewportApiCore(QtCore.QObject):
         return is_success
 
     def __set_html_overlay_texture(self, id, html_overlay):
-        def update_texture(image):
-            old_texture_id = html_overlay.get_custom_attr("gl_texture_id")
-            if old_texture_id is not None:
-                GL.glDeleteTextures([old_texture_id])
-            new_texture_id = qimage_to_gl_texture(image)
-            html_overlay.set_custom_attr("gl_texture_id", new_texture_id)
+        key = self.__get_html_texture_key(html_overlay)
+        if key == html_overlay.get_custom_attr("gl_texture_key"):
             rvc.redraw()
+            return
+        # Overlays that show the same html share the same texture, which
+        # is only rendered when none of them is cached
+        texture_id = self.__html_textures.acquire(key)
+        if texture_id is not None:
+            self.__pending_html_textures.pop(id, None)
+            self.__set_html_overlay_texture_id(html_overlay, key, texture_id)
+            return
+        self.__pending_html_textures[id] = key
         if html_overlay.use_web_engine:
+            self.__set_html_overlay_texture_id(html_overlay, None, None)
             web_engine_renderer = self.__web_engine_renderers.get(id)
             if web_engine_renderer is None:
-                web_engine_renderer = WebEngineRenderer(update_texture)
+                web_engine_renderer = WebEngineRenderer(
+                    partial(self.__html_overlay_rendered, id))
                 self.__web_engine_renderers[id] = web_engine_renderer
             web_engine_renderer.render(
                 html_overlay.html,
@@ -191,7 +230,53 @@ class ViewportApiCore(QtCore.QObject):
         else:
             image = render_html_to_image(
                 html_overlay.width, html_overlay.height, html_overlay.html)
-            update_texture(image)
+            self.__html_overlay_rendered(id, image)
+
+    def __html_overlay_rendered(self, id, image, is_final=True):
+        # Web engine renders are grabbed more than once, the overlay keeps
+        # waiting for its texture until the last grab
+        if is_final: key = self.__pending_html_textures.pop(id, None)
+        else: key = self.__pending_html_textures.get(id)
+        html_overlay = self.__session.viewport.get_html_overlay(id)
+        if key is None or html_overlay is None:
+            return
+        texture = qimage_to_gl_texture(image)
+        num_bytes = image.width() * image.height() * 4
+        if html_overlay.get_custom_attr("gl_texture_key") == key:
+            # The overlay still holds the texture of an earlier grab, which
+            # is replaced for all the overlays that acquired it since
+            texture_id = self.__html_textures.replace(key, texture, num_bytes)
+            for overlay_id in self.__session.viewport.get_html_overlay_ids():
+                overlay = self.__session.viewport.get_html_overlay(overlay_id)
+                if overlay.get_custom_attr("gl_texture_key") == key:
+                    overlay.set_custom_attr("gl_texture_id", texture_id)
+            rvc.redraw()
+            return
+        texture_id = self.__html_textures.add(key, texture, num_bytes)
+        self.__set_html_overlay_texture_id(html_overlay, key, texture_id)
+
+    def __set_html_overlay_texture_id(self, html_overlay, key, texture_id):
+        self.__html_textures.release(html_overlay.get_custom_attr("gl_texture_key"))
+        html_overlay.set_custom_attr("gl_texture_key", key)
+        html_overlay.set_custom_attr("gl_texture_id", texture_id)
+        rvc.redraw()
+
+    def __get_html_texture_key(self, html_overlay):
+        scale = 1.0
+        if html_overlay.use_web_engine and self.__viewport_widget is not None:
+            # Web engine renders are grabbed at the device pixel ratio
+            scale = self.__viewport_widget.devicePixelRatioF()
+        digest = hashlib.sha1(html_overlay.html.encode("utf-8")).hexdigest()
+        return (
+            digest, int(html_overlay.width), int(html_overlay.height),
+            html_overlay.use_web_engine, scale)
+
+    def get_html_texture_stats(self):
+        """
+        Get the hits, misses and evictions of the html overlay texture cache
+        and the number and memory of its textures.
+        """
+        return self.__html_textures.stats
 
     def get_html_overlay(self, id:str):
         return self.__session.viewport.get_html_overlay_data(id)
@@ -200,9 +285,15 @@ class ViewportApiCore(QtCore.QObject):
         return self.__session.viewport.get_html_overlay_ids()
 
     def delete_html_overlays(self, ids):
+        for id in ids:
+            html_overlay = self.__session.viewport.get_html_overlay(id)
+            if html_overlay is None: continue
+            self.__html_textures.release(
+                html_overlay.get_custom_attr("gl_texture_key"))
         is_success = self.__session.viewport.delete_html_overlays(ids)
         for id in ids:
             self.__web_engine_renderers.pop(id, None)
+            self.__pending_html_textures.pop(id, None)
         rvc.redraw()
         return is_success
 
@@ -672,34 +763,11 @@ class ViewportApiCore(QtCore.QObject):
             self.__render_mask_recipe(event)
 
     def __render_mask_image(self, event):
-        frame = rvc.frame() # global frame
-        src_frame = rve.sourceFrame(frame) # source frame
-        clip_id = self.__session_api.get_current_clip()
-        if clip_id is None:
-            return
-
-        sources = rvc.sourcesAtFrame(frame)
-        if len(sources) != 1:
+        transform = self.__get_image_transform()
+        if transform is None:
             return
-        source = sources[0]
-        smi = rvc.sourceMediaInfo(source)
-        geometry = rvc.imageGeometry(source)
-
-        img_width = float(smi["width"])
-        img_height = float(smi["height"])
-
-        # get translate and scale
-        translate_x = self.__session_api.get_attr_value(clip_id, "pan_x")
-        translate_x += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_x", src_frame)
-        translate_y = self.__session_api.get_attr_value(clip_id, "pan_y")
-        translate_y += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_y", src_frame)
-        scale_x = self.__session_api.get_attr_value(clip_id, "scale_x")
-        scale_x *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_x", src_frame)
-        scale_y = self.__session_api.get_attr_value(clip_id, "scale_y")
-        scale_y *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_y", src_frame)
 
-        lb, rb, rt, lt = self.__get_image_rect(
-            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y)
+        lb, rb, rt, lt = transform.image_rect
         x0, y0 = lb
         x1, y1 = rt
 
@@ -746,45 +814,12 @@ class ViewportApiCore(QtCore.QObject):
         GL.glDisable(GL.GL_TEXTURE_2D)
 
     def __render_mask_recipe(self, event):
-        domain = event.domain()
-        frame = rvc.frame() # global frame
-        src_frame = rve.sourceFrame(frame) # source frame
-        clip_id = self.__session_api.get_current_clip()
-        if clip_id is None:
+        transform = self.__get_image_transform()
+        if transform is None:
             return
 
-        sources = rvc.sourcesAtFrame(frame)
-        if len(sources) != 1:
-            return
-
-        source = sources[0]
-        smi = rvc.sourceMediaInfo(source)
-        geometry = rvc.imageGeometry(source)
-
-        img_width = float(smi["width"])
-        img_height = float(smi["height"])
-        img_ratio = img_width / img_height
-
-        # get translate and scale
-        translate_x = self.__session_api.get_attr_value(
-            clip_id, "pan_x")
-        translate_x += self.__session_api.get_attr_value_at(
-            clip_id, "dynamic_translate_x", src_frame)
-        translate_y = self.__session_api.get_attr_value(
-            clip_id, "pan_y")
-        translate_y += self.__session_api.get_attr_value_at(
-            clip_id, "dynamic_translate_y", src_frame)
-        scale_x = self.__session_api.get_attr_value(
-            clip_id, "scale_x")
-        scale_x *= self.__session_api.get_attr_value_at(
-            clip_id, "dynamic_scale_x", src_frame)
-        scale_y = self.__session_api.get_attr_value(
-            clip_id, "scale_y")
-        scale_y *= self.__session_api.get_attr_value_at(
-            clip_id, "dynamic_scale_y", src_frame)
-
-        lb, rb, rt, lt = self.__get_image_rect(
-            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y)
+        img_ratio = transform.width / transform.height
+        lb, rb, rt, lt = transform.image_rect
         lbx, lby = lb
         rbx, rby = rb
         rtx, rty = rt
@@ -834,19 +869,24 @@ class ViewportApiCore(QtCore.QObject):
         GL.glCallList(self.__display)
 
     def __render_opengl_overlays(self, event):
-        frame = rvc.frame()
-        sources = rvc.sourcesAtFrame(frame)
-        if len(sources) != 1:
+        overlays = self.__session.viewport.get_opengl_overlays()
+        if not overlays:
+            return
+        transform = self.__get_image_transform()
+        if transform is None:
+            return
+        if self.__session_api.get_playlist_of_clip(transform.clip_id) is None:
             return
         domain = event.domain()
-        overlays = self.__session.viewport.get_opengl_overlays()
         for recipe in overlays:
             if not recipe.get("is_visible", False):
                 continue
             vertices = recipe.get("vertices", [])
-            vertices = list(map(lambda v: np.array([*self.__convert_to_image_space(v), 1]), vertices))
+            if len(vertices) == 0:
+                continue
+            vertices = self.__convert_to_image_space(transform, vertices)
             if recipe.get("apply_image_transforms", False):
-                vertices = self.__apply_image_transforms(vertices)
+                vertices = self.__apply_image_transforms(transform, vertices)
             GL.glMatrixMode(GL.GL_PROJECTION)
             GL.glLoadIdentity()
             GL.glOrtho(0, domain[0], 0, domain[1], -1000000, +1000000)
@@ -861,30 +901,45 @@ class ViewportApiCore(QtCore.QObject):
             if recipe.get("dashed", False):
                 GL.glLineStipple(4, 0xAAAA)
                 GL.glEnable(GL.GL_LINE_STIPPLE)
-            GL.glBegin(GL.GL_LINE_LOOP)
-            for corner in vertices:
-                GL.glVertex(corner)
-            GL.glEnd()
+            # All the vertices are drawn with a single call
+            GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+            GL.glVertexPointer(3, GL.GL_DOUBLE, 0, vertices)
+            GL.glDrawArrays(GL.GL_LINE_LOOP, 0, len(vertices))
+            GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
             if recipe.get("dashed", False):
                 GL.glDisable(GL.GL_LINE_STIPPLE)
 
-    def __convert_to_image_space(self, vert):
+    def __attr_values_changed(self, attr_values):
+        self.__attrs_version += 1
+
+    def __get_image_transform(self):
+        """
+        Get the transforms of the current clip image at the current frame.
+        They are only computed again when the frame, the current clip, the
+        image geometry, the viewport rotation or the attr values changed.
+
+        Returns:
+            (Optional[ImageTransform]): None if there is no single current
+                clip image
+        """
         frame = rvc.frame() # global frame
-        src_frame = rve.sourceFrame(frame) # source frame
         clip_id = self.__session_api.get_current_clip()
         if clip_id is None:
-            return
-        playlist_id = self.__session_api.get_playlist_of_clip(clip_id)
-        if playlist_id is None:
-            return
-
+            return None
         sources = rvc.sourcesAtFrame(frame)
         if len(sources) != 1:
-            return
+            return None
         source = sources[0]
-        smi = rvc.sourceMediaInfo(source)
         geometry = rvc.imageGeometry(source)
+        key = (
+            frame, clip_id, source, tuple(tuple(point) for point in geometry),
+            self.get_rotation(), self.__attrs_version)
+        if self.__image_transform is not None and \
+            self.__image_transform.key == key:
+            return self.__image_transform
 
+        src_frame = rve.sourceFrame(frame) # source frame
+        smi = rvc.sourceMediaInfo(source)
         img_width = float(smi["width"])
         img_height = float(smi["height"])
 
@@ -896,31 +951,45 @@ class ViewportApiCore(QtCore.QObject):
         scale_x *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_x", src_frame)
         scale_y = self.__session_api.get_attr_value(clip_id, "scale_y")
         scale_y *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_y", src_frame)
-        rotation = self.get_rotation()
-        lb, rb, _, lt = self.__get_image_rect(
-            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y, rotation=rotation)
+        rotation = self.__session_api.get_attr_value(clip_id, "rotation")
+        rotation += self.__session_api.get_attr_value_at(clip_id, "dynamic_rotation", src_frame)
 
+        image_rect = self.__get_image_rect(
+            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y)
+        lb, rb, _, lt = self.__get_image_rect(
+            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y,
+            rotation=self.get_rotation())
         u, v = rb-lb, lt-lb # vectors that define direction of rectangle
-        return lb + vert[0]*u + vert[1]*v
+        image_to_screen = np.array([
+            [u[0], v[0], lb[0]],
+            [u[1], v[1], lb[1]],
+            [0, 0, 1]
+        ])
 
-    def __apply_image_transforms(self, vertices):
-        clip_id = self.__session.viewport.current_clip
-        frame = rvc.frame() # global frame
-        src_frame = rve.sourceFrame(frame) # source frame
+        g = [np.array(p) for p in geometry]
+        pixel_size = np.array([
+            np.linalg.norm(g[1] - g[0]) / (scale_x * img_width),
+            np.linalg.norm(g[3] - g[0]) / (scale_y * img_height)])
 
-        translate_x = self.__session_api.get_attr_value(clip_id, "pan_x")
-        translate_x += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_x", src_frame)
-        translate_y = self.__session_api.get_attr_value(clip_id, "pan_y")
-        translate_y += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_y", src_frame)
-        scale_x = self.__session_api.get_attr_value(clip_id, "scale_x")
-        scale_x *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_x", src_frame)
-        scale_y = self.__session_api.get_attr_value(clip_id, "scale_y")
-        scale_y *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_y", src_frame)
-        rotation = self.__session_api.get_attr_value(clip_id, "rotation")
-        rotation += self.__session_api.get_attr_value_at(clip_id, "dynamic_rotation", src_frame)
-        theta = -math.radians(rotation)
-        pixel_size = self.__get_pixel_size(1.0/scale_x, 1.0/scale_y)
-        centroid = np.array(vertices).mean(axis=0)
+        self.__image_transform = ImageTransform(
+            key, clip_id, img_width, img_height, translate_x, translate_y,
+            scale_x, scale_y, rotation, image_rect, image_to_screen, pixel_size)
+        return self.__image_transform
+
+    def __convert_to_image_space(self, transform, vertices):
+        """
+        Convert all the given vertices from image space to screen space at
+        once, as homogeneous (N, 3) vertices.
+        """
+        vertices = np.asarray(vertices, dtype=float)[:, :2]
+        vertices = np.column_stack((vertices, np.ones(len(vertices))))
+        return vertices @ transform.image_to_screen.T
+
+    def __apply_image_transforms(self, transform, vertices):
+        scale_x, scale_y = transform.scale_x, transform.scale_y
+        theta = -math.radians(transform.rotation)
+        pixel_size = transform.pixel_size
+        centroid = vertices.mean(axis=0)
 
         S = np.array([
             [scale_x, 0, 0],
@@ -947,34 +1016,13 @@ class ViewportApiCore(QtCore.QObject):
         ])
 
         Tu = np.array([
-            [1, 0, translate_x*pixel_size[0]],
-            [0, 1, translate_y*pixel_size[1]],
+            [1, 0, transform.translate_x*pixel_size[0]],
+            [0, 1, transform.translate_y*pixel_size[1]],
             [0, 0, 1]
         ])
 
         M = Tu @ T2 @ R @ S @ T1
-        transformed_vertices = []
-        for v in vertices:
-            transformed_vertices.append(M @ v)
-        return transformed_vertices
-
-    def __get_pixel_size(self, scale_x, scale_y):
-        frame = rvc.frame() # global frame
-
-        sources = rvc.sourcesAtFrame(frame)
-        if len(sources) != 1:
-            return
-        source = sources[0]
-        geometry = rvc.imageGeometry(source)
-
-        g = [np.array(p) for p in geometry]
-
-        size = np.array([
-            scale_x * np.linalg.norm(g[1] - g[0]),
-            scale_y * np.linalg.norm(g[3] - g[0])])
-        width, height = self.__get_current_dimensions()
-        pixel_size = size / np.array([width, height])
-        return pixel_size
+        return vertices @ M.T
 
     # TODO Transforms Indicator
     # def __render_transform_indicators(self, event):
@@ -1157,34 +1205,11 @@ class ViewportApiCore(QtCore.QObject):
         html_overlays = self.__session.viewport.get_html_overlays()
         if not html_overlays: return
 
-        frame = rvc.frame() # global frame
-        src_frame = rve.sourceFrame(frame) # source frame
-        clip_id = self.__session_api.get_current_clip()
-        if clip_id is None:
-            return
-
-        sources = rvc.sourcesAtFrame(frame)
-        if len(sources) != 1:
+        transform = self.__get_image_transform()
+        if transform is None:
             return
-        source = sources[0]
-        smi = rvc.sourceMediaInfo(source)
-        geometry = rvc.imageGeometry(source)
 
-        img_width = float(smi["width"])
-        img_height = float(smi["height"])
-
-        # get translate and scale
-        translate_x = self.__session_api.get_attr_value(clip_id, "pan_x")
-        translate_x += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_x", src_frame)
-        translate_y = self.__session_api.get_attr_value(clip_id, "pan_y")
-        translate_y += self.__session_api.get_attr_value_at(clip_id, "dynamic_translate_y", src_frame)
-        scale_x = self.__session_api.get_attr_value(clip_id, "scale_x")
-        scale_x *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_x", src_frame)
-        scale_y = self.__session_api.get_attr_value(clip_id, "scale_y")
-        scale_y *= self.__session_api.get_attr_value_at(clip_id, "dynamic_scale_y", src_frame)
-
-        lb, rb, rt, lt = self.__get_image_rect(
-            img_width, img_height, geometry, -translate_x, -translate_y, 1.0/scale_x, 1.0/scale_y)
+        lb, rb, rt, lt = transform.image_rect
 
         domain = event.domain()
 
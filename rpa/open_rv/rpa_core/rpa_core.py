@@ -11,9 +11,9 @@ class RpaCore:
     def __init__(self):
         session = Session()
         self.__annotation_api = AnnotationApiCore(session)
-        self.__session_api = SessionApiCore(
-            session, self.__annotation_api)
         self.__color_api = ColorApiCore(session)
+        self.__session_api = SessionApiCore(
+            session, self.__annotation_api, self.__color_api)
         self.__timeline_api = TimelineApiCore(
             session, self.__session_api)
         self.__viewport_api = ViewportApiCore(
@@ -1,6 +1,9 @@
 import os
+import numpy as np
+from array import array
+from itertools import chain
 from dataclasses import dataclass, field
-from typing import Dict, List, Union, Optional
+from typing import Dict, Iterable, List, Union, Optional
 from enum import auto, Enum
 from rpa.session_state.utils import Point, Color
 
@@ -79,6 +82,127 @@ class StrokePoint:
         return self
 
 
+class PointArray:
+    """
+    Sequence of Points that keeps their coordinates in a single array of
+    doubles instead of a Point object per point. Points are created when
+    they are accessed, hence changing them does not change the array.
+    """
+    __slots__ = ("__values",)
+
+    def __init__(self, points:Iterable[Point]=()):
+        self.__values = array("d")
+        for point in points:
+            self.__values.extend((point.x, point.y))
+
+    @classmethod
+    def from_xy(cls, xy)->"PointArray":
+        """
+        Point array with the x and y coordinates in the given rows.
+        """
+        point_array = cls()
+        point_array.__values.frombytes(
+            np.ascontiguousarray(xy, dtype=np.float64).tobytes())
+        return point_array
+
+    @property
+    def xy(self)->np.ndarray:
+        """
+        Read only (n, 2) NumPy view of the coordinates.
+        """
+        xy = np.frombuffer(self.__values, dtype=np.float64).reshape(-1, 2)
+        xy.flags.writeable = False
+        return xy
+
+    def __len__(self):
+        return len(self.__values) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PointArray.from_xy(self.xy[index])
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PointArray index out of range")
+        return Point(self.__values[2 * index], self.__values[2 * index + 1])
+
+    def __iter__(self):
+        values = self.__values
+        for index in range(0, len(values), 2):
+            yield Point(values[index], values[index + 1])
+
+    def __eq__(self, other):
+        if isinstance(other, PointArray):
+            return self.__values == other.__values
+        if isinstance(other, list):
+            return len(self) == len(other) and all(
+                point == other_point for point, other_point in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PointArray({list(self)})"
+
+    def append(self, point:Point):
+        self.__values.extend((point.x, point.y))
+
+    def extend(self, points:Iterable[Point]):
+        for point in points:
+            self.append(point)
+
+    def __getstate__(self):
+        return self.xy.tolist()
+
+    def __setstate__(self, state):
+        self.__values = array("d", chain.from_iterable(state))
+        return self
+
+
+def _as_point_array(points):
+    return points if isinstance(points, PointArray) else PointArray(points)
+
+
+def simplify_points(xy, tolerance:float)->np.ndarray:
+    """
+    Indexes of the points to keep so that the polyline through them stays
+    within tolerance of the polyline through all the points, found with
+    the Ramer-Douglas-Peucker algorithm. The first and last points are
+    always kept.
+
+    Args:
+        xy (numpy.ndarray): (n, 2) coordinates of the points
+        tolerance (float): Maximum distance of a dropped point to the
+            simplified polyline
+
+    Returns:
+        (numpy.ndarray): Sorted indexes of the points to keep
+    """
+    xy = np.asarray(xy, dtype=float)
+    size = len(xy)
+    if size < 3:
+        return np.arange(size)
+    keep = np.zeros(size, dtype=bool)
+    keep[0] = keep[-1] = True
+    segments = [(0, size - 1)]
+    while segments:
+        first, last = segments.pop()
+        if last - first < 2: continue
+        start = xy[first]
+        direction = xy[last] - start
+        offsets = xy[first + 1:last] - start
+        length = np.hypot(*direction)
+        if length == 0.0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(
+                direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            index += first + 1
+            keep[index] = True
+            segments.append((first, index))
+            segments.append((index, last))
+    return np.flatnonzero(keep)
+
+
 @dataclass
 class Stroke:
     mode: StrokeMode = StrokeMode.PEN
@@ -86,9 +210,13 @@ class Stroke:
     width: float = 0.0
     depth: float = 0.0
     color: Color = field(default_factory=Color)
-    points: List[Point] = field(default_factory=list)
+    points: PointArray = field(default_factory=PointArray)
     __custom_attrs: dict = field(default_factory=dict)
 
+    def __post_init__(self):
+        if not isinstance(self.points, PointArray):
+            self.points = PointArray(self.points)
+
     def set_custom_attr(self, attr_id, value):
         self.__custom_attrs[attr_id] = value
         return True
@@ -115,7 +243,7 @@ class Stroke:
             "width": self.width,
             "depth": self.depth,
             "color": self.color.__getstate__(),
-            "points": [point.__getstate__() for point in self.points],
+            "points": _as_point_array(self.points).__getstate__(),
             "class": self.__class__.__name__
         }
 
@@ -125,7 +253,28 @@ class Stroke:
         self.width = state["width"]
         self.depth = state["depth"]
         self.color = Color().__setstate__(state["color"])
-        self.points = [Point().__setstate__(point) for point in state["points"]]
+        self.points = PointArray().__setstate__(state["points"])
+        return self
+
+    def simplify(self, tolerance:float, scale=(1.0, 1.0)):
+        """
+        Drop the points of the stroke that are within tolerance of the
+        polyline through the rest of its points.
+
+        Args:
+            tolerance (float): Maximum distance of a dropped point to the
+                simplified stroke, after scaling
+
+        Kwargs:
+            scale (Tuple[float, float]): Scale of the x and y coordinates
+                when measuring distances, like the image resolution to get
+                a tolerance in pixels from itview coordinates
+        """
+        if tolerance <= 0 or len(self.points) < 3: return self
+        xy = _as_point_array(self.points).xy
+        keep = simplify_points(xy * np.asarray(scale, dtype=float), tolerance)
+        if len(keep) < len(xy):
+            self.points = PointArray.from_xy(xy[keep])
         return self
 
 
@@ -179,6 +328,23 @@ class Annotation:
     def copy(self):
         return Annotation().__setstate__(self.__getstate__())
 
+    def transformed(self, matrix, width_scale=1.0):
+        """
+        Copy of the annotation with the given 3x3 affine matrix applied to
+        the points of its strokes in a single operation per stroke, and
+        the width of its strokes scaled by width_scale.
+        """
+        annotation = self.copy()
+        matrix = np.asarray(matrix, dtype=float)
+        linear, offset = matrix[:2, :2].T, matrix[:2, 2]
+        for stroke in annotation.annotations:
+            if not isinstance(stroke, Stroke): continue
+            stroke.width *= width_scale
+            if not len(stroke.points): continue
+            stroke.points = PointArray.from_xy(
+                _as_point_array(stroke.points).xy @ linear + offset)
+        return annotation
+
     def is_empty(self):
         return not self.annotations
 
@@ -192,6 +358,31 @@ class Annotations:
         self.is_visible: bool = True
         self.__active_text: Optional[Text] = None
         self.__custom_attrs: dict = field(default_factory=dict)
+        self.__init_index()
+
+    def __init_index(self):
+        # Frames are indexed so that the frames with content are found
+        # without going through the annotations of all the frames
+        self.__rw_frames = {} # frames with rw content, in insertion order
+        self.__ro_note_frames = {} # frames with ro notes, in insertion order
+        for frame in self.rw_annos:
+            self.__update_rw_frame(frame)
+        for frame in self.ro_annos:
+            self.__update_ro_frame(frame)
+
+    def __update_rw_frame(self, frame):
+        annotation = self.rw_annos.get(frame, None)
+        if annotation and annotation.annotations:
+            self.__rw_frames[frame] = None
+        else:
+            self.__rw_frames.pop(frame, None)
+
+    def __update_ro_frame(self, frame):
+        annos = self.ro_annos.get(frame, None)
+        if annos and any(anno.is_note for anno in annos):
+            self.__ro_note_frames[frame] = None
+        else:
+            self.__ro_note_frames.pop(frame, None)
 
     def set_custom_attr(self, attr_id, value):
         self.__custom_attrs[attr_id] = value
@@ -214,6 +405,7 @@ class Annotations:
         self.ro_annos = {frame: [Annotation().__setstate__(anno) for anno in annos] for frame, annos in state["ro_annos"].items()}
         self.rw_annos = {frame: Annotation().__setstate__(anno) for frame, anno in state["rw_annos"].items()}
         self.is_visible = state["is_visible"]
+        self.__init_index()
         return self
 
     def get_ro_annotations(self, frame):
@@ -226,20 +418,18 @@ class Annotations:
         return list(self.ro_annos.keys())
 
     def get_ro_note_frames(self):
-        return [frame for frame, annos in self.ro_annos.items() if any(anno.is_note for anno in annos)]
+        return list(self.__ro_note_frames)
 
     def get_rw_frames(self):
-        frames = []
-        for frame, annotation in self.rw_annos.items():
-            if annotation.annotations:
-                frames.append(frame)
-        return frames
+        return list(self.__rw_frames)
 
     def set_ro_annotations(self, frame, annotations):
         self.ro_annos[frame] = annotations
+        self.__update_ro_frame(frame)
 
     def set_rw_annotation(self, frame, annotation):
         self.rw_annos[frame] = annotation
+        self.__update_rw_frame(frame)
 
     def append_strokes(self, frame, strokes):
         annotation = self.rw_annos.get(frame, None)
@@ -248,6 +438,7 @@ class Annotations:
             self.rw_annos[frame] = annotation
         else:
             annotation.annotations.extend(strokes)
+        self.__update_rw_frame(frame)
 
     def append_texts(self, frame, texts):
         texts = [Text().__setstate__(text.__getstate__()) for text in texts]
@@ -257,11 +448,13 @@ class Annotations:
             self.rw_annos[frame] = annotation
         else:
             annotation.annotations.extend(texts)
+        self.__update_rw_frame(frame)
 
     def set_text(self, frame, text:Text):
         annotation = self.rw_annos.get(frame, None)
         if not annotation:
             self.rw_annos[frame] = Annotation([text])
+            self.__update_rw_frame(frame)
             return text
 
         text_to_edit = None
@@ -276,20 +469,24 @@ class Annotations:
             return text_to_edit
         else:
             annotation.annotations.append(text)
+            self.__update_rw_frame(frame)
             return text
 
     def delete_ro(self):
         self.ro_annos = {}
+        self.__ro_note_frames.clear()
 
     def delete_rw(self, frame):
         if frame in self.rw_annos:
             del self.rw_annos[frame]
+            self.__rw_frames.pop(frame, None)
 
     def clear(self, frame):
         annotation = self.rw_annos.get(frame, None)
         if not annotation: return
         annotation._clear = annotation.annotations[:]
         annotation.annotations = []
+        self.__rw_frames.pop(frame, None)
 
     def undo(self, frame):
         annotation = self.rw_annos.get(frame, None)
@@ -297,10 +494,12 @@ class Annotations:
         if annotation._clear:
             annotation.annotations = annotation._clear[:]
             annotation._clear = []
+            self.__update_rw_frame(frame)
             return
         if not annotation.annotations: return
         drawing = annotation.annotations.pop(-1)
         annotation._redo.append(drawing)
+        self.__update_rw_frame(frame)
 
     def redo(self, frame):
         annotation = self.rw_annos.get(frame, None)
@@ -308,10 +507,12 @@ class Annotations:
         if annotation._clear:
             annotation.annotations = annotation._clear[:]
             annotation._clear = []
+            self.__update_rw_frame(frame)
             return
         if not annotation._redo: return
         drawing = annotation._redo.pop(-1)
         annotation.annotations.append(drawing)
+        self.__update_rw_frame(frame)
 
     def delete(self):
         pass
\ No newline at end of file
@@ -0,0 +1,105 @@
+from typing import Any, List
+from operator import itemgetter
+
+
+_UNSET = object()
+
+
+class AttrRow:
+    """
+    Dict like view of the attrs of a single clip in an AttrStore.
+    """
+    __slots__ = ("__store", "__row")
+
+    def __init__(self, store, row):
+        self.__store = store
+        self.__row = row
+
+    @property
+    def row(self):
+        return self.__row
+
+    def get(self, id, default=None):
+        column = self.__store.columns.get(id)
+        if column is None: return default
+        value = column[self.__row]
+        return default if value is _UNSET else value
+
+    def __getitem__(self, id):
+        value = self.get(id, _UNSET)
+        if value is _UNSET: raise KeyError(id)
+        return value
+
+    def __setitem__(self, id, value):
+        self.__store.set_value(self.__row, id, value)
+
+    def __contains__(self, id):
+        return self.get(id, _UNSET) is not _UNSET
+
+    def __bool__(self):
+        row = self.__row
+        for column in self.__store.columns.values():
+            if column[row] is not _UNSET: return True
+        return False
+
+    def items(self):
+        row = self.__row
+        for id, column in self.__store.columns.items():
+            value = column[row]
+            if value is not _UNSET: yield id, value
+
+    def clear(self):
+        self.__store.clear_row(self.__row)
+
+
+class AttrStore:
+    """
+    Columnar store of the attrs of all the clips of a playlist.
+
+    Each attr id has a single column with one value per row and each clip
+    owns a row for as long as it is in the playlist. Rows of deleted clips
+    are reused by the clips created after them, hence rows are not in the
+    order of the clips in the playlist.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.__num_rows = 0
+        self.__free_rows = []
+
+    def add_row(self)->AttrRow:
+        if self.__free_rows:
+            row = self.__free_rows.pop()
+        else:
+            row = self.__num_rows
+            self.__num_rows += 1
+            for column in self.columns.values():
+                column.append(_UNSET)
+        return AttrRow(self, row)
+
+    def remove_row(self, attr_row:AttrRow):
+        self.clear_row(attr_row.row)
+        self.__free_rows.append(attr_row.row)
+
+    def clear_row(self, row:int):
+        for column in self.columns.values():
+            column[row] = _UNSET
+
+    def set_value(self, row:int, id:str, value:Any):
+        column = self.columns.get(id)
+        if column is None:
+            column = self.columns[id] = [_UNSET] * self.__num_rows
+        column[row] = value
+
+    def get_column(self, id:str, rows:List[int])->List[Any]:
+        column = self.columns.get(id)
+        if column is None or not rows:
+            return [None] * len(rows)
+        values = itemgetter(*rows)(column)
+        if len(rows) == 1: values = (values,)
+        return [None if value is _UNSET else value for value in values]
+
+    def clear(self):
+        self.columns.clear()
+        self.__num_rows = 0
+        self.__free_rows.clear()
@@ -127,6 +127,14 @@ class AttrsMetadata:
     def get_default_value(self, id):
         return self.__metadata.get(id).get("default_value")
 
+    def get_default_attr_value(self, id):
+        # The value a clip has for the attr until it is set, keyable attrs
+        # are stored as dicts of their value and keys
+        value = self.get_default_value(id)
+        if self.is_keyable(id):
+            value = {'value': value, 'key_values': {}, 'frame_values': {}}
+        return value
+
     def is_keyable(self, id):
         return self.__metadata.get(id).get("is_keyable")
 
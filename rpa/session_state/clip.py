@@ -1,26 +1,33 @@
 from rpa.session_state.transforms import \
-    Interpolator, RotationInterpolator, DYNAMIC_TRANSFORM_ATTRS
+    Interpolator, RotationInterpolator, LazyInterpolator, \
+    DYNAMIC_TRANSFORM_ATTRS
 from rpa.session_state.color_corrections import ColorCorrections
 from rpa.session_state.annotations import Annotations
+from rpa.session_state.frame_map import FrameMap
 import copy
 
 
 class Clip:
     id_to_self = {}
-    def __init__(self, playlist_id, id, path):
+    def __init__(self, playlist_id, id, path, attr_store=None):
         Clip.id_to_self[id] = self
         self.__playlist_id = playlist_id
         self.__id = id
         self.path = path
-        self.__attrs = {}
+        # When an attr_store is given, the attrs of the clip are kept in
+        # its row of the store instead of a dict of its own.
+        self.__attr_store = attr_store
+        self.__attrs = {} if attr_store is None else attr_store.add_row()
         self.__custom_attrs = {}
+        # keyable attr id -> LazyInterpolator of its key values
+        self.__interpolators = {}
         self.__color_corrections = ColorCorrections()
         self.__annotations = Annotations()
 
         # frame edits
-        self.__local_frame_map = {}
-        self.__source_frames = []
-        self.__timewarp_map = {}
+        self.__local_frame_map = FrameMap()
+        self.__source_frame_map = FrameMap()
+        self.__source_frames = None
 
     @property
     def id(self):
@@ -30,6 +37,11 @@ class Clip:
     def playlist_id(self):
         return self.__playlist_id
 
+    @property
+    def attr_row(self):
+        # Row of the clip in the attr_store it was created with
+        return self.__attrs.row
+
     @property
     def color_corrections(self):
         return self.__color_corrections
@@ -50,6 +62,7 @@ class Clip:
 
     def set_attr_value(self, id, value):
         self.__attrs[id] = value
+        self.__interpolators.pop(id, None)
 
         if id in ("key_in", "key_out"):
             tw_in = self.__attrs.get("timewarp_in")
@@ -75,7 +88,6 @@ class Clip:
             if not key_values:
                 return raw_attr_value.get("value")
 
-            frame_values = raw_attr_value.get("frame_values")
             keys = list(key_values.keys())
             first_key = min(keys)
             last_key = max(keys)
@@ -84,7 +96,10 @@ class Clip:
             elif frame >= last_key:
                 value_at = key_values[last_key]
             else:
-                value_at = frame_values.get(frame)
+                interpolator = self.__interpolators.get(id)
+                if interpolator is None:
+                    interpolator = self.update_interpolation(id)
+                value_at = interpolator.get(frame)
         else:
             value_at = self.get_attr_value(id)
         
@@ -94,6 +109,7 @@ class Clip:
         if id in DYNAMIC_TRANSFORM_ATTRS:
             key_values = self.__attrs.get(id).get("key_values")
             key_values.pop(frame, None)
+            self.__interpolators.pop(id, None)
 
     def get_key_values(self, id):
         if id in DYNAMIC_TRANSFORM_ATTRS:
@@ -106,26 +122,24 @@ class Clip:
         self.__attrs[id]["value"] = value
         self.__attrs[id]["key_values"] = {}
         self.__attrs[id]["frame_values"] = {}
+        self.__interpolators.pop(id, None)
 
     def update_interpolation(self, id):
-        sorted_items = dict(sorted(self.__attrs[id].get("key_values").items()))
-        keys = list(sorted_items.keys())
-        values = list(sorted_items.values())
-
-        first_key = keys[0]
-        last_key = keys[-1]
-
-        interpolated_values = {}
+        # Values between the keys are only evaluated when they are asked
+        # for, so that editing keys does not depend on the number of frames
+        # between them.
+        sorted_items = sorted(self.__attrs[id].get("key_values").items())
+        keys = [key for key, _ in sorted_items]
+        values = [value for _, value in sorted_items]
 
         if id == "dynamic_rotation":
             interpolator = RotationInterpolator(keys, values)
         else:
             interpolator = Interpolator(keys, values)
 
-        for frame in range(first_key, last_key + 1):
-            interpolated_values[frame] = interpolator.get(frame)
-
-        self.__attrs[id]["frame_values"] = interpolated_values
+        interpolator = LazyInterpolator(interpolator)
+        self.__interpolators[id] = interpolator
+        return interpolator
 
     def has_frame_edits(self):
         if not self.__attrs:
@@ -156,7 +170,6 @@ class Clip:
         if self.__local_frame_map == self.get_key_in_out_local_frame_map():
             return False
         else:
-            self.__local_frame_map.clear()
             self.__local_frame_map = self.get_key_in_out_local_frame_map()
             self.__set_source_frames()
             self.__set_timewarp_attr_values()
@@ -168,28 +181,20 @@ class Clip:
         self.__set_timewarp_attr_values()
 
     def edit_local_frame_map(self, edit, local_frame, num_frames):
-        start_frame = self.__attrs.get("media_start_frame")
-        end_frame = self.__attrs.get("media_end_frame")
-        key_in = self.__attrs.get("key_in")
-        key_out = self.__attrs.get("key_out")
-
         # set default local frame map
         if not self.__local_frame_map:
             self.__local_frame_map = self.get_default_local_frame_map()
 
-        clip_frames = list(self.__local_frame_map.values())
-        if local_frame > len(clip_frames):
+        if local_frame > len(self.__local_frame_map):
             return
 
         if edit == 1: # hold
-            clip_frame = clip_frames[local_frame - 1]
-            for _ in range(num_frames):
-                clip_frames.insert(local_frame, clip_frame)
+            self.__local_frame_map = \
+                self.__local_frame_map.hold(local_frame, num_frames)
         elif edit == -1: # drop
-            remove = local_frame - 1
-            del clip_frames[remove:remove + num_frames]
-        
-        self.__local_frame_map = {i + 1: frame for i, frame in enumerate(clip_frames)}
+            self.__local_frame_map = \
+                self.__local_frame_map.drop(local_frame, num_frames)
+
         self.__set_source_frames()
         self.__set_timewarp_attr_values()
 
@@ -205,17 +210,9 @@ class Clip:
         end = self.__attrs.get("media_end_frame")
 
         if None in (start, end):
-            return {}
+            return FrameMap()
 
-        media_length = end - start + 1
-        accum = start
-        
-        default_local_frame_map = {}
-        for i, val in enumerate(range(media_length)):
-            default_local_frame_map[i+1] = accum
-            accum += 1
-        
-        return default_local_frame_map
+        return FrameMap.from_range(start, end)
 
     def get_key_in_out_local_frame_map(self):
         start = self.__attrs.get("media_start_frame")
@@ -224,29 +221,30 @@ class Clip:
         key_out = self.__attrs.get("key_out")
 
         if None in (start, end, key_in, key_out):
-            return {}
-
-        frame_map = {}
-        clip_frames = []
-
-        if key_in < start:
-            clip_frames.extend([start] * (start - key_in))
+            return FrameMap()
 
         mid_start = max(start, key_in)
         mid_end = min(end, key_out)
-        clip_frames.extend(range(mid_start, mid_end + 1))
 
-        if key_out > end:
-            clip_frames.extend([end] * (key_out - end))
-        
-        frame_map = {i+1: frame for i, frame in enumerate(clip_frames)}
-        return frame_map
+        # hold the first and last frames of the media for key in/out that
+        # are outside of the media
+        return FrameMap([
+            (start, start - key_in, 0),
+            (mid_start, mid_end - mid_start + 1, 1),
+            (end, key_out - end, 0)])
 
     def __set_source_frames(self):
         start = self.__attrs.get("media_start_frame")
-        self.__source_frames = [frame - start + 1 for frame in self.__local_frame_map.values()]
+        self.__source_frame_map = self.__local_frame_map.shifted(1 - start) \
+            if self.__local_frame_map else FrameMap()
+        self.__source_frames = None
+
+    def get_source_frame_map(self):
+        return self.__source_frame_map
 
     def get_source_frames(self):
+        if self.__source_frames is None:
+            self.__source_frames = list(self.__source_frame_map.values())
         return self.__source_frames
 
     def __set_timewarp_attr_values(self):
@@ -255,18 +253,9 @@ class Clip:
             return
 
         if self.has_frame_edits():
-            self.__timewarp_map.clear()
-            for local_frame, clip_frame in self.__local_frame_map.items():
-                self.__timewarp_map[local_frame] = (key_in, clip_frame)
-                key_in += 1
-
-            tw_keys = [tw[0] for tw in self.__timewarp_map.values()]
-            tw_in = tw_keys[0]
-            tw_out = tw_keys[-1]
-            tw_length = len(tw_keys)
-        
-            self.set_attr_value("timewarp_in", tw_in)
-            self.set_attr_value("timewarp_out", tw_out)
+            tw_length = len(self.__local_frame_map)
+            self.set_attr_value("timewarp_in", key_in)
+            self.set_attr_value("timewarp_out", key_in + tw_length - 1)
             self.set_attr_value("timewarp_length", tw_length)
         else:
             self.set_attr_value("timewarp_in", None)
@@ -274,12 +263,16 @@ class Clip:
             self.set_attr_value("timewarp_length", None)
 
     def get_attrs(self):
-        return copy.deepcopy(self.__attrs)
+        return copy.deepcopy(dict(self.__attrs.items()))
 
     def delete(self):
         self.__playlist_id = None
         self.path = None
-        self.__attrs.clear()
+        if self.__attr_store is None:
+            self.__attrs.clear()
+        else:
+            self.__attr_store.remove_row(self.__attrs)
+            self.__attr_store = None
         self.__custom_attrs.clear()
         self.__color_corrections.delete()
         self.__annotations.delete()
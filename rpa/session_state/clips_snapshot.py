@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, Tuple
+from rpa.session_state.annotations import Annotation
+from rpa.session_state.color_corrections import ColorCorrection
+
+# Snapshots of clips, as taken by SessionApi.get_clips_snapshot and written
+# in session journals, and decoded back into annotations and color
+# corrections when restoring them.
+
+
+def get_clips_snapshot(session, clip_ids:Iterable[str], attr_ids:Iterable[str]=())->Dict:
+    """
+    Get a snapshot of the given clips of the session, with their attr
+    values, custom attrs, annotations and color corrections, as json
+    serializable values.
+
+    Args:
+        session (Session): Session state holding the clips
+        clip_ids (Iterable[str]): Ids of the clips, the ones not in the
+            session are skipped
+
+    Kwargs:
+        attr_ids (Iterable[str]): Ids of read-only attrs to snapshot along
+            with the read-write ones and media_path
+
+    Returns:
+        (Dict): Clip data by clip id
+    """
+    attrs_metadata = session.attrs_metadata
+    known_attr_ids = set(attrs_metadata.ids)
+    snapshot_attr_ids = [
+        attr_id for attr_id in attrs_metadata.ids \
+        if attrs_metadata.is_read_only(attr_id) is False]
+    for attr_id in ["media_path"] + list(attr_ids):
+        if attr_id not in snapshot_attr_ids:
+            snapshot_attr_ids.append(attr_id)
+
+    snapshot = {}
+    for clip_id in clip_ids:
+        clip = session.get_clip(clip_id)
+        if clip is None: continue
+        clip_data = {}
+
+        attr_values = {}
+        for attr_id in snapshot_attr_ids:
+            value = clip.get_attr_value(attr_id)
+            if value is None and attr_id in known_attr_ids:
+                value = attrs_metadata.get_default_attr_value(attr_id)
+            attr_values[attr_id] = value
+        clip_data["attrs"] = attr_values
+
+        for attr_id in clip.get_custom_attr_ids():
+            clip_data.setdefault("custom_attrs", {})[attr_id] = \
+                clip.get_custom_attr(attr_id)
+
+        annotations = clip.annotations
+        for frame in annotations.get_ro_frames():
+            clip_data.setdefault("annotations", {}).setdefault("ro", {})[frame] = [
+                anno.__getstate__() for anno in annotations.get_ro_annotations(frame)]
+        for frame in annotations.get_rw_frames():
+            clip_data.setdefault("annotations", {}).setdefault("rw", {})[frame] = \
+                annotations.get_rw_annotation(frame).__getstate__()
+
+        ccs = clip.color_corrections
+        color_corrections = clip_data["color_corrections"] = {}
+        for key, get_ccs, frames in (
+            ("ro", ccs.get_ro_ccs, ccs.get_ro_frames()),
+            ("rw", ccs.get_rw_ccs, ccs.get_rw_frames())):
+            states = color_corrections[key] = \
+                [(None, cc.__getstate__()) for cc in get_ccs()]
+            for frame in frames:
+                states.extend(
+                    (frame, cc.__getstate__()) for cc in get_ccs(frame))
+
+        snapshot[clip_id] = clip_data
+    return snapshot
+
+
+def decode_clip_snapshot(clip_data:Dict)->Tuple:
+    """
+    Decode the annotations and color corrections of a clip of a snapshot
+    taken with get_clips_snapshot, whose frames may have been turned into
+    strings by json.
+
+    Returns:
+        (Tuple): ro annotations by frame, rw annotation by frame, and lists
+            of (frame, color correction) of the ro and rw ccs
+    """
+    annotations = clip_data.get("annotations") or {}
+    ro_annos = {
+        int(frame): [Annotation().__setstate__(anno) for anno in annos] \
+        for frame, annos in (annotations.get("ro") or {}).items()}
+    rw_annos = {
+        int(frame): Annotation().__setstate__(anno) \
+        for frame, anno in (annotations.get("rw") or {}).items()}
+
+    color_corrections = clip_data.get("color_corrections") or {}
+    ro_ccs, rw_ccs = [
+        [(None if frame is None else int(frame), ColorCorrection().__setstate__(cc)) \
+         for frame, cc in color_corrections.get(key) or []] \
+        for key in ("ro", "rw")]
+    return ro_annos, rw_annos, ro_ccs, rw_ccs
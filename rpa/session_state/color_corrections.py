@@ -245,6 +245,35 @@ class ColorCorrections:
         self.frame_ccs = {} # dict[int, List[ColorCorrection]]
         self.__mute = False
         self.__custom_attrs: dict = field(default_factory=dict)
+        self.__init_index()
+
+    def __init_index(self):
+        # Frame ccs are indexed so that the frames with modified ccs are
+        # found without going through all the ccs of the clip
+        self.__cc_states = {} # cc_id -> (frame, is_ro, is_modified)
+        self.__modified_frames = {
+            False: {}, True: {}} # is_ro -> {frame: number of modified ccs}
+        for frame, cc_ids in self.frame_ccs.items():
+            for cc_id in cc_ids:
+                self.__update_index(cc_id, frame)
+
+    def __update_index(self, cc_id, frame=None):
+        state = self.__cc_states.pop(cc_id, None)
+        if state is not None:
+            old_frame, is_ro, is_modified = state
+            if is_modified:
+                counts = self.__modified_frames[is_ro]
+                counts[old_frame] -= 1
+                if not counts[old_frame]: del counts[old_frame]
+            if frame is None: frame = old_frame
+        elif frame is None: return
+        cc = self.id_to_cc.get(cc_id, None)
+        if cc is None: return
+        is_ro, is_modified = bool(cc.is_ro), cc.is_modified
+        self.__cc_states[cc_id] = (frame, is_ro, is_modified)
+        if is_modified:
+            counts = self.__modified_frames[is_ro]
+            counts[frame] = counts.get(frame, 0) + 1
 
     def set_custom_attr(self, attr_id, value):
         self.__custom_attrs[attr_id] = value
@@ -271,6 +300,7 @@ class ColorCorrections:
         self.clip_ccs = state["clip_ccs"]
         self.frame_ccs = state["frame_ccs"]
         self.__mute = state["mute"]
+        self.__init_index()
         return self
 
     # Create
@@ -288,6 +318,7 @@ class ColorCorrections:
                 if frame not in self.frame_ccs:
                     self.frame_ccs[frame] = []
                 self.frame_ccs[frame].append(id)
+                self.__update_index(id, frame)
         return cc_ids
 
     def append_nodes(self, cc_id, nodes):
@@ -295,6 +326,7 @@ class ColorCorrections:
         if not cc: return
         for node in nodes:
             cc.nodes.append(node)
+        self.__update_index(cc_id)
 
     # Read
     def get_cc_ids(self, frame=None):
@@ -358,24 +390,10 @@ class ColorCorrections:
         if cc.region: return cc.region.falloff
 
     def get_rw_frames(self):
-        frames = []
-        for frame, cc_ids in self.frame_ccs.items():
-            for cc_id in cc_ids:
-                cc = self.id_to_cc.get(cc_id, None)
-                if cc and not cc.is_ro and cc.is_modified:
-                    frames.append(frame)
-                    break
-        return frames
+        return list(self.__modified_frames[False])
 
     def get_ro_frames(self):
-        frames = []
-        for frame, cc_ids in self.frame_ccs.items():
-            for cc_id in cc_ids:
-                cc = self.id_to_cc.get(cc_id, None)
-                if cc and cc.is_ro and cc.is_modified:
-                    frames.append(frame)
-                    break
-        return frames
+        return list(self.__modified_frames[True])
 
     def is_modified(self, cc_id):
         cc = self.id_to_cc.get(cc_id, None)
@@ -416,6 +434,7 @@ class ColorCorrections:
             cc.nodes[node_index].__setstate__(properties)
         except IndexError:
             return
+        self.__update_index(cc_id)
 
     def get_node_properties(self, cc_id, node_index, property_names):
         cc = self.id_to_cc.get(cc_id, None)
@@ -437,6 +456,7 @@ class ColorCorrections:
         cc = self.id_to_cc.get(cc_id, None)
         if not cc: return
         cc.region = Region()
+        self.__update_index(cc_id)
 
     def append_shape_to_region(self, cc_id, points):
         cc = self.id_to_cc.get(cc_id, None)
@@ -469,6 +489,7 @@ class ColorCorrections:
         cc = self.id_to_cc.get(cc_id, None)
         if not cc: return
         cc.region.falloff = falloff
+        self.__update_index(cc_id)
 
     def set_mute(self, cc_id, value):
         cc = self.id_to_cc.get(cc_id, None)
@@ -484,6 +505,7 @@ class ColorCorrections:
         cc = self.id_to_cc.get(cc_id, None)
         if not cc: return
         cc.is_ro = value
+        self.__update_index(cc_id)
 
     # Delete
     def delete_ccs(self, cc_ids, frame=None):
@@ -491,33 +513,39 @@ class ColorCorrections:
             if cc_id not in self.id_to_cc:
                 continue
             del self.id_to_cc[cc_id]
+            self.__update_index(cc_id)
             if frame is not None and frame in self.frame_ccs:
                 self.frame_ccs[frame].remove(cc_id)
             else:
                 self.clip_ccs.remove(cc_id)
 
     def get_frame_of_cc(self, cc_id):
-        for frame, cc_ids in self.frame_ccs.items():
-            if cc_id in cc_ids:
-                return frame
-        return None
+        state = self.__cc_states.get(cc_id)
+        return None if state is None else state[0]
 
     def clear_nodes(self, cc_id):
         cc = self.id_to_cc.get(cc_id, None)
-        if cc: cc.nodes.clear()
+        if not cc: return
+        cc.nodes.clear()
+        self.__update_index(cc_id)
 
     def delete_node(self, cc_id, node_index):
         cc = self.id_to_cc.get(cc_id, None)
-        if cc and 0 <= node_index < len(cc.nodes): cc.nodes.pop(node_index)
+        if cc and 0 <= node_index < len(cc.nodes):
+            cc.nodes.pop(node_index)
+            self.__update_index(cc_id)
 
     def delete_region(self, cc_id):
         cc = self.id_to_cc.get(cc_id, None)
-        if cc: cc.region = None
+        if not cc: return
+        cc.region = None
+        self.__update_index(cc_id)
 
     def clear(self):
         self.id_to_cc.clear()
         self.frame_ccs.clear()
         self.clip_ccs.clear()
+        self.__init_index()
 
         self.__uuid_generator = None
         self.__default_clip_cc_id = None
@@ -541,6 +569,7 @@ class ColorCorrections:
                     self.frame_ccs[frame] = []
                 self.frame_ccs[frame].append(cc.id)
             cc.is_ro = is_ro
+            self.__update_index(cc.id, frame)
 
     def delete_ro_ccs(self):
         ro_ccs_to_remove = []
@@ -0,0 +1,292 @@
+import numpy as np
+from scipy import signal
+from typing import Dict, Iterable, List, Optional, Tuple
+from rpa.session_state.color_corrections import \
+    ColorCorrection, ColorCorrections, ColorTimer, Grade, Region
+
+# Everything below follows the math of color_corrector.glsl and of the
+# region masks rendered by ColorApiCore, so that color corrections can be
+# applied to images without RV. Images are float arrays of shape
+# (height, width, 3 or 4) whose first row is the top of the image, only
+# their rgb channels are corrected. The corrections themselves work on rgb
+# planes of shape (3, height, width), which is much faster than working
+# on interleaved channels.
+
+LUMA_COEFFICIENTS = (0.2126, 0.7152, 0.0722)
+
+
+def _pow(plane, power):
+    # Planes with a power of 1 are left as they are, the shader result of
+    # other powers of negative values is undefined
+    if power == 1: return
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.power(plane, np.float32(1.0 / power), out=plane)
+
+
+def apply_color_timer(rgb:np.ndarray, node:ColorTimer)->np.ndarray:
+    """
+    Apply the slope, offset, power and saturation of the color timer to the
+    given rgb planes in place.
+
+    Args:
+        rgb (np.ndarray): Float32 array whose first axis is r, g and b
+
+    Returns:
+        (np.ndarray): The given array
+    """
+    if node.mute: return rgb
+    for plane, slope, offset, power in zip(
+        rgb, node.slope, node.offset, node.power):
+        if slope != 1: plane *= np.float32(slope)
+        if offset != 0: plane += np.float32(offset)
+        _pow(plane, power)
+    saturation = node.saturation
+    if saturation != 1:
+        luma = rgb[0] * np.float32(LUMA_COEFFICIENTS[0])
+        luma += rgb[1] * np.float32(LUMA_COEFFICIENTS[1])
+        luma += rgb[2] * np.float32(LUMA_COEFFICIENTS[2])
+        luma *= np.float32(1.0 - saturation)
+        for plane in rgb:
+            plane *= np.float32(saturation)
+            plane += luma
+    return rgb
+
+
+def apply_grade(rgb:np.ndarray, node:Grade)->np.ndarray:
+    """
+    Apply the blackpoint, whitepoint, lift, gain, multiply and gamma of the
+    grade to the given rgb planes in place.
+
+    Args:
+        rgb (np.ndarray): Float32 array whose first axis is r, g and b
+
+    Returns:
+        (np.ndarray): The given array
+    """
+    if node.mute: return rgb
+    for plane, blackpoint, whitepoint, lift, gain, multiply, gamma in zip(
+        rgb, node.blackpoint, node.whitepoint, node.lift, node.gain,
+        node.multiply, node.gamma):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.float32(
+                np.float32(gain - lift) / np.float32(whitepoint - blackpoint) * \
+                np.float32(multiply))
+        if blackpoint != 0: plane -= np.float32(blackpoint)
+        if scale != 1: plane *= scale
+        if lift != 0: plane += np.float32(lift)
+        _pow(plane, gamma)
+    return rgb
+
+
+def _rasterize_polygon(points, width, height):
+    # Pixels whose center is inside the polygon by the even-odd rule, with
+    # rows going up like the rows of the GL mask texture
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    is_sloped = y0 != y1
+    x0, y0, x1, y1 = x0[is_sloped], y0[is_sloped], x1[is_sloped], y1[is_sloped]
+    # Rows whose center y is in [min y, max y) of each edge
+    first_rows = np.clip(
+        np.ceil(np.minimum(y0, y1) - 0.5), 0, height).astype(np.int64)
+    end_rows = np.clip(
+        np.ceil(np.maximum(y0, y1) - 0.5), 0, height).astype(np.int64)
+    num_rows = np.maximum(end_rows - first_rows, 0)
+    edges = np.repeat(np.arange(len(x0)), num_rows)
+    rows = np.arange(num_rows.sum()) - \
+        np.repeat(np.cumsum(num_rows) - num_rows, num_rows) + \
+        np.repeat(first_rows, num_rows)
+    y = rows + 0.5
+    x = x0[edges] + (y - y0[edges]) * \
+        (x1[edges] - x0[edges]) / (y1[edges] - y0[edges])
+    # Each crossing toggles the pixels whose center is right of it
+    columns = np.clip(np.ceil(x - 0.5), 0, width).astype(np.int64)
+    crossings = np.zeros((height, width + 1), dtype=np.int32)
+    np.add.at(crossings, (rows, columns), 1)
+    return np.cumsum(crossings[:, :width], axis=1) & 1 == 1
+
+
+def _get_blur_kernel(falloff):
+    # The shader samples the mask at 2 * radius + 1 linearly filtered
+    # offsets, which is the same as correlating it with this kernel
+    diameter = float(falloff)
+    radius = min(max(int(0.5 * diameter), 2), 256)
+    taps = np.arange(-radius, radius + 1)
+    t = 1.0 - np.abs(taps / radius)
+    weights = t * t * (3.0 - 2.0 * t) / radius
+    offsets = taps * (diameter / (2.0 * radius))
+    floors = np.floor(offsets)
+    fractions = offsets - floors
+    first = int(floors.min())
+    indexes = (floors - first).astype(np.int64)
+    kernel = np.zeros(indexes.max() + 2)
+    np.add.at(kernel, indexes, weights * (1.0 - fractions))
+    np.add.at(kernel, indexes + 1, weights * fractions)
+    return kernel.astype(np.float32), first
+
+
+def _blur(mask, kernel, first, axis):
+    # Mask textures are sampled with mirrored repeat
+    last = first + len(kernel) - 1
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (max(-first, 0), max(last, 0))
+    padded = np.pad(mask, pad, mode="symmetric")
+    begin = max(-first, 0) + first
+    if len(kernel) > 16:
+        shape = [1, 1]
+        shape[axis] = len(kernel)
+        blurred = signal.fftconvolve(
+            padded, kernel[::-1].reshape(shape), mode="valid", axes=axis)
+        index = [slice(None), slice(None)]
+        index[axis] = slice(begin, begin + mask.shape[axis])
+        blurred = blurred[tuple(index)]
+    else:
+        blurred = np.zeros_like(mask)
+        for offset, weight in enumerate(kernel):
+            if not weight: continue
+            index = [slice(None), slice(None)]
+            index[axis] = slice(
+                begin + offset, begin + offset + mask.shape[axis])
+            blurred += weight * padded[tuple(index)]
+    # Masks are stored in 8 bit textures
+    blurred = np.clip(blurred, 0.0, 1.0, out=blurred)
+    blurred *= 255.0
+    np.round(blurred, out=blurred)
+    blurred /= 255.0
+    return blurred
+
+
+def get_region_mask(region:Region, width:int, height:int)->np.ndarray:
+    """
+    Rasterize the shapes of the region and blur them by its falloff, like
+    the mask textures of the region color corrections.
+
+    Args:
+        region (Region): Region of a color correction
+        width (int): Width of the image in pixels
+        height (int): Height of the image in pixels
+
+    Returns:
+        (np.ndarray): Float32 mask of shape (height, width) whose first row
+            is the top of the image
+    """
+    mask = np.zeros((height, width), dtype=bool)
+    scale = np.array((width, height), dtype=np.float64)
+    for shape in region.shapes:
+        if not shape.points: continue
+        points = np.array(
+            [point.__getstate__() for point in shape.points],
+            dtype=np.float64) * scale
+        mask |= _rasterize_polygon(points, width, height)
+    if not region.shapes:
+        mask[:] = True
+    mask = mask.astype(np.float32)
+    kernel, first = _get_blur_kernel(region.falloff)
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) and not (len(kernel) == 2 and first == 0 and kernel[0] == 1.0):
+        # Only the part of the mask that the blur can reach is blurred,
+        # the margin keeps mirroring the same as mirroring the whole mask
+        columns = np.flatnonzero(mask.any(axis=0))
+        margin = max(-first, first + len(kernel) - 1) + 1
+        top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, height)
+        left, right = max(columns[0] - margin, 0), min(columns[-1] + margin + 1, width)
+        part = mask[top:bottom, left:right]
+        part = _blur(part, kernel, first, 0)
+        mask[top:bottom, left:right] = _blur(part, kernel, first, 1)
+    return np.ascontiguousarray(mask[::-1])
+
+
+def _get_mask_key(region, width, height):
+    shapes = tuple(
+        tuple(tuple(point.__getstate__()) for point in shape.points) \
+        for shape in region.shapes)
+    return (shapes, region.falloff, width, height)
+
+
+def apply_color_corrections(
+    image:np.ndarray, ccs:Iterable[ColorCorrection],
+    masks:Optional[Dict[Tuple, np.ndarray]]=None)->np.ndarray:
+    """
+    Apply the given color corrections in order to a copy of the image.
+
+    Args:
+        image (np.ndarray): Float array of shape (height, width, 3 or 4)
+        ccs (Iterable[ColorCorrection]): Color corrections to apply
+
+    Kwargs:
+        masks (Optional[Dict[Tuple, np.ndarray]]): Dict in which the region
+            masks are cached by shapes, falloff and resolution, to reuse
+            them when correcting more images
+
+    Returns:
+        (np.ndarray): Float32 corrected image
+
+    .. code-block:: python
+
+        masks = {}
+        for frame, image in images.items():
+            ccs = get_ccs_at(color_corrections, frame)
+            corrected = apply_color_corrections(image, ccs, masks)
+    """
+    image = np.array(image, dtype=np.float32)
+    height, width = image.shape[:2]
+    rgb = np.ascontiguousarray(np.moveaxis(image[..., :3], -1, 0))
+    for cc in ccs:
+        if cc.mute: continue
+        nodes = [
+            node for node in cc.nodes \
+            if isinstance(node, (ColorTimer, Grade)) and not node.mute]
+        if not nodes: continue
+        alpha = None
+        if cc.region:
+            key = _get_mask_key(cc.region, width, height)
+            alpha = None if masks is None else masks.get(key)
+            if alpha is None:
+                alpha = get_region_mask(cc.region, width, height)
+                if masks is not None: masks[key] = alpha
+        for node in nodes:
+            corrected = rgb if alpha is None else rgb.copy()
+            if isinstance(node, ColorTimer): apply_color_timer(corrected, node)
+            else: apply_grade(corrected, node)
+            if alpha is not None:
+                corrected -= rgb
+                corrected *= alpha
+                rgb += corrected
+    image[..., :3] = np.moveaxis(rgb, 0, -1)
+    return image
+
+
+def get_ccs_at(
+    color_corrections:ColorCorrections,
+    frame:Optional[int]=None)->List[ColorCorrection]:
+    """
+    Get the clip color corrections followed by the color corrections of the
+    given frame, in the order in which they are rendered.
+    """
+    cc_ids = color_corrections.get_cc_ids()
+    if frame is not None:
+        cc_ids += color_corrections.get_cc_ids(frame)
+    return [color_corrections.id_to_cc[cc_id] for cc_id in cc_ids]
+
+
+def apply_clip_color_corrections(
+    image:np.ndarray, color_corrections:ColorCorrections,
+    frame:Optional[int]=None,
+    masks:Optional[Dict[Tuple, np.ndarray]]=None)->np.ndarray:
+    """
+    Apply the clip color corrections and the color corrections of the given
+    frame to a copy of the image.
+
+    Args:
+        image (np.ndarray): Float array of shape (height, width, 3 or 4)
+        color_corrections (ColorCorrections): Color corrections of a clip
+
+    Kwargs:
+        frame (Optional[int]): Clip frame of the image
+        masks (Optional[Dict[Tuple, np.ndarray]]): Cache of region masks,
+            see apply_color_corrections
+
+    Returns:
+        (np.ndarray): Float32 corrected image
+    """
+    return apply_color_corrections(
+        image, get_ccs_at(color_corrections, frame), masks)
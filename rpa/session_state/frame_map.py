@@ -0,0 +1,165 @@
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def _append_run(runs, first, length, step):
+    """
+    Append the run to the given runs keeping them canonical, which is the
+    runs that are obtained by going through the clip frames in order and
+    extending the last run for as long as the next clip frame continues it.
+    Runs of a single clip frame always have a step of 1.
+    """
+    if length <= 0: return
+    if length == 1: step = 1
+    if runs:
+        last_first, last_length, last_step = runs[-1]
+        if last_length == 1:
+            # the step of a single clip frame run is set by what follows it
+            last_step = first - last_first
+            continues = last_step in (0, 1)
+        else:
+            continues = first == last_first + last_length * last_step
+        if continues:
+            if length == 1 or step == last_step:
+                runs[-1] = (last_first, last_length + length, last_step)
+                return
+            runs[-1] = (last_first, last_length + 1, last_step)
+            first += step
+            length -= 1
+            if length == 1: step = 1
+    runs.append((first, length, step))
+
+
+class FrameMap(Mapping):
+    """
+    Read only mapping of local frames, starting from 1, to clip frames.
+
+    The clip frames are stored as runs of (first clip frame, length, step)
+    where step is 1 for consecutive clip frames and 0 for a held clip frame.
+    Since the runs are canonical, frame maps with the same frames have the
+    same runs and are compared in O(runs). Looking up a local frame is
+    O(log runs) and edits return a new frame map in O(runs).
+    """
+    __slots__ = ("__runs", "__starts", "__length")
+
+    def __init__(self, runs:Iterable[Tuple[int, int, int]]=()):
+        canonical_runs = []
+        for first, length, step in runs:
+            _append_run(canonical_runs, first, length, step)
+        self.__runs = tuple(canonical_runs)
+        self.__starts = []
+        length = 0
+        for _, run_length, _ in self.__runs:
+            self.__starts.append(length)
+            length += run_length
+        self.__length = length
+
+    @classmethod
+    def from_range(cls, first:int, last:int)->"FrameMap":
+        return cls([(first, last - first + 1, 1)])
+
+    @property
+    def runs(self)->Tuple[Tuple[int, int, int]]:
+        return self.__runs
+
+    def __getitem__(self, local_frame):
+        index = local_frame - 1
+        if not 0 <= index < self.__length:
+            raise KeyError(local_frame)
+        run_index = bisect_right(self.__starts, index) - 1
+        first, _, step = self.__runs[run_index]
+        return first + (index - self.__starts[run_index]) * step
+
+    def __len__(self):
+        return self.__length
+
+    def __iter__(self):
+        return iter(range(1, self.__length + 1))
+
+    def __contains__(self, local_frame):
+        return isinstance(local_frame, int) and \
+            1 <= local_frame <= self.__length
+
+    def __eq__(self, other):
+        if isinstance(other, FrameMap):
+            return self.__runs == other.__runs
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FrameMap({list(self.__runs)})"
+
+    def values(self)->Iterator[int]:
+        for first, length, step in self.__runs:
+            if step:
+                yield from range(first, first + length)
+            else:
+                for _ in range(length):
+                    yield first
+
+    def items(self)->Iterator[Tuple[int, int]]:
+        return zip(range(1, self.__length + 1), self.values())
+
+    def get_first_local_frames(
+        self, clip_frames:Iterable[int])->Dict[int, int]:
+        """
+        Get the first local frame of each of the given clip frames, leaving
+        out the clip frames that are not in the frame map.
+        """
+        remaining = set(clip_frames)
+        first_local_frames = {}
+        for (first, length, step), start in zip(self.__runs, self.__starts):
+            if not remaining: break
+            last = first + (length - 1) * step
+            found = [
+                clip_frame for clip_frame in remaining \
+                if first <= clip_frame <= last]
+            for clip_frame in found:
+                first_local_frames[clip_frame] = start + clip_frame - first + 1
+            remaining.difference_update(found)
+        return first_local_frames
+
+    def hold(self, local_frame:int, num_frames:int)->"FrameMap":
+        """
+        Hold the clip frame of the given local frame for num_frames more
+        frames after it.
+        """
+        runs = self.__slice(0, local_frame)
+        runs.append((self[local_frame], num_frames, 0))
+        runs.extend(self.__slice(local_frame, self.__length))
+        return FrameMap(runs)
+
+    def drop(self, local_frame:int, num_frames:int)->"FrameMap":
+        """
+        Drop num_frames frames starting from the given local frame.
+        """
+        runs = self.__slice(0, local_frame - 1)
+        runs.extend(
+            self.__slice(local_frame - 1 + num_frames, self.__length))
+        return FrameMap(runs)
+
+    def shifted(self, offset:int)->"FrameMap":
+        """
+        Frame map with the given offset added to all its clip frames.
+        """
+        return FrameMap(
+            (first + offset, length, step) \
+            for first, length, step in self.__runs)
+
+    def __slice(self, begin, end)->List[Tuple[int, int, int]]:
+        # runs of the local frames in the index range [begin, end)
+        end = min(end, self.__length)
+        if begin >= end: return []
+        runs = []
+        run_index = bisect_right(self.__starts, begin) - 1
+        while run_index < len(self.__runs):
+            run_start = self.__starts[run_index]
+            if run_start >= end: break
+            first, length, step = self.__runs[run_index]
+            skip = max(begin - run_start, 0)
+            length = min(run_start + length, end) - run_start - skip
+            runs.append((first + skip * step, length, step))
+            run_index += 1
+        return runs
@@ -0,0 +1,215 @@
+from bisect import bisect_right
+from itertools import chain
+from typing import Any, Hashable, Iterable, List, Tuple
+
+
+_MISSING = object()
+
+
+class IndexedDict:
+    """
+    Ordered mapping of keys to values that also supports lookups by
+    position and inserting and moving keys in bulk without rebuilding the
+    whole mapping.
+
+    The keys are kept in order in a list of blocks of at most 2 * LOAD keys
+    each. Finding the position of a key or the key at a position only
+    touches the block that holds it and the start positions of the blocks,
+    which are recomputed lazily after blocks change. Inserting or moving k
+    keys is hence O(k * (LOAD + n / LOAD)) instead of the O(n) rebuild of
+    a dict.
+    """
+    LOAD = 256
+
+    def __init__(self):
+        self.__values = {}
+        self.__blocks = []
+        self.__block_of = {} # key -> block holding the key
+        # start position of each block and index of each block by its id,
+        # None when the blocks have changed since they were computed.
+        self.__offsets = None
+        self.__block_indexes = None
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __contains__(self, key):
+        return key in self.__values
+
+    def __iter__(self):
+        for block in self.__blocks:
+            yield from block
+
+    def __getitem__(self, key):
+        return self.__values[key]
+
+    def __setitem__(self, key, value):
+        # New keys are appended at the end
+        self.insert(len(self), [(key, value)])
+
+    def get(self, key:Hashable, default:Any=None)->Any:
+        return self.__values.get(key, default)
+
+    def keys(self)->List[Hashable]:
+        return list(chain.from_iterable(self.__blocks))
+
+    def values(self)->List[Any]:
+        values = self.__values
+        return [values[key] for key in self]
+
+    def items(self)->List[Tuple[Hashable, Any]]:
+        values = self.__values
+        return [(key, values[key]) for key in self]
+
+    def index(self, key:Hashable)->int:
+        block = self.__block_of.get(key)
+        if block is None:
+            raise ValueError(f"{key} is not in IndexedDict")
+        self.__update_offsets()
+        return self.__offsets[self.__block_indexes[id(block)]] + \
+            block.index(key)
+
+    def key_at(self, index:int)->Hashable:
+        size = len(self)
+        if index < 0: index += size
+        if not 0 <= index < size:
+            raise IndexError("IndexedDict index out of range")
+        self.__update_offsets()
+        block_index = bisect_right(self.__offsets, index) - 1
+        return self.__blocks[block_index][
+            index - self.__offsets[block_index]]
+
+    def insert(self, index:int, items:Iterable[Tuple[Hashable, Any]]):
+        """
+        Insert the given (key, value) items at the given index. An index
+        that is past the end appends the items and a negative index
+        prepends them. Keys that are already present keep their position
+        and only get their value updated.
+        """
+        keys = []
+        for key, value in items:
+            if key not in self.__values: keys.append(key)
+            self.__values[key] = value
+        if keys:
+            self.__attach(index, keys)
+
+    def pop(self, key:Hashable, default:Any=_MISSING)->Any:
+        if key not in self.__values:
+            if default is _MISSING: raise KeyError(key)
+            return default
+        self.__detach(key)
+        return self.__values.pop(key)
+
+    def clear(self):
+        self.__values.clear()
+        self.__blocks.clear()
+        self.__block_of.clear()
+        self.__offsets = None
+
+    def move_to_index(self, keys:Iterable[Hashable], index:int):
+        """
+        Move the given keys, in their current order, to the given index.
+        Has the same outcome as utils.move_list_items_to_index.
+        """
+        positions = sorted(
+            (self.index(key), key) for key in set(keys) if key in self)
+        if not positions: return
+        size = len(self)
+        count = sum(1 for position, _ in positions if position <= index)
+        if index < 0:
+            index = 0
+        elif index >= size:
+            index = size - len(positions)
+        elif count > 1:
+            index = index - count + 1
+        keys = [key for _, key in positions]
+        for key in keys:
+            self.__detach(key)
+        self.__attach(index, keys)
+
+    def move_by_offset(self, keys:Iterable[Hashable], offset:int):
+        """
+        Move each of the given keys by the given offset without moving
+        them past each other. Has the same outcome as
+        utils.negative_list_move and utils.positive_list_move.
+        """
+        keys = set(key for key in keys if key in self)
+        if not keys or offset == 0: return
+        positions = sorted(self.index(key) for key in keys)
+        last = len(self) - 1
+        # The keys are moved one by one starting with the one that is moved
+        # towards the closest end, so that the positions of the keys that
+        # are still to be moved are not affected.
+        if offset < 0:
+            for position in positions:
+                key = self.key_at(position)
+                target = max(0, position + offset)
+                while target < position and self.key_at(target) in keys:
+                    target += 1
+                self.__move(key, target)
+        else:
+            for position in reversed(positions):
+                key = self.key_at(position)
+                target = min(last, position + offset)
+                while target > position and self.key_at(target) in keys:
+                    target -= 1
+                self.__move(key, target)
+
+    def __move(self, key, index):
+        self.__detach(key)
+        self.__attach(index, [key])
+
+    def __update_offsets(self):
+        if self.__offsets is not None: return
+        offsets = []
+        block_indexes = {}
+        start = 0
+        for block_index, block in enumerate(self.__blocks):
+            offsets.append(start)
+            block_indexes[id(block)] = block_index
+            start += len(block)
+        self.__offsets = offsets
+        self.__block_indexes = block_indexes
+
+    def __attach(self, index, keys):
+        blocks = self.__blocks
+        block_of = self.__block_of
+        size = len(block_of)
+        index = min(max(index, 0), size)
+        if not blocks:
+            block_index = 0
+            block = []
+            blocks.append(block)
+            position = 0
+        elif index == size:
+            block_index = len(blocks) - 1
+            block = blocks[block_index]
+            position = len(block)
+        else:
+            self.__update_offsets()
+            block_index = bisect_right(self.__offsets, index) - 1
+            block = blocks[block_index]
+            position = index - self.__offsets[block_index]
+        block[position:position] = keys
+        for key in keys:
+            block_of[key] = block
+
+        load = self.LOAD
+        if len(block) > 2 * load:
+            tail = block[load:]
+            del block[load:]
+            new_blocks = [
+                tail[start:start + load] for start in range(0, len(tail), load)]
+            for new_block in new_blocks:
+                for key in new_block:
+                    block_of[key] = new_block
+            blocks[block_index + 1:block_index + 1] = new_blocks
+        self.__offsets = None
+
+    def __detach(self, key):
+        block = self.__block_of.pop(key)
+        block.remove(key)
+        if not block:
+            self.__update_offsets()
+            del self.__blocks[self.__block_indexes[id(block)]]
+        self.__offsets = None
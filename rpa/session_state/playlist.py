@@ -1,18 +1,20 @@
 from rpa.session_state.clip import Clip
+from rpa.session_state.attr_store import AttrStore
+from rpa.session_state.indexed_dict import IndexedDict
 from typing import List, Optional, Tuple, Union
-from rpa.session_state.utils import \
-    insert_list_into_list, negative_list_move, positive_list_move, \
-    move_list_items_to_index
 
 
 class Playlist:
 
     def __init__(self, id, name):
         self.name = name
-        self.__clips = {}
+        self.__clips = IndexedDict()
         self.__id = id
         self.__custom_attrs = {}
         self.__active_clip_ids = []
+        self.__attr_store = AttrStore()
+        # rows of the clips in the attr_store in the order of the clips
+        self.__attr_rows = None
 
     @property
     def id(self):
@@ -30,6 +32,12 @@ class Playlist:
     # Clip Methods
     ###############
 
+    def get_clip_index(self, id)->int:
+        return self.__clips.index(id)
+
+    def get_clip_id_at(self, index:int)->str:
+        return self.__clips.key_at(index)
+
     def create_clips(
         self, paths:List[Union[str, Tuple[str, str]]], ids:List[str], index:Optional[int]=None):
         new_clips = {}
@@ -37,23 +45,13 @@ class Playlist:
             if isinstance(path, tuple):
                 # from a tuple of (video_path, audio_path), take video_path
                 path = path[0]
-            new_clips[id] = Clip(self.__id, id, path)
+            new_clips[id] = Clip(self.__id, id, path, self.__attr_store)
 
-        old_clip_ids = list(self.__clips.keys())
         new_clip_ids = list(new_clips.keys())
 
-        index = len(old_clip_ids) if index is None else index
-        clip_ids = \
-            insert_list_into_list(old_clip_ids, new_clip_ids, index)
-
-        clips = {}
-        for clip_id in clip_ids:
-            clip = self.__clips.get(clip_id)
-            if clip is None:
-                clip = new_clips.get(clip_id)
-            clips[clip_id] = clip
-        self.__clips.clear()
-        self.__clips.update(clips)
+        index = len(self.__clips) if index is None else index
+        self.__clips.insert(index, new_clips.items())
+        self.__attr_rows = None
 
         self.set_active_clips(new_clip_ids[0:1])
 
@@ -67,53 +65,41 @@ class Playlist:
         self.__active_clip_ids.extend(ids)
 
     def move_clips_to_index(self, index:int, ids):
-        reordered_ids = \
-            move_list_items_to_index(list(self.__clips.keys()), ids, index)
-
-        clips = {}
-        for id in reordered_ids:
-            clips[id] = self.__clips.get(id)
-
-        self.__clips.clear()
-        self.__clips.update(clips)
+        self.__clips.move_to_index(ids, index)
+        self.__attr_rows = None
 
     def move_clips_by_offset(self, offset:int, ids):
         if len(ids) == 0:
             return
-        all_ids = list(self.__clips.keys())
-        if offset < 0:
-            negative_list_move(all_ids, ids, offset)
-        else:
-            positive_list_move(all_ids, ids, offset)
-
-        clips = {}
-        for id in all_ids:
-            clip = self.__clips.get(id)
-            clips[id] = clip
-        self.__clips.clear()
-        self.__clips.update(clips)
+        self.__clips.move_by_offset(ids, offset)
+        self.__attr_rows = None
 
     def delete_clips(self, ids):
-        max_index = 0
-        clip_ids = list(self.__clips.keys())
-        for index, clip_id in enumerate(clip_ids):
-            if clip_id in ids and index > max_index:
-                max_index = index
-        reverse_index = max_index + 1 - len(clip_ids)
+        max_index = max(
+            [0] + [self.__clips.index(id) for id in ids if id in self.__clips])
+        reverse_index = max_index + 1 - len(self.__clips)
         reverse_index = min(reverse_index, -1)
 
         for id in ids:
             clip = self.__clips.pop(id)
             clip.delete()
+        self.__attr_rows = None
 
-        clip_ids = list(self.__clips.keys())
-        if clip_ids:
-            reverse_index = max(reverse_index, -len(clip_ids))
-            active_clips = [clip_ids[reverse_index]]
+        num_of_clips = len(self.__clips)
+        if num_of_clips:
+            reverse_index = max(reverse_index, -num_of_clips)
+            active_clips = [self.__clips.key_at(reverse_index)]
         else:
             active_clips = []
         self.set_active_clips(active_clips)
 
+    def get_attr_column(self, attr_id:str)->List:
+        # None for the clips that do not have a value for the attr
+        if self.__attr_rows is None:
+            self.__attr_rows = \
+                [clip.attr_row for clip in self.__clips.values()]
+        return self.__attr_store.get_column(attr_id, self.__attr_rows)
+
     # Playlist Methods
     ##################
 
@@ -132,6 +118,8 @@ class Playlist:
         for clip_id in clip_ids:
             clip = self.__clips.pop(clip_id)
             clip.delete()
+        self.__attr_store.clear()
+        self.__attr_rows = None
         self.__custom_attrs.clear()
         self.name = None
         self.__id = None
@@ -3,9 +3,7 @@ from rpa.session_state.clip import Clip
 from rpa.session_state.viewport import Viewport
 from rpa.session_state.attrs_metadata import AttrsMetadata
 from rpa.session_state.timeline import Timeline
-from rpa.session_state.utils import \
-    insert_list_into_list, positive_list_move, negative_list_move, \
-    move_list_items_to_index
+from rpa.session_state.indexed_dict import IndexedDict
 from typing import List, Any, Optional
 from rpa.utils.sequential_uuid_generator import SequentialUUIDGenerator
 import os
@@ -82,7 +80,7 @@ class Session:
         self.__playlist_uuid_generator = SequentialUUIDGenerator(
             os.environ.get("PLAYLIST_UUID_SEED", uuid.uuid4().hex))
 
-        self.__playlists = {}
+        self.__playlists = IndexedDict()
         self.__deleted_playlists = {}
         self.__activated_clip_indexes = []
         self.__custom_attrs = {}
@@ -126,22 +124,8 @@ class Session:
         for id, name in zip(ids, names):
             new_playlists[id] = Playlist(id, name)
 
-        old_playlist_ids = list(self.__playlists.keys())
-        new_playlist_ids = list(new_playlists.keys())
-
-        index = len(old_playlist_ids) if index is None else index
-        playlist_ids = \
-            insert_list_into_list(old_playlist_ids, new_playlist_ids, index)
-
-        playlists = {}
-        for playlist_id in playlist_ids:
-            playlist = self.__playlists.get(playlist_id)
-            if playlist is None:
-                playlist = new_playlists.get(playlist_id)
-            playlists[playlist_id] = playlist
-
-        self.__playlists.clear()
-        self.__playlists.update(playlists)
+        index = len(self.__playlists) if index is None else index
+        self.__playlists.insert(index, new_playlists.items())
 
     def get_playlist_ids(self)->list:
         return list(self.__playlists.keys())
@@ -153,36 +137,10 @@ class Session:
         return playlist
 
     def move_playlists_to_index(self, index:int, ids):
-        reordered_ids = \
-            move_list_items_to_index(list(self.__playlists.keys()), ids, index)
-
-        playlists = {}
-        for id in reordered_ids:
-            playlists[id] = self.__playlists.get(id)
-
-        self.__playlists.clear()
-        self.__playlists.update(playlists)
+        self.__playlists.move_to_index(ids, index)
 
     def move_playlists_by_offset(self, offset:int, ids):
-        to_move = []
-        for id in ids:
-            playlist = self.__playlists.get(id)
-            if playlist is None: continue
-            to_move.append(id)
-
-        all_ids = list(self.__playlists.keys())
-        if offset < 0:
-            negative_list_move(all_ids, to_move, offset)
-        else:
-            positive_list_move(all_ids, to_move, offset)
-
-        playlists = {}
-        for id in all_ids:
-            playlist = self.__playlists.get(id)
-            playlists[id] = playlist
-
-        self.__playlists.clear()
-        self.__playlists.update(playlists)
+        self.__playlists.move_by_offset(ids, offset)
 
     def delete_playlists(self, ids):
         for id in ids:
@@ -199,20 +157,8 @@ class Session:
             if self.__deleted_playlists.get(id) is None: continue
             restored_playlists[id] = self.__deleted_playlists.pop(id)
 
-        index = len(self.__playlists.keys()) if index is None else index
-        playlist_ids = insert_list_into_list(
-            list(self.__playlists.keys()),
-            list(restored_playlists.keys()), index)
-
-        playlists = {}
-        for playlist_id in playlist_ids:
-            playlist = self.__playlists.get(playlist_id)
-            if playlist is None:
-                playlist = restored_playlists.get(playlist_id)
-            playlists[playlist_id] = playlist
-
-        self.__playlists.clear()
-        self.__playlists.update(playlists)
+        index = len(self.__playlists) if index is None else index
+        self.__playlists.insert(index, restored_playlists.items())
 
     def delete_playlists_permanently(self, ids):
         for id in ids:
@@ -238,14 +184,13 @@ class Session:
         if id == self.__viewport.fg:
             if self.__viewport.bg is not None: self.__viewport.bg = None
 
-            ids = list(self.__playlists.keys())
-            if len(ids) > 1:
-                index = ids.index(self.__viewport.fg)
+            if len(self.__playlists) > 1:
+                index = self.__playlists.index(self.__viewport.fg)
                 if index > 0:
                     index -= 1
                 else:
                     index += 1
-                self.__viewport.fg = ids[index]
+                self.__viewport.fg = self.__playlists.key_at(index)
             else:
                 self.__viewport.fg = None
 
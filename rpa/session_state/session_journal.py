@@ -0,0 +1,586 @@
+import os
+import gc
+import json
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from rpa.session_state.annotations import Annotation, Stroke, Text
+from rpa.session_state.color_corrections import ColorCorrection
+from rpa.session_state.clips_snapshot import \
+    get_clips_snapshot, decode_clip_snapshot
+
+# The session journal is an append-only file of json records, one per
+# line. Each record is a list whose first item is the name of the
+# mutation and whose other items are its arguments. The first record of
+# a journal is a snapshot of the whole session, every other record is
+# applied on top of it in order.
+#
+# Structural mutations, attr values and the strokes and texts added to
+# annotations are recorded with the arguments of the api method that made
+# them. Other annotation and color correction edits are recorded as the
+# resulting state of the edited annotation or color corrections, so that
+# replaying them does not depend on undo stacks or on the ids of the nodes
+# of the color corrections.
+
+SNAPSHOT = "snapshot"
+SET_RO_ANNOTATIONS = "set_ro_annotations" # clip_id, frame, [annotation states]
+DELETE_RO_ANNOTATIONS = "delete_ro_annotations" # [clip_ids]
+SET_RW_ANNOTATION = "set_rw_annotation" # clip_id, frame, annotation state/None
+APPEND_STROKES = "append_strokes" # clip_id, frame, [stroke states]
+APPEND_TEXTS = "append_texts" # clip_id, frame, [text states]
+SET_TEXT = "set_text" # clip_id, frame, text state
+SET_RO_CCS = "set_ro_ccs" # clip_id, [(frame, cc state), ...]
+SET_RW_CCS = "set_rw_ccs" # clip_id, [(frame, cc state), ...]
+
+REPLAY_CHUNK_SIZE = 10000
+
+# Records that hold the whole state of something, by the number of their
+# items that tell what that something is. Only the last record of each
+# such thing needs to be replayed, and when it was not flushed yet, it
+# replaces the previous one in the journal.
+COALESCED_RECORD_KEYS = {
+    SET_RO_ANNOTATIONS: 3,
+    SET_RW_ANNOTATION: 3,
+    SET_RO_CCS: 2,
+    SET_RW_CCS: 2,
+}
+
+# Records that edit the rw annotation of a clip and frame on top of its
+# current state
+RW_ANNOTATION_EDIT_RECORDS = {APPEND_STROKES, APPEND_TEXTS, SET_TEXT}
+
+# Records that only change the playlists and the clips they hold, which
+# the coalesced records and attr values do not depend on, so that they can
+# be replayed in between those
+STRUCTURAL_RECORDS = {
+    "create_playlists", "delete_playlists", "restore_playlists",
+    "delete_playlists_permanently", "move_playlists_to_index",
+    "move_playlists_by_offset", "set_playlist_name", "set_fg_playlist",
+    "set_bg_playlist", "create_clips", "delete_clips_permanently",
+    "move_clips_to_index", "move_clips_by_offset", "restore_clips_snapshot",
+}
+
+
+def get_session_snapshot(session)->Dict:
+    """
+    Get a snapshot of the playlists of the session, including the deleted
+    ones, their clips, the FG and BG playlists and the custom attrs of the
+    session and of its playlists, with all their ids, as json serializable
+    values.
+    """
+    def get_playlists_snapshot(playlist_ids):
+        playlists = []
+        for playlist_id in playlist_ids:
+            playlist = session.get_playlist(playlist_id)
+            playlists.append({
+                "id": playlist_id,
+                "name": playlist.name,
+                "custom_attrs": {
+                    attr_id: playlist.get_custom_attr(attr_id) \
+                    for attr_id in playlist.get_custom_attr_ids()},
+                "clips": get_clips_snapshot(session, playlist.clip_ids)})
+        return playlists
+
+    return {
+        "playlists": get_playlists_snapshot(session.get_playlist_ids()),
+        "deleted_playlists": \
+            get_playlists_snapshot(session.get_deleted_playlist_ids()),
+        "custom_attrs": {
+            attr_id: session.get_custom_session_attr(attr_id) \
+            for attr_id in session.get_custom_session_attr_ids()},
+        "fg": session.viewport.fg,
+        "bg": session.viewport.bg}
+
+
+def restore_session_snapshot(session, snapshot:Dict):
+    """
+    Replace the playlists of the session with the ones of the snapshot,
+    keeping their ids and the ids of their clips.
+    """
+    old_playlist_ids = \
+        session.get_playlist_ids() + session.get_deleted_playlist_ids()
+    playlists = snapshot["playlists"] + snapshot.get("deleted_playlists", [])
+    if {playlist["id"] for playlist in playlists} & set(old_playlist_ids):
+        session.delete_playlists_permanently(old_playlist_ids)
+        # The session is never left without a playlist, so it has a new
+        # empty one at this point
+        old_playlist_ids = session.get_playlist_ids()
+
+    session.create_playlists(
+        [playlist["name"] for playlist in playlists], None,
+        [playlist["id"] for playlist in playlists])
+    # Deleting playlists permanently runs a full garbage collection, which
+    # is cheap before the clips of the snapshot are created
+    session.delete_playlists_permanently(old_playlist_ids)
+    for playlist in playlists:
+        for attr_id, value in playlist.get("custom_attrs", {}).items():
+            session.set_custom_playlist_attr(playlist["id"], attr_id, value)
+        clips = playlist["clips"]
+        restore_clips_snapshot(session, playlist["id"], clips, None, list(clips))
+    for attr_id, value in snapshot.get("custom_attrs", {}).items():
+        session.set_custom_session_attr(attr_id, value)
+    session.delete_playlists(
+        [playlist["id"] for playlist in snapshot.get("deleted_playlists", [])])
+
+    session.set_fg_playlist(snapshot["fg"])
+    session.set_bg_playlist(snapshot.get("bg"))
+
+
+def restore_clips_snapshot(
+    session, playlist_id:str, snapshot:Dict, index:Optional[int],
+    ids:List[str])->List[str]:
+    """
+    Same as SessionApi.restore_clips_snapshot, on the session state.
+    """
+    playlist = session.get_playlist(playlist_id)
+    clips_data = list(snapshot.values())
+    start = len(playlist.clip_ids) if index is None else index
+    playlist.create_clips(
+        [clip_data["attrs"]["media_path"] for clip_data in clips_data],
+        ids, index)
+    for clip_id, clip_data in zip(ids, clips_data):
+        clip = session.get_clip(clip_id)
+        for attr_id, value in clip_data.get("attrs", {}).items():
+            clip.set_attr_value(attr_id, value)
+        for attr_id, value in clip_data.get("custom_attrs", {}).items():
+            clip.set_custom_attr(attr_id, value)
+        ro_annos, rw_annos, ro_ccs, rw_ccs = decode_clip_snapshot(clip_data)
+        for frame, annotations in ro_annos.items():
+            clip.annotations.set_ro_annotations(frame, annotations)
+        for frame, annotation in rw_annos.items():
+            clip.annotations.set_rw_annotation(frame, annotation)
+        if ro_ccs: clip.color_corrections.set_ro_ccs(ro_ccs)
+        if rw_ccs: clip.color_corrections.set_rw_ccs(rw_ccs)
+    __update_play_order(session, playlist, start)
+    return ids
+
+
+def __update_play_order(session, playlist, start=0, stop=None):
+    # Only the clips in [start, stop) moved, so only their play orders need
+    # to be updated
+    if stop is None: clip_ids = playlist.clip_ids[start:]
+    else: clip_ids = [playlist.get_clip_id_at(index) for index in range(start, stop)]
+    for index, clip_id in enumerate(clip_ids, start):
+        session.get_clip(clip_id).set_attr_value("play_order", index + 1)
+
+
+def __get_playlists_of_clips(session, clip_ids):
+    playlists = {}
+    for clip_id in clip_ids:
+        clip = session.get_clip(clip_id)
+        if clip is None: continue
+        playlists.setdefault(clip.playlist_id, []).append(clip_id)
+    return playlists
+
+
+def __create_clips(session, playlist_id, paths, index, ids):
+    # json turns the (video_path, audio_path) tuples into lists
+    paths = [tuple(path) if isinstance(path, list) else path for path in paths]
+    playlist = session.get_playlist(playlist_id)
+    start = len(playlist.clip_ids) if index is None else index
+    playlist.create_clips(paths, ids, index)
+    for clip_id in ids:
+        clip = session.get_clip(clip_id)
+        clip.set_attr_value("media_path", clip.path)
+    __update_play_order(session, playlist, start)
+
+
+def __delete_clips_permanently(session, ids):
+    for playlist_id, clip_ids in __get_playlists_of_clips(session, ids).items():
+        playlist = session.get_playlist(playlist_id)
+        start = min(playlist.get_clip_index(clip_id) for clip_id in clip_ids)
+        playlist.delete_clips(clip_ids)
+        __update_play_order(session, playlist, start)
+
+
+def __move_clips(session, ids, move):
+    for playlist_id, clip_ids in __get_playlists_of_clips(session, ids).items():
+        playlist = session.get_playlist(playlist_id)
+        indexes = [playlist.get_clip_index(clip_id) for clip_id in clip_ids]
+        move(playlist, clip_ids)
+        indexes += [playlist.get_clip_index(clip_id) for clip_id in clip_ids]
+        __update_play_order(session, playlist, min(indexes), max(indexes) + 1)
+
+
+def __move_clips_to_index(session, index, ids):
+    __move_clips(
+        session, ids,
+        lambda playlist, clip_ids: playlist.move_clips_to_index(index, clip_ids))
+
+
+def __move_clips_by_offset(session, offset, ids):
+    __move_clips(
+        session, ids,
+        lambda playlist, clip_ids: playlist.move_clips_by_offset(offset, clip_ids))
+
+
+def __set_playlist_name(session, id, name):
+    session.get_playlist(id).name = name
+
+
+def __set_clip_path(session, id, path):
+    clip = session.get_clip(id)
+    clip.path = path
+    clip.set_attr_value("media_path", path)
+
+
+def __set_attr_values(session, attr_values):
+    for _, clip_id, attr_id, value in attr_values:
+        clip = session.get_clip(clip_id)
+        if clip is None: continue
+        # Same as SessionApi.set_attr_values
+        if clip.has_frame_edits() and attr_id == "key_in": continue
+        clip.set_attr_value(attr_id, value)
+
+
+def __set_attr_values_at(session, attr_values_at):
+    for _, clip_id, attr_id, key, value in attr_values_at:
+        clip = session.get_clip(clip_id)
+        if clip is not None: clip.set_attr_value_at(attr_id, key, value)
+
+
+def __clear_attr_values_at(session, attr_values_at):
+    for _, clip_id, attr_id, key in attr_values_at:
+        clip = session.get_clip(clip_id)
+        if clip is None or not session.attrs_metadata.is_keyable(attr_id):
+            continue
+        clip.clear_attr_value_at(attr_id, key)
+        if clip.get_key_values(attr_id):
+            clip.update_interpolation(attr_id)
+        else:
+            clip.update_keyable_attrs(
+                attr_id, session.attrs_metadata.get_default_value(attr_id))
+
+
+def __edit_frames(session, clip_id, edit, local_frame, num_frames):
+    session.get_clip(clip_id).edit_frames(edit, local_frame, num_frames)
+
+
+def __reset_frames(session, clip_id):
+    session.get_clip(clip_id).reset_frames()
+
+
+def __set_ro_annotations(session, clip_id, frame, states):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.annotations.set_ro_annotations(
+        frame, [Annotation().__setstate__(state) for state in states])
+
+
+def __delete_ro_annotations(session, clip_ids):
+    for clip_id in clip_ids:
+        clip = session.get_clip(clip_id)
+        if clip is not None: clip.annotations.delete_ro()
+
+
+def __append_strokes(session, clip_id, frame, states):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.annotations.append_strokes(
+        frame, [Stroke().__setstate__(state) for state in states])
+
+
+def __append_texts(session, clip_id, frame, states):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.annotations.append_texts(
+        frame, [Text().__setstate__(state) for state in states])
+
+
+def __set_text(session, clip_id, frame, state):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.annotations.set_text(frame, Text().__setstate__(state))
+
+
+def __set_rw_annotation(session, clip_id, frame, state):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    if state is None: clip.annotations.delete_rw(frame)
+    else: clip.annotations.set_rw_annotation(frame, Annotation().__setstate__(state))
+
+
+def __set_ro_ccs(session, clip_id, ccs):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.color_corrections.set_ro_ccs(
+        [(frame, ColorCorrection().__setstate__(cc)) for frame, cc in ccs])
+
+
+def __set_rw_ccs(session, clip_id, ccs):
+    clip = session.get_clip(clip_id)
+    if clip is None: return
+    clip.color_corrections.set_rw_ccs(
+        [(frame, ColorCorrection().__setstate__(cc)) for frame, cc in ccs])
+
+
+def __restore_clips_snapshot(session, playlist_id, snapshot, index, ids):
+    restore_clips_snapshot(session, playlist_id, snapshot, index, ids)
+
+
+__APPLY_RECORD = {
+    SNAPSHOT: restore_session_snapshot,
+    "create_playlists":
+        lambda session, names, index, ids: session.create_playlists(names, index, ids),
+    "delete_playlists": lambda session, ids: session.delete_playlists(ids),
+    "restore_playlists":
+        lambda session, ids, index: session.restore_playlists(ids, index),
+    "delete_playlists_permanently":
+        lambda session, ids: session.delete_playlists_permanently(ids),
+    "move_playlists_to_index":
+        lambda session, index, ids: session.move_playlists_to_index(index, ids),
+    "move_playlists_by_offset":
+        lambda session, offset, ids: session.move_playlists_by_offset(offset, ids),
+    "set_playlist_name": __set_playlist_name,
+    "set_fg_playlist": lambda session, id: session.set_fg_playlist(id),
+    "set_bg_playlist": lambda session, id: session.set_bg_playlist(id),
+    "create_clips": __create_clips,
+    "delete_clips_permanently": __delete_clips_permanently,
+    "move_clips_to_index": __move_clips_to_index,
+    "move_clips_by_offset": __move_clips_by_offset,
+    "set_clip_path": __set_clip_path,
+    "restore_clips_snapshot": __restore_clips_snapshot,
+    "set_attr_values": __set_attr_values,
+    "set_attr_values_at": __set_attr_values_at,
+    "clear_attr_values_at": __clear_attr_values_at,
+    "edit_frames": __edit_frames,
+    "reset_frames": __reset_frames,
+    "set_custom_session_attr":
+        lambda session, attr_id, value: session.set_custom_session_attr(attr_id, value),
+    "set_custom_playlist_attr":
+        lambda session, playlist_id, attr_id, value: \
+            session.set_custom_playlist_attr(playlist_id, attr_id, value),
+    "set_custom_clip_attr":
+        lambda session, clip_id, attr_id, value: \
+            session.set_custom_clip_attr(clip_id, attr_id, value),
+    SET_RO_ANNOTATIONS: __set_ro_annotations,
+    DELETE_RO_ANNOTATIONS: __delete_ro_annotations,
+    SET_RW_ANNOTATION: __set_rw_annotation,
+    APPEND_STROKES: __append_strokes,
+    APPEND_TEXTS: __append_texts,
+    SET_TEXT: __set_text,
+    SET_RO_CCS: __set_ro_ccs,
+    SET_RW_CCS: __set_rw_ccs,
+}
+
+def apply_record(session, record:List):
+    """
+    Apply the given journal record to the session state.
+    """
+    __APPLY_RECORD[record[0]](session, *record[1:])
+
+
+@contextmanager
+def __gc_disabled():
+    # Reading and replaying a journal only creates objects, so the garbage
+    # collector would keep going through them without finding anything to
+    # collect. The objects that exist when a chunk of records is parsed are
+    # frozen as well, so that the full collections made by the session,
+    # like when deleting playlists, do not go through them either.
+    #
+    # gc.freeze moves every tracked object of the process to the permanent
+    # generation, not only the ones of the journal. That only lasts until
+    # the objects are unfrozen on exit, which puts them back in the oldest
+    # generation, and nothing is collected in between anyway. gc.unfreeze
+    # would also undo a freeze made by the host application, so when the
+    # application froze objects itself, nothing is frozen here.
+    # Yields whether objects may be frozen.
+    is_gc_enabled = gc.isenabled()
+    can_freeze = gc.get_freeze_count() == 0
+    gc.disable()
+    try: yield can_freeze
+    finally:
+        if can_freeze: gc.unfreeze()
+        if is_gc_enabled: gc.enable()
+
+
+def __parse_records(lines:List[str])->Tuple[List[List], bool]:
+    try:
+        return json.loads("[" + ",".join(lines) + "]"), True
+    except json.JSONDecodeError:
+        pass
+    records = []
+    for line in lines:
+        try: records.append(json.loads(line))
+        except json.JSONDecodeError: return records, False
+    return records, True
+
+
+def __iter_records(path:str, chunk_size:int, can_freeze:bool):
+    with open(path) as file:
+        lines = file.read().splitlines()
+    # The snapshot is parsed on its own so that it is applied before the
+    # other records are held in memory
+    chunks = [lines[:1]] + [
+        lines[start:start + chunk_size] \
+        for start in range(1, len(lines), chunk_size)]
+    for chunk in chunks:
+        records, is_complete = __parse_records(chunk)
+        if can_freeze: gc.freeze()
+        yield from records
+        # A record that was cut short by a crash ends the journal
+        if not is_complete: return
+
+
+def read_journal(path:str)->List[List]:
+    """
+    Read the records of the journal at the given path. A last record that
+    was cut short by a crash is ignored.
+    """
+    with __gc_disabled() as can_freeze:
+        return list(__iter_records(path, REPLAY_CHUNK_SIZE, can_freeze))
+
+
+def coalesce_records(records:Iterable[List]):
+    """
+    Yield records that give the same session as the given ones when
+    applied, with only the last of the coalesced records of each thing,
+    the rw annotation edits made after it and the last value of each attr
+    of each clip, up to the next record that is none of those nor a
+    structural one.
+    """
+    attr_values = {} # (clip_id, attr_id) -> attr value
+    coalesced_records = {} # key -> [records]
+    def pop_pending_records():
+        if attr_values:
+            yield ["set_attr_values", list(attr_values.values())]
+            attr_values.clear()
+        for records_of_key in coalesced_records.values():
+            yield from records_of_key
+        coalesced_records.clear()
+
+    for record in records:
+        name = record[0]
+        num_key_items = COALESCED_RECORD_KEYS.get(name)
+        if num_key_items is not None:
+            # Records of different keys edit different things, so the
+            # order they are replayed in does not matter
+            coalesced_records[tuple(record[:num_key_items])] = [record]
+        elif name in RW_ANNOTATION_EDIT_RECORDS:
+            # Applied on top of the last rw annotation record of the frame
+            key = (SET_RW_ANNOTATION, record[1], record[2])
+            records_of_key = coalesced_records.get(key)
+            if records_of_key is None: coalesced_records[key] = [record]
+            else: records_of_key.append(record)
+        elif name == "set_attr_values":
+            for attr_value in record[1]:
+                attr_values[(attr_value[1], attr_value[2])] = attr_value
+        elif name in STRUCTURAL_RECORDS:
+            yield record
+        else:
+            yield from pop_pending_records()
+            yield record
+    yield from pop_pending_records()
+
+
+def replay_journal(path:str, apply:Callable[[List], None])->int:
+    """
+    Apply the records of the journal at the given path in order with the
+    given callable, like a partial of apply_record with a session. The
+    records are parsed REPLAY_CHUNK_SIZE at a time and coalesced with
+    coalesce_records as they are applied.
+
+    Returns:
+        (int): Number of records read from the journal
+    """
+    num_records = 0
+    def count(records):
+        nonlocal num_records
+        for record in records:
+            num_records += 1
+            yield record
+
+    with __gc_disabled() as can_freeze:
+        records = count(
+            __iter_records(path, REPLAY_CHUNK_SIZE, can_freeze))
+        for record in coalesce_records(records):
+            apply(record)
+    return num_records
+
+
+class SessionJournal:
+    """
+    Appends records to the journal file at the given path.
+
+    Records are buffered and written with a single write and fsync when
+    flush is called, or when max_buffered_records are buffered, so that
+    the cost of a mutation does not include a disk sync. compact replaces
+    the whole journal with a snapshot of the session.
+    """
+    MAX_BUFFERED_RECORDS = 256
+
+    def __init__(self, path:str, max_buffered_records:int=MAX_BUFFERED_RECORDS):
+        self.__path = path
+        self.__max_buffered_records = max_buffered_records
+        self.__buffer = []
+        self.__buffer_keys = []
+        self.__num_records = 0
+        self.__file = None
+
+    @property
+    def path(self)->str:
+        return self.__path
+
+    @property
+    def num_records(self)->int:
+        """
+        Number of records since the last compaction, including the
+        buffered ones.
+        """
+        return self.__num_records + len(self.__buffer)
+
+    def append(self, record:List)->bool:
+        """
+        Append the given record, which is written by the next flush.
+
+        Returns:
+            (bool): False if the record is not json serializable
+        """
+        try: line = json.dumps(record, separators=(",", ":"))
+        except (TypeError, ValueError): return False
+        num_key_items = COALESCED_RECORD_KEYS.get(record[0])
+        key = None if num_key_items is None else \
+            json.dumps(record[:num_key_items])
+        if key is not None and self.__buffer_keys and \
+            self.__buffer_keys[-1] == key:
+            self.__buffer[-1] = line
+            return True
+        self.__buffer.append(line)
+        self.__buffer_keys.append(key)
+        if len(self.__buffer) >= self.__max_buffered_records:
+            self.flush()
+        return True
+
+    def flush(self):
+        """
+        Write the buffered records and sync them to the disk.
+        """
+        if not self.__buffer: return
+        if self.__file is None:
+            self.__file = open(self.__path, "a")
+        self.__file.write("\n".join(self.__buffer) + "\n")
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__num_records += len(self.__buffer)
+        self.__buffer.clear()
+        self.__buffer_keys.clear()
+
+    def compact(self, snapshot:Dict):
+        """
+        Replace the journal with a single record holding the given snapshot
+        of the session, which already includes all the buffered records.
+        """
+        self.__buffer.clear()
+        self.__buffer_keys.clear()
+        self.close()
+        tmp_path = f"{self.__path}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(json.dumps([SNAPSHOT, snapshot], separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.__path)
+        self.__num_records = 1
+
+    def close(self):
+        if self.__file is None: return
+        self.__file.close()
+        self.__file = None
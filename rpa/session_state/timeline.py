@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from bisect import bisect_right
 
 
 @dataclass
@@ -21,8 +22,16 @@ class Timeline:
         self.__playing_state = PlayingState(False, True)
         self.__audio_state = AudioState(False, False, 100)
         self.__current_frame = 0
-        self.__seq_to_clip = {}
-        self.__clip_to_seq = {}
+        # One segment per active clip of the fg playlist in sequence order.
+        # Each segment has the clip id and its local frame map, the
+        # sequence frame at which each segment starts is kept in
+        # __seq_starts, which has an extra entry for the end of the
+        # sequence.
+        self.__segments = []
+        self.__seq_starts = [1]
+        self.__clip_to_segment = {}
+        # clip id -> (local frame map, {clip frame: [local frames]})
+        self.__clip_to_local_frames = {}
         self.__playback_mode = 0
 
     def set_playing_state(self, is_playing, is_forward):
@@ -50,55 +59,98 @@ class Timeline:
         return self.__current_frame
 
     def __get_start_frame(self):
-        frame = 0
-        if self.__seq_to_clip:
-            frame, _ = next(iter(self.__seq_to_clip.items()))
-        return frame
+        return 1 if self.__get_end_frame() else 0
 
     def __get_end_frame(self):
-        frame = 0
-        if self.__seq_to_clip:
-            frame, _ = next(iter(reversed(self.__seq_to_clip.items())))
-        return frame
+        return self.__seq_starts[-1] - 1
 
     def get_seq_frames(self, clip_id, frames=None):
-        seq_frames = self.__clip_to_seq.get(clip_id)
-        if not seq_frames: return []
-
-        if frames is None:
-            return [(clip_frame, seqs) for clip_frame, seqs in seq_frames.items()]
-        else:
-            return [(clip_frame, seqs) for clip_frame, seqs in seq_frames.items() if clip_frame in frames]
+        segment_index = self.__clip_to_segment.get(clip_id)
+        if segment_index is None: return []
+        offset = self.__seq_starts[segment_index] - 1
+        local_frames = self.__get_local_frames(*self.__segments[segment_index])
+
+        if frames is not None: frames = set(frames)
+        seq_frames = []
+        for clip_frame, frames_of_clip_frame in local_frames.items():
+            if frames is not None and clip_frame not in frames: continue
+            seq_frames.append(
+                (clip_frame, [offset + frame for frame in frames_of_clip_frame]))
+        return seq_frames
+
+    def get_seq_frames_for_clips(self, frames):
+        first_seq_frames = {}
+        for clip_id, clip_frames in frames.items():
+            segment_index = self.__clip_to_segment.get(clip_id)
+            if segment_index is None:
+                first_seq_frames[clip_id] = []
+                continue
+            offset = self.__seq_starts[segment_index] - 1
+            _, local_frame_map = self.__segments[segment_index]
+            if clip_frames is None:
+                clip_frames = local_frame_map.values()
+            seq_frames = [
+                offset + local_frame for local_frame in \
+                local_frame_map.get_first_local_frames(clip_frames).values()]
+            seq_frames.sort()
+            first_seq_frames[clip_id] = seq_frames
+        return first_seq_frames
 
     def get_clip_frames(self, seq_frames=None):
-        if not self.__seq_to_clip:
+        if not self.__segments:
             return []
 
         if seq_frames is None:
-            return list(self.__seq_to_clip.values())
+            return [
+                (clip_id, clip_frame, local_frame)
+                for clip_id, local_frame_map in self.__segments
+                for local_frame, clip_frame in local_frame_map.items()]
         else:
-            return [self.__seq_to_clip.get(seq_frame) for seq_frame in seq_frames]
+            return [self.__get_clip_frame(seq_frame) for seq_frame in seq_frames]
+
+    def __get_clip_frame(self, seq_frame):
+        seq_starts = self.__seq_starts
+        if seq_frame is None or not seq_starts[0] <= seq_frame < seq_starts[-1]:
+            return None
+        segment_index = bisect_right(seq_starts, seq_frame) - 1
+        clip_id, local_frame_map = self.__segments[segment_index]
+        local_frame = seq_frame - seq_starts[segment_index] + 1
+        return (clip_id, local_frame_map[local_frame], local_frame)
+
+    def __get_local_frames(self, clip_id, local_frame_map):
+        # Inverse of the local frame map of the clip, which is independent
+        # of where the clip is in the sequence and so only needs rebuilding
+        # when the frames of the clip change.
+        cached = self.__clip_to_local_frames.get(clip_id)
+        if cached is not None and cached[0] is local_frame_map:
+            return cached[1]
+        local_frames = {}
+        for local_frame, clip_frame in local_frame_map.items():
+            local_frames.setdefault(clip_frame, []).append(local_frame)
+        self.__clip_to_local_frames[clip_id] = (local_frame_map, local_frames)
+        return local_frames
 
     def update(self):
-        self.__seq_to_clip.clear()
-        self.__clip_to_seq.clear()
         playlist = self.__session.get_playlist(self.__session.viewport.fg)
-        clips = []
-        active_clip_ids = playlist.active_clip_ids
-        for clip_id in active_clip_ids:
-            clips.append(self.__session.get_clip(clip_id))
-
-        seq_frame = 1
-        for clip in clips:
+        segments = []
+        seq_starts = [1]
+        clip_to_segment = {}
+        for clip_id in playlist.active_clip_ids:
+            clip = self.__session.get_clip(clip_id)
+            # The clip replaces its local frame map whenever its frames
+            # change, so the map can be referenced instead of copied.
             local_frame_map = clip.get_local_frame_map()
-            src_frames = clip.get_source_frames()
-
-            for local_frame, clip_frame in local_frame_map.items():
-                src_frame = src_frames[local_frame - 1]
-                self.__seq_to_clip[seq_frame] = (clip.id, clip_frame, local_frame)
-                clip_to_seq = self.__clip_to_seq.setdefault(clip.id, {})
-                clip_to_seq.setdefault(clip_frame, []).append(seq_frame)
-                seq_frame += 1
+            clip_to_segment[clip_id] = len(segments)
+            segments.append((clip_id, local_frame_map))
+            seq_starts.append(seq_starts[-1] + len(local_frame_map))
+
+        self.__segments = segments
+        self.__seq_starts = seq_starts
+        self.__clip_to_segment = clip_to_segment
+        self.__clip_to_local_frames = {
+            clip_id: cached for clip_id, cached \
+            in self.__clip_to_local_frames.items() \
+            if clip_id in clip_to_segment}
 
         self.__current_frame = max(
             self.__get_start_frame(),
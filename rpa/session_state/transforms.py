@@ -1,4 +1,7 @@
+from bisect import bisect_right
+from collections import OrderedDict
 from dataclasses import dataclass, field
+import numpy as np
 from scipy import interpolate
 
 
@@ -51,16 +54,28 @@ SCALE_ATTRS = \
 
 
 class Interpolator:
+    """
+    Interpolates the y values of the given x values, which are expected to
+    be sorted. Values before the first x value and after the last x value
+    are held.
+
+    Linear interpolation, the default degree, is done with numpy.interp
+    and higher degrees with a scipy spline, so that any number of x values
+    can be evaluated with a single call to get_many.
+    """
     def __init__(self, x_values, y_values, degree=1):
         self.__size = len(x_values)
         if self.__size != len(y_values):
             raise RuntimeError("Lists sizes do not match")
-        self.__x_values = x_values
-        self.__y_values = y_values
+        self.__x_values = list(x_values)
+        self.__y_values = list(y_values)
+        self.__x_array = np.asarray(x_values, dtype=float)
+        self.__y_array = np.asarray(y_values, dtype=float)
         self.__interpolator = None
         if self.__size >= 2:
             k = min(degree, self.__size - 1)
-            self.__interpolator = interpolate.splrep(x_values, y_values, k=k)
+            if k > 1:
+                self.__interpolator = interpolate.splrep(x_values, y_values, k=k)
 
     def get(self, x, default=0.0):
         if self.__size == 0:
@@ -69,8 +84,39 @@ class Interpolator:
             return self.__y_values[0]
         if x >= self.__x_values[-1]:
             return self.__y_values[-1]
+        if self.__interpolator is None:
+            index = bisect_right(self.__x_values, x)
+            x0, x1 = self.__x_values[index - 1], self.__x_values[index]
+            y0, y1 = self.__y_values[index - 1], self.__y_values[index]
+            return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
         return float(interpolate.splev(x, self.__interpolator))
 
+    def get_many(self, x_values, default=0.0):
+        """
+        Get the interpolated values of all the given x values at once.
+
+        Args:
+            x_values (Iterable[float]): Values to interpolate at
+
+        Kwargs:
+            default (float): Value of all x values when there is nothing
+                to interpolate
+
+        Returns:
+            (numpy.ndarray): Interpolated values in the order of x_values
+        """
+        x_values = np.asarray(x_values, dtype=float)
+        if self.__size == 0:
+            return np.full(x_values.shape, default, dtype=float)
+        if self.__interpolator is None:
+            # np.interp holds the first and last y values past the ends
+            return np.interp(x_values, self.__x_array, self.__y_array)
+        y_values = np.asarray(
+            interpolate.splev(x_values, self.__interpolator), dtype=float)
+        y_values[x_values <= self.__x_array[0]] = self.__y_array[0]
+        y_values[x_values >= self.__x_array[-1]] = self.__y_array[-1]
+        return y_values
+
 
 class RotationInterpolator:
     def __init__(self, x_values, y_values, degree=1):
@@ -84,3 +130,28 @@ class RotationInterpolator:
 
     def get(self, x, default=0.0):
         return self.__interpolator.get(x, default=default) % 360.0
+
+    def get_many(self, x_values, default=0.0):
+        return self.__interpolator.get_many(x_values, default=default) % 360.0
+
+
+class LazyInterpolator:
+    """
+    Evaluates the given interpolator only at the x values that are asked
+    for, and remembers the last max_cached_values of them.
+    """
+    def __init__(self, interpolator, max_cached_values=256):
+        self.__interpolator = interpolator
+        self.__max_cached_values = max_cached_values
+        self.__values = OrderedDict()
+
+    def get(self, x, default=0.0):
+        value = self.__values.get(x)
+        if value is not None:
+            self.__values.move_to_end(x)
+            return value
+        value = self.__interpolator.get(x, default=default)
+        self.__values[x] = value
+        if len(self.__values) > self.__max_cached_values:
+            self.__values.popitem(last=False)
+        return value
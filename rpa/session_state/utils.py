@@ -84,9 +84,9 @@ def move_list_items_to_index(all_items, items_to_move, target_index):
     items_to_move = set(items_to_move)
 
     items_not_to_move = [id for id in all_items if id not in items_to_move]
-    items_to_move = [id for id in all_items if id in items_to_move]
     count = sum(1 for i, item in enumerate(all_items) \
                 if item in items_to_move and i <= target_index)
+    items_to_move = [id for id in all_items if id in items_to_move]
 
     if target_index < 0:
         actual_index = 0
@@ -102,6 +102,7 @@ def move_list_items_to_index(all_items, items_to_move, target_index):
     return reordered_items
 
 def negative_list_move(all_items, items_to_move, offset):
+    items_to_move = set(items_to_move)
     num_of_items = len(all_items)
     moved_item_indexes = []
     for i in range(0, num_of_items):
@@ -119,6 +120,7 @@ def negative_list_move(all_items, items_to_move, offset):
     return moved_item_indexes
 
 def positive_list_move(all_items, items_to_move, offset):
+    items_to_move = set(items_to_move)
     num_of_items = len(all_items)
     moved_item_indexes = []
     for i in range(num_of_items-1, -1, -1):
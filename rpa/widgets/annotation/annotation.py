@@ -75,6 +75,9 @@ class Annotation(QtCore.QObject):
         self.__mouse_right_button_down = False    # move uses only currently
         self.__mouse_middle_button_down = False
         self.__mouse_down_location = False
+        self.__annotation = None
+        # (matrix, width scale) of the strokes being moved
+        self.__transform = None
 
         self.__timeline_selected_keys = self.__session_api.get_custom_session_attr(C.TIMELINE_SELECTED_KEYS)
         dm = self.__session_api.delegate_mngr
@@ -275,36 +278,32 @@ class Annotation(QtCore.QObject):
         inew = Point(*screen_to_itview(self.__geometry, *new))
         idx, idy = inew.x - iold.x, inew.y - iold.y
 
-        new_annotation = self.__annotation.copy()
+        # The strokes are only previewed while they are being moved and
+        # the moved annotation is set once the mouse is released.
+        matrix = np.identity(3)
+        width_scale = 1.0
         if transform == Strokes.TRANSLATE:
-            for annotation in new_annotation.annotations:
-                if isinstance(annotation, Stroke):
-                    for point in annotation.points:
-                        point.x += idx
-                        point.y += idy
+            matrix[0, 2], matrix[1, 2] = idx, idy
         if transform == Strokes.SCALE:
-            scale = 1.0 + 0.01 * (sdx - sdy)
-            for annotation in new_annotation.annotations:
-                if isinstance(annotation, Stroke):
-                    annotation.width *= scale
-                    for point in annotation.points:
-                        x, y = point.x - iold.x, point.y - iold.y
-                        x, y = x * scale, y * scale
-                        point.x, point.y = x + iold.x, y + iold.y
+            width_scale = 1.0 + 0.01 * (sdx - sdy)
+            matrix[0, 0] = matrix[1, 1] = width_scale
+            matrix[0, 2] = iold.x * (1.0 - width_scale)
+            matrix[1, 2] = iold.y * (1.0 - width_scale)
         if transform == Strokes.ROTATE:
-            angle = 0.25 * (sdy - sdx)
-            sin = np.sin(np.radians(angle))
-            cos = np.cos(np.radians(angle))
-            for annotation in new_annotation.annotations:
-                if isinstance(annotation, Stroke):
-                    for point in annotation.points:
-                        x, y = itview_to_screen(self.__geometry, point.x, point.y)
-                        x -= sold.x; y -= sold.y
-                        x, y = (x * cos) - (y * sin), (x * sin) + (y * cos)
-                        x += sold.x; y += sold.y
-                        point.x, point.y = screen_to_itview(self.__geometry, x, y)
-        self.__annotation_api.set_rw_annotations(
-            {self.__cguid: {self.__source_frame: new_annotation}})
+            angle = np.radians(0.25 * (sdy - sdx))
+            sin, cos = np.sin(angle), np.cos(angle)
+            # rotation around the mouse down location in screen coordinates
+            rotation = np.array([
+                [cos, -sin, sold.x - cos * sold.x + sin * sold.y],
+                [sin, cos, sold.y - sin * sold.x - cos * sold.y],
+                [0.0, 0.0, 1.0]])
+            t, u, v = (np.array(self.__geometry[i]) for i in (0, 1, 3))
+            to_screen = np.identity(3)
+            to_screen[:2, 0], to_screen[:2, 1], to_screen[:2, 2] = u - t, v - t, t
+            matrix = np.linalg.inv(to_screen) @ rotation @ to_screen
+        self.__transform = (matrix.tolist(), width_scale)
+        self.__annotation_api.set_rw_transform_preview(
+            self.__cguid, self.__source_frame, *self.__transform)
 
     def eventFilter(self, obj, event):
         if obj == self.__text_line_edit:
@@ -393,6 +392,7 @@ class Annotation(QtCore.QObject):
                         annotation = self.__annotation_api.get_rw_annotation(self.__cguid, self.__source_frame)
                         if annotation:
                             self.__annotation = RpaAnnotation().__setstate__(annotation.__getstate__())
+                            self.__transform = None
                             self.__mouse_down_location = get_pos()
                             self.__viewport_api.set_cross_hair_cursor(
                                 Point(*screen_to_itview(self.__geometry, *get_pos())))
@@ -413,9 +413,16 @@ class Annotation(QtCore.QObject):
                     self.__append_point(interactive_mode, *get_pos(), is_line=is_line)
                     stroke = self.__annotation_api.get_transient_stroke(self.__cguid, self.__source_frame, "local")
                     if stroke is not None:
+                        stroke.simplify(
+                            C.STROKE_SIMPLIFICATION_TOLERANCE, self.__dimensions)
                         self.__annotation_api.append_strokes(self.__cguid, self.__source_frame, [stroke])
                     self.__annotation_api.delete_transient_points(self.__cguid, self.__source_frame, "local")
                     if interactive_mode == C.INTERACTIVE_MODE_MOVE:
+                        if self.__annotation and self.__transform:
+                            self.__annotation_api.set_rw_annotations(
+                                {self.__cguid: {self.__source_frame: \
+                                    self.__annotation.transformed(*self.__transform)}})
+                        self.__transform = None
                         self.__annotation = None
                         self.__mouse_left_button_down = False
                         self.__mouse_middle_button_down = False
@@ -1,7 +1,42 @@
+import numpy as np
 from PySide2 import QtCore, QtGui, QtWidgets
 from rpa.widgets.sub_widgets.color_circle import Rgb
 
 
+def image_to_array(image:QtGui.QImage)->np.ndarray:
+    """
+    Get the rgb values of the given image as a uint8 array of shape
+    (height, width, 3). The array owns a copy of the pixels, since the bits
+    of the image are freed along with it.
+    """
+    image = image.convertToFormat(QtGui.QImage.Format_RGB32)
+    width, height = image.width(), image.height()
+    if width == 0 or height == 0:
+        return np.zeros((height, width, 3), dtype=np.uint8)
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+    pixels = pixels.reshape(height, image.bytesPerLine())[:, :4 * width]
+    # RGB32 pixels are 0xffRRGGBB words, which are BGRA bytes on little endian
+    pixels = pixels.reshape(height, width, 4)
+    return np.array(
+        pixels[..., 2::-1] if QtCore.QSysInfo.ByteOrder == QtCore.QSysInfo.LittleEndian \
+        else pixels[..., 1:])
+
+
+def get_sample_color(pixels:np.ndarray, use_median:bool=False)->tuple:
+    """
+    Get the average or median color of the given uint8 rgb pixels, as
+    normalized r, g and b values.
+    """
+    pixels = pixels.reshape(-1, 3)
+    if len(pixels) == 0:
+        return (0.0, 0.0, 0.0)
+    if use_median:
+        color = np.median(pixels, axis=0)
+    else:
+        color = pixels.mean(axis=0)
+    return tuple(float(value) / 255.0 for value in color)
+
+
 class CursorWidget(QtWidgets.QFrame):
     PREVIEW_TILE_HEIGHT = 20
     def __init__(self, *args):
@@ -79,6 +114,7 @@ class ScreenScraper(QtWidgets.QWidget):
         self.__sample_size = 1
         self.__drag_object = None
         self.__queued_color = False
+        self.__use_median = False
 
         self.__cursor_widget = CursorWidget()
         self.__cursor_widget.hide()
@@ -88,6 +124,11 @@ class ScreenScraper(QtWidgets.QWidget):
         self._dispatch_event_timer.timeout.connect(self.dispatch_event)
         self.__screen = QtGui.QGuiApplication.primaryScreen()
 
+        # Mouse moves only update the cursor once per refresh of the display
+        self.__update_cursor_timer = QtCore.QTimer(self)
+        self.__update_cursor_timer.setSingleShot(True)
+        self.__update_cursor_timer.timeout.connect(self.__update_cursor)
+
     def closeEvent(self, event):
         if self.__grab:
             self.__stop_sampling()
@@ -105,7 +146,9 @@ class ScreenScraper(QtWidgets.QWidget):
     def mouseMoveEvent(self, event):
         if self.__grab:
             self.__cursor_pos = QtGui.QCursor.pos()
-            self.__update_cursor()
+            if not self.__update_cursor_timer.isActive():
+                refresh_rate = self.__screen.refreshRate() or 60.0
+                self.__update_cursor_timer.start(max(int(1000.0 / refresh_rate), 1))
 
     def __start_sampling(self):
         self.__grab = True
@@ -123,6 +166,7 @@ class ScreenScraper(QtWidgets.QWidget):
 
     def __stop_sampling(self):
         self.__grab = False
+        self.__update_cursor_timer.stop()
         self.releaseMouse()
         self.__cursor_widget.hide()
         self.unsetCursor()
@@ -145,20 +189,48 @@ class ScreenScraper(QtWidgets.QWidget):
         if final:
             self.SIG_COLOR.emit(Rgb(*color))
 
+    def __grab_screen(self, x, y, width, height):
+        pixmap = self.__screen.grabWindow(
+            QtWidgets.QApplication.desktop().winId(), x, y, width, height)
+        # The grab is in device pixels on high dpi screens
+        scale = pixmap.width() / float(width) if width else 1.0
+        return pixmap, scale
+
     def __update_cursor(self):
+        if not self.__grab or self.__cursor_pos is None:
+            return
         cursor_size = (64, 84)
         zoom = 8
         mouse_offset = (12, 12)
 
-        capture_radius = (cursor_size[0]/zoom, cursor_size[1]/zoom)
+        capture_radius = (cursor_size[0]//zoom, cursor_size[1]//zoom)
         x, y = self.__cursor_pos.x(), self.__cursor_pos.y()
+        size = self.__sample_size
         self.__cursor_widget.setGeometry(x + mouse_offset[0], y + mouse_offset[1], cursor_size[0], cursor_size[1])
-        self.__cursor_widget.set_pixmap(self.__screen.grabWindow(
-            QtWidgets.QApplication.desktop().winId(),
-            x - capture_radius[0], y - capture_radius[1],
-            2 * capture_radius[0], 2 * capture_radius[1]))
 
-        color = self.sample_average_color(x, y)
+        # The screen is grabbed once for both the magnifier and the sample
+        magnifier_rect = QtCore.QRect(
+            x - capture_radius[0], y - capture_radius[1],
+            2 * capture_radius[0], 2 * capture_radius[1])
+        sample_rect = QtCore.QRect(x, y, size, size)
+        grab_rect = magnifier_rect.united(sample_rect)
+        pixmap, scale = self.__grab_screen(
+            grab_rect.x(), grab_rect.y(), grab_rect.width(), grab_rect.height())
+
+        def to_grab(rect):
+            return QtCore.QRect(
+                round((rect.x() - grab_rect.x()) * scale),
+                round((rect.y() - grab_rect.y()) * scale),
+                max(round(rect.width() * scale), 1),
+                max(round(rect.height() * scale), 1))
+
+        self.__cursor_widget.set_pixmap(pixmap.copy(to_grab(magnifier_rect)))
+
+        sample = to_grab(sample_rect)
+        pixels = image_to_array(pixmap.toImage())[
+            sample.y():sample.y() + sample.height(),
+            sample.x():sample.x() + sample.width()]
+        color = get_sample_color(pixels, self.__use_median)
         self.__cursor_widget.set_preview_color(color)
 
         if self.__color == color:
@@ -174,28 +246,25 @@ class ScreenScraper(QtWidgets.QWidget):
         This method samples the average color across a square
         of pixels determined by the size.
         '''
-        r, g, b = 0, 0, 0
-        size = self.__sample_size
+        return self.__sample_color(x, y, use_median=False)
 
-        for i in range(0, size):
-            for j in range(0, size):
-                qcolor = QtGui.QColor(
-                    self.__screen.grabWindow(
-                        QtWidgets.QApplication.desktop().winId(),
-                        x, y, size, size).toImage().pixel(i, j)
-                )
-
-                r += qcolor.red()
-                g += qcolor.green()
-                b += qcolor.blue()
-
-        size_squared = size ** 2
-        avg_color = (r/size_squared, g/size_squared, b/size_squared)
+    def sample_median_color(self, x, y):
+        '''
+        This method samples the median color across a square
+        of pixels determined by the size.
+        '''
+        return self.__sample_color(x, y, use_median=True)
 
-        return (avg_color[0]/255.0, avg_color[1]/255.0, avg_color[2]/255.0)
+    def __sample_color(self, x, y, use_median):
+        size = self.__sample_size
+        pixmap, _ = self.__grab_screen(x, y, size, size)
+        return get_sample_color(image_to_array(pixmap.toImage()), use_median)
 
     def set_read_only(self, value):
         self.__read_only = value
 
     def set_sample_size(self, size):
         self.__sample_size = size
+
+    def set_use_median(self, value):
+        self.__use_median = value
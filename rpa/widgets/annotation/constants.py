@@ -16,5 +16,9 @@ INTERACTIVE_MODE_HARD_ERASER = "hard_eraser"
 INTERACTIVE_MODE_SOFT_ERASER = "soft_eraser"
 INTERACTIVE_MODE_MOVE = "move"
 
+# Maximum distance in image pixels between a finished stroke and the mouse
+# samples that are dropped from it, 0 keeps all the samples.
+STROKE_SIMPLIFICATION_TOLERANCE = 0.5
+
 TIMELINE_SELECTED_KEYS = "selected_timeline_keys"
 MIME_TYPE_ANNOTATION_LIST = 'itview/annotations'
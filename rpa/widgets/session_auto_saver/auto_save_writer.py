@@ -0,0 +1,128 @@
+"""File with the functions that write auto saves, meant to run on a worker thread"""
+import os
+import json
+import uuid
+import opentimelineio as otio
+from typing import Dict, List, Optional, Tuple
+from rpa.widgets.session_io import constants as C
+from rpa.widgets.session_io.otio_writer import \
+    create_otio_timeline, create_otio_track, write_otio_timeline
+
+# An auto save is an OTIO file, optionally followed by a journal of the
+# playlists that changed since that file was written. Each line of the
+# journal is a json record. The first one names the OTIO file it applies
+# to and the order of its tracks, every other one holds the order of the
+# playlists, the FG and BG playlists and the data of the playlists that
+# changed, as returned by OTIOWriter.get_playlist_data.
+
+
+def get_journal_path(file_path:str)->str:
+    return f"{file_path}.journal"
+
+
+def write_auto_save(
+    file_path:str, name:str, playlists_data:List[Tuple[str, Dict]],
+    fg_playlist_id:str, bg_playlist_id:Optional[str],
+    use_journal:bool=False)->bool:
+    """
+    Write the full auto save of the given (playlist_id, playlist_data)
+    pairs and start a new journal on top of it if use_journal is True.
+    """
+    auto_save_id = uuid.uuid4().hex
+    timeline = create_otio_timeline(
+        name, playlists_data, fg_playlist_id, bg_playlist_id)
+    timeline.metadata[C.ITVIEW_METADATA_KEY] = {"auto_save_id": auto_save_id}
+    if not write_otio_timeline(timeline, file_path): return False
+
+    journal_path = get_journal_path(file_path)
+    if not use_journal:
+        if os.path.exists(journal_path): os.remove(journal_path)
+        return True
+    header = {
+        "auto_save_id": auto_save_id,
+        "playlist_ids": [playlist_id for playlist_id, _ in playlists_data]}
+    tmp_journal_path = f"{journal_path}.tmp"
+    try:
+        with open(tmp_journal_path, "w") as file:
+            file.write(json.dumps(header) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_journal_path, journal_path)
+    except OSError:
+        return False
+    return True
+
+
+def append_auto_save_journal(
+    file_path:str, playlist_ids:List[str], fg_playlist_id:str,
+    bg_playlist_id:Optional[str], playlists_data:Dict[str, Dict])->bool:
+    """
+    Append the data of the playlists that changed since the last auto save
+    to the journal of the given auto save.
+    """
+    record = {
+        "playlist_ids": playlist_ids,
+        "fg": fg_playlist_id,
+        "bg": bg_playlist_id,
+        "playlists": playlists_data}
+    try:
+        with open(get_journal_path(file_path), "a") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def compact_auto_save_journal(file_path:str)->bool:
+    """
+    Apply the journal of the given auto save to its OTIO file, so that the
+    file holds the latest auto saved session, and remove the journal.
+
+    Returns:
+        (bool): True if a journal was applied
+    """
+    journal_path = get_journal_path(file_path)
+    if not os.path.exists(journal_path): return False
+
+    records = []
+    with open(journal_path) as file:
+        for line in file:
+            # The last record can be cut short if the session crashed
+            # while it was being written
+            try: records.append(json.loads(line))
+            except json.JSONDecodeError: break
+
+    timeline = otio.adapters.read_from_file(file_path)
+    auto_save_id = \
+        timeline.metadata.get(C.ITVIEW_METADATA_KEY, {}).get("auto_save_id")
+    if not records or records[0].get("auto_save_id") != auto_save_id or \
+        len(records) == 1:
+        os.remove(journal_path)
+        return False
+
+    header = records[0]
+    tracks = list(timeline.tracks)
+    del timeline.tracks[:]
+    tracks_by_id = dict(zip(header["playlist_ids"], tracks))
+    for record in records[1:]:
+        for playlist_id, playlist_data in record["playlists"].items():
+            tracks_by_id[playlist_id] = create_otio_track(playlist_data)
+
+    record = records[-1]
+    for playlist_id in record["playlist_ids"]:
+        track = tracks_by_id.get(playlist_id)
+        if track is None: continue
+        playlist_metadata = {}
+        if playlist_id == record["fg"]:
+            playlist_metadata["foreground"] = True
+        if playlist_id == record["bg"]:
+            playlist_metadata["background"] = True
+        track.metadata[C.ITVIEW_METADATA_KEY] = playlist_metadata
+        timeline.tracks.append(track)
+    timeline.metadata[C.ITVIEW_METADATA_KEY] = {}
+
+    if not write_otio_timeline(timeline, file_path): return False
+    os.remove(journal_path)
+    return True
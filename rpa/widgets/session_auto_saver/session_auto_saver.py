@@ -7,10 +7,24 @@ except ImportError:
     from PySide6.QtGui import QAction
 import os
 import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from rpa.widgets.session_io.otio_reader import OTIOReader
 from rpa.widgets.session_io.otio_writer import OTIOWriter
 from rpa.widgets.session_auto_saver.auto_save_browser import AutoSaveBrowser
+from rpa.widgets.session_auto_saver.auto_save_writer import \
+    write_auto_save, append_auto_save_journal, compact_auto_save_journal, \
+    get_journal_path
+from rpa.widgets.session_auto_saver.session_journal_recorder import \
+    SessionJournalRecorder, replay_session_journal_with_rpa
+
+# Annotation api methods that edit the rw annotations of the clip given as
+# their first argument
+ANNOTATION_API_RW_METHODS = (
+    "append_strokes", "append_texts", "set_text", "delete_rw_annotation",
+    "clear_frame", "undo", "redo")
 
 
 class AutoSavePopup(QtWidgets.QMessageBox):
@@ -35,8 +49,16 @@ class AutoSavePopup(QtWidgets.QMessageBox):
         grid.addWidget(menu_msg, 5, 1)
 
 class SessionAutoSaver(QtWidgets.QWidget):
+    SIG_SAVED = QtCore.Signal(bool, float) # success, ui_stall_ms
+    # Gets emitted from the worker thread once an auto save is written.
+
+    # Every FULL_SAVE_INTERVAL auto saves, the snapshots of all the
+    # playlists are written as a full OTIO file when using the delta journal.
+    FULL_SAVE_INTERVAL = 10
 
-    def __init__(self, rpa, main_window, auto_save_directory=None, include_feedback=True):
+    def __init__(
+        self, rpa, main_window, auto_save_directory=None, include_feedback=True,
+        use_delta_journal=False, use_journal=False):
         super().__init__(main_window)
         self.__rpa = rpa
         self.__main_window = main_window
@@ -46,6 +68,7 @@ class SessionAutoSaver(QtWidgets.QWidget):
 
         self.__otio_reader = OTIOReader(self.__rpa, main_window, include_feedback)
         self.__otio_writer = OTIOWriter(self.__rpa, main_window, include_feedback)
+        self.__include_feedback = include_feedback
         self.__dont_show_auto_save_popup_pref_key = "dont_show_auto_save_popup"
 
         self.__auto_save_browser = AutoSaveBrowser(self.__main_window)
@@ -57,9 +80,49 @@ class SessionAutoSaver(QtWidgets.QWidget):
             self.__auto_save_directory,
             f"{self.__auto_save_file_name_prefix}_{self.__pid}.otio")
 
+        # With use_journal, every edit of the session is also recorded in a
+        # session journal, which is preferred over the auto saves when
+        # restoring since it is at most a second behind the session
+        self.__use_journal = use_journal
+        self.__journal_file_name_prefix = "rpa_session_journal"
+        self.__journal_file = os.path.join(
+            self.__auto_save_directory,
+            f"{self.__journal_file_name_prefix}_{self.__pid}.jsonl")
+        self.__journal_recorder = None
+
         self.__timer = QtCore.QTimer(self)
         self.__timer.timeout.connect(self.__save_session)
 
+        # Playlists are only snapshotted again when their dirty counter
+        # changed, and the snapshots are written on a worker thread. The
+        # feedback of the clips, which is most of the cost of a snapshot, is
+        # only fetched again for the clips whose feedback was edited.
+        self.__use_delta_journal = use_delta_journal
+        self.__playlist_versions = {} # playlist_id -> dirty counter
+        self.__snapshots = {} # playlist_id -> (dirty counter, playlist_data)
+        self.__feedback_metadata = {} # clip_id -> feedback metadata
+        self.__feedback_dirty_clip_ids = set()
+        self.__saved_state = None
+        self.__num_saves = 0
+        self.__last_stall_ms = 0.0
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__pending_save = None
+        self.SIG_SAVED.connect(self.__saved)
+
+        session_api = self.__rpa.session_api
+        session_api.SIG_PLAYLIST_MODIFIED.connect(self.__set_playlist_dirty)
+        session_api.SIG_ATTR_VALUES_CHANGED.connect(self.__attr_values_changed)
+        self.__rpa.color_api.SIG_CCS_MODIFIED.connect(self.__set_clip_dirty)
+        self.__rpa.color_api.SIG_CC_MODIFIED.connect(self.__set_clip_dirty)
+        self.__rpa.color_api.SIG_CC_NODE_MODIFIED.connect(self.__set_clip_dirty)
+        annotation_api = self.__rpa.annotation_api
+        for method_name in ANNOTATION_API_RW_METHODS:
+            annotation_api.delegate_mngr.add_post_delegate(
+                getattr(annotation_api, method_name),
+                self.__rw_annotation_modified)
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.set_rw_annotations, self.__rw_annotations_modified)
+
         dont_show_auto_save_popup_box_pref = self.__rpa.config_api.value(
             self.__dont_show_auto_save_popup_pref_key, False, type=bool)
 
@@ -113,7 +176,8 @@ class SessionAutoSaver(QtWidgets.QWidget):
         main_window.installEventFilter(self)
 
         auto_saves = self.__get_auto_saves()
-        if auto_saves and not dont_show_auto_save_popup_box_pref:
+        journals = self.__get_journals() if self.__use_journal else []
+        if (auto_saves or journals) and not dont_show_auto_save_popup_box_pref:
             auto_save_popup = AutoSavePopup()
             auto_save_popup.SIG_PREF_CHANGED.connect(
                 self.__update_dont_show_auto_save_popup_pref)
@@ -122,13 +186,45 @@ class SessionAutoSaver(QtWidgets.QWidget):
             result = auto_save_popup.exec_()
             if result == QtWidgets.QMessageBox.Yes:
                 playlist_ids = self.__rpa.session_api.get_playlists() # default playlist
-                latest_auto_save = max(auto_saves, key=os.path.getmtime)
-                success = self.__otio_reader.read_otio_file(latest_auto_save)
+                success = False
+                if journals:
+                    latest_journal = max(journals, key=os.path.getmtime)
+                    success = self.__replay_journal(latest_journal, playlist_ids)
+                if not success and auto_saves:
+                    latest_auto_save = max(auto_saves, key=os.path.getmtime)
+                    compact_auto_save_journal(latest_auto_save)
+                    success = self.__otio_reader.read_otio_file(latest_auto_save)
                 if success:
                     self.__rpa.session_api.delete_playlists_permanently(playlist_ids)
 
+        if self.__use_journal:
+            self.__journal_recorder = SessionJournalRecorder(
+                self.__rpa, self.__journal_file, parent=self)
+
         self.__timer.start(60 * 1000)  # 1 minute in milliseconds
 
+    def __replay_journal(self, journal, playlist_ids):
+        """
+        Replay the given session journal on top of the given playlists.
+        When the replay fails, the playlists it restored are deleted so
+        that the session can be restored from an auto save instead.
+
+        Returns:
+            (bool): True if the session was restored from the journal
+        """
+        try:
+            return replay_session_journal_with_rpa(self.__rpa, journal) > 0
+        except Exception as exception:
+            print(f"Failed to restore the session from {journal}: {exception}")
+        session_api = self.__rpa.session_api
+        restored_playlist_ids = [
+            playlist_id for playlist_id in \
+            session_api.get_playlists() + session_api.get_deleted_playlists() \
+            if playlist_id not in playlist_ids]
+        if restored_playlist_ids:
+            session_api.delete_playlists_permanently(restored_playlist_ids)
+        return False
+
     def __update_dont_show_auto_save_popup_checkbox_state(self, state):
         self.__dont_show_auto_save_popup_chk_box.blockSignals(True)
         self.__dont_show_auto_save_popup_chk_box.setChecked(state)
@@ -138,12 +234,131 @@ class SessionAutoSaver(QtWidgets.QWidget):
         self.__rpa.config_api.setValue(
             self.__dont_show_auto_save_popup_pref_key, state)
 
+    @property
+    def last_stall_ms(self)->float:
+        return self.__last_stall_ms
+
+    def __set_playlist_dirty(self, playlist_id):
+        self.__playlist_versions[playlist_id] = \
+            self.__playlist_versions.get(playlist_id, 0) + 1
+
+    def __attr_values_changed(self, attr_values):
+        for playlist_id in {attr_value[0] for attr_value in attr_values}:
+            self.__set_playlist_dirty(playlist_id)
+
+    def __set_clip_dirty(self, clip_id, *_):
+        # Only called for edits of the feedback of the clip
+        if clip_id is None: return
+        self.__feedback_dirty_clip_ids.add(clip_id)
+        playlist_id = self.__rpa.session_api.get_playlist_of_clip(clip_id)
+        if playlist_id is not None: self.__set_playlist_dirty(playlist_id)
+
+    def __rw_annotation_modified(self, out, clip_id, *_):
+        self.__set_clip_dirty(clip_id)
+
+    def __rw_annotations_modified(self, out, annotations):
+        for clip_id in annotations: self.__set_clip_dirty(clip_id)
+
+    def __get_playlist_data(self, playlist_id):
+        if not self.__include_feedback:
+            return self.__otio_writer.get_playlist_data(playlist_id)
+        clip_ids = self.__rpa.session_api.get_clips(playlist_id)
+        dirty_clip_ids = [
+            clip_id for clip_id in clip_ids \
+            if clip_id in self.__feedback_dirty_clip_ids or \
+            clip_id not in self.__feedback_metadata]
+        if dirty_clip_ids:
+            feedback_metadata = \
+                self.__otio_writer.get_feedback_metadata(dirty_clip_ids)
+            for clip_id in dirty_clip_ids:
+                self.__feedback_metadata[clip_id] = \
+                    feedback_metadata.get(clip_id, {})
+                self.__feedback_dirty_clip_ids.discard(clip_id)
+        return self.__otio_writer.get_playlist_data(
+            playlist_id,
+            {clip_id: self.__feedback_metadata[clip_id] for clip_id in clip_ids})
+
     def __save_session(self):
         is_playing, _ = self.__rpa.timeline_api.get_playing_state()
-        if not is_playing:
-            self.__otio_writer.write_otio_file(self.__auto_save_file)
-            current_time = datetime.now().strftime("%H:%M:%S")
-            self.__last_saved_line_edit.setText(current_time)
+        if is_playing: return
+        # Auto saves are skipped while the previous one is being written
+        if self.__pending_save is not None and not self.__pending_save.done():
+            return
+
+        start_time = time.perf_counter()
+        session_api = self.__rpa.session_api
+        is_full_save = self.__num_saves % self.FULL_SAVE_INTERVAL == 0
+
+        playlist_ids = session_api.get_playlists()
+        fg_playlist_id = session_api.get_fg_playlist()
+        bg_playlist_id = session_api.get_bg_playlist()
+        changed_playlists_data = {}
+        for playlist_id in playlist_ids:
+            version = self.__playlist_versions.get(playlist_id, 0)
+            snapshot = self.__snapshots.get(playlist_id)
+            if snapshot is None or snapshot[0] != version:
+                playlist_data = self.__get_playlist_data(playlist_id)
+            else:
+                # Renaming a playlist does not mark it dirty
+                name = session_api.get_playlist_name(playlist_id)
+                if snapshot[1]["name"] == name: continue
+                playlist_data = dict(snapshot[1], name=name)
+            self.__snapshots[playlist_id] = (version, playlist_data)
+            changed_playlists_data[playlist_id] = playlist_data
+        for playlist_id in set(self.__snapshots) - set(playlist_ids):
+            del self.__snapshots[playlist_id]
+        if changed_playlists_data:
+            # The feedback of deleted clips is not kept
+            clip_ids = {
+                clip_id for playlist_id in playlist_ids \
+                for clip_id in session_api.get_clips(playlist_id)}
+            for clip_id in set(self.__feedback_metadata) - clip_ids:
+                del self.__feedback_metadata[clip_id]
+            self.__feedback_dirty_clip_ids &= clip_ids
+
+        state = (tuple(playlist_ids), fg_playlist_id, bg_playlist_id)
+        if not changed_playlists_data and state == self.__saved_state:
+            return
+        self.__saved_state = state
+        self.__num_saves += 1
+
+        if self.__use_delta_journal and not is_full_save:
+            write = partial(
+                append_auto_save_journal, self.__auto_save_file,
+                playlist_ids, fg_playlist_id, bg_playlist_id,
+                changed_playlists_data)
+        else:
+            write = partial(
+                write_auto_save, self.__auto_save_file,
+                os.path.splitext(os.path.basename(self.__auto_save_file))[0],
+                [(playlist_id, self.__snapshots[playlist_id][1]) \
+                 for playlist_id in playlist_ids],
+                fg_playlist_id, bg_playlist_id, self.__use_delta_journal)
+        stall_ms = (time.perf_counter() - start_time) * 1000.0
+        self.__pending_save = self.__executor.submit(
+            self.__write_session, write, stall_ms)
+
+    def __write_session(self, write, stall_ms):
+        # Runs on the worker thread
+        try: success = write()
+        except Exception as exception:
+            print(f"Failed to write the auto save {self.__auto_save_file}: {exception}")
+            success = False
+        self.SIG_SAVED.emit(success, stall_ms)
+
+    def __saved(self, success, stall_ms):
+        self.__last_stall_ms = stall_ms
+        if not success:
+            # The next auto save snapshots and writes everything again
+            self.__saved_state = None
+            self.__snapshots.clear()
+            self.__feedback_metadata.clear()
+            self.__num_saves = 0
+            self.__last_saved_line_edit.setText("Auto Save Failed!")
+            return
+        current_time = datetime.now().strftime("%H:%M:%S")
+        self.__last_saved_line_edit.setText(
+            f"{current_time} (UI blocked for {stall_ms:.1f} ms)")
 
     def __set_auto_save_state(self, state):
         if state and self.__timer.isActive(): self.__timer.stop()
@@ -168,17 +383,29 @@ class SessionAutoSaver(QtWidgets.QWidget):
             f"{self.__auto_save_file_name_prefix}_*.otio")
         return autosaves
 
+    def __get_journals(self):
+        return glob.glob(
+            f"{self.__auto_save_directory}"\
+            f"{os.path.sep}"\
+            f"{self.__journal_file_name_prefix}_*.jsonl")
+
     def eventFilter(self, obj, event):
         if event.type() == QtCore.QEvent.Close: self.__close_event()
         return False
 
     def __close_event(self):
         self.__timer.stop()
+        self.__executor.shutdown(wait=True)
+        if self.__journal_recorder is not None: self.__journal_recorder.close()
         self.__remove_auto_saves()
 
     def __remove_auto_saves(self):
         for file in self.__get_auto_saves():
             if os.path.exists(file): os.remove(file)
+            journal = get_journal_path(file)
+            if os.path.exists(journal): os.remove(journal)
+        for file in self.__get_journals():
+            if os.path.exists(file): os.remove(file)
 
     def __file_selected(self, file):
         msg_box = QtWidgets.QMessageBox()
@@ -193,6 +420,10 @@ class SessionAutoSaver(QtWidgets.QWidget):
         result = msg_box.exec_()
         if result == QtWidgets.QMessageBox.Ok:
             playlist_ids = self.__rpa.session_api.get_playlists() # default playlist
-            success = self.__otio_reader.read_otio_file(file)
-            if success:
-                self.__rpa.session_api.delete_playlists_permanently(playlist_ids)
\ No newline at end of file
+            compact_auto_save_journal(file)
+            self.__otio_reader.read_otio_file_in_background(
+                file, partial(self.__auto_save_restored, playlist_ids))
+
+    def __auto_save_restored(self, playlist_ids, success):
+        if success:
+            self.__rpa.session_api.delete_playlists_permanently(playlist_ids)
\ No newline at end of file
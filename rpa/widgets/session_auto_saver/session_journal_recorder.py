@@ -0,0 +1,326 @@
+try:
+    from PySide2 import QtCore
+except ImportError:
+    from PySide6 import QtCore
+from functools import partial
+from typing import Dict, List
+from rpa.session_state import session_journal as J
+from rpa.session_state.session_journal import SessionJournal
+from rpa.session_state.annotations import Annotation, Stroke, Text
+from rpa.session_state.color_corrections import ColorCorrection
+
+
+# Session api methods whose calls are recorded with their arguments
+SESSION_API_RECORDED_METHODS = (
+    "create_playlists", "delete_playlists", "restore_playlists",
+    "delete_playlists_permanently", "move_playlists_to_index",
+    "move_playlists_by_offset", "set_playlist_name", "set_fg_playlist",
+    "set_bg_playlist", "create_clips", "delete_clips_permanently",
+    "move_clips_to_index", "move_clips_by_offset", "set_clip_path",
+    "restore_clips_snapshot", "set_attr_values", "set_attr_values_at",
+    "clear_attr_values_at", "edit_frames", "reset_frames",
+    "set_custom_session_attr", "set_custom_playlist_attr",
+    "set_custom_clip_attr")
+
+# Session api methods after which the session creates an empty playlist of
+# its own when none is left. The id of that playlist can not be replayed,
+# so the journal is compacted when one gets created.
+SESSION_API_EMPTYING_METHODS = (
+    "clear", "delete_playlists", "delete_playlists_permanently")
+
+# Annotation api methods that edit the rw annotation of a clip and frame
+# given as their first two arguments, recorded as the resulting annotation
+ANNOTATION_API_RW_METHODS = (
+    "delete_rw_annotation", "clear_frame", "undo", "redo")
+
+# Color api methods that edit the rw ccs of a clip given as their first
+# argument
+COLOR_API_RW_METHODS = (
+    "move_cc", "append_ccs", "delete_ccs", "append_nodes", "clear_nodes",
+    "delete_node", "set_node_properties", "set_name", "create_region",
+    "append_shape_to_region", "delete_region", "set_region_falloff", "mute",
+    "mute_all")
+
+
+def get_session_snapshot(rpa)->Dict:
+    """
+    Same as session_journal.get_session_snapshot but made with the rpa apis.
+    """
+    session_api = rpa.session_api
+
+    def get_playlists_snapshot(playlist_ids):
+        return [{
+            "id": playlist_id,
+            "name": session_api.get_playlist_name(playlist_id),
+            "custom_attrs": {
+                attr_id: session_api.get_custom_playlist_attr(playlist_id, attr_id) \
+                for attr_id in session_api.get_custom_playlist_attr_ids(playlist_id)},
+            "clips": session_api.get_clips_snapshot(
+                session_api.get_clips(playlist_id))} \
+            for playlist_id in playlist_ids]
+
+    return {
+        "playlists": get_playlists_snapshot(session_api.get_playlists()),
+        "deleted_playlists": \
+            get_playlists_snapshot(session_api.get_deleted_playlists()),
+        "custom_attrs": {
+            attr_id: session_api.get_custom_session_attr(attr_id) \
+            for attr_id in session_api.get_custom_session_attr_ids()},
+        "fg": session_api.get_fg_playlist(),
+        "bg": session_api.get_bg_playlist()}
+
+
+def apply_record_with_rpa(rpa, record:List):
+    """
+    Same as session_journal.apply_record but applies the record with the
+    rpa apis, so that the media of the clips is loaded as well.
+
+    A snapshot record adds its playlists to the session, the playlists
+    that were in the session before are left for the caller to delete.
+    """
+    session_api = rpa.session_api
+    name, args = record[0], record[1:]
+    if name == J.SNAPSHOT:
+        snapshot = args[0]
+        playlists = snapshot["playlists"] + snapshot.get("deleted_playlists", [])
+        session_api.create_playlists(
+            [playlist["name"] for playlist in playlists], None,
+            [playlist["id"] for playlist in playlists])
+        for playlist in playlists:
+            playlist_id = playlist["id"]
+            attr_ids = session_api.get_custom_playlist_attr_ids(playlist_id)
+            for attr_id, value in playlist.get("custom_attrs", {}).items():
+                # Custom attrs set while creating the playlist, like its rv
+                # nodes, belong to the new playlist
+                if attr_id in attr_ids: continue
+                session_api.set_custom_playlist_attr(playlist_id, attr_id, value)
+            clips = playlist["clips"]
+            if not clips: continue
+            session_api.restore_clips_snapshot(
+                playlist_id, clips, None, list(clips))
+        for attr_id, value in snapshot.get("custom_attrs", {}).items():
+            session_api.set_custom_session_attr(attr_id, value)
+        deleted_playlist_ids = \
+            [playlist["id"] for playlist in snapshot.get("deleted_playlists", [])]
+        if deleted_playlist_ids: session_api.delete_playlists(deleted_playlist_ids)
+        session_api.set_fg_playlist(snapshot["fg"])
+        session_api.set_bg_playlist(snapshot.get("bg"))
+    elif name == "create_clips":
+        playlist_id, paths, index, ids = args
+        # json turns the (video_path, audio_path) tuples into lists
+        paths = [tuple(path) if isinstance(path, list) else path for path in paths]
+        session_api.create_clips(playlist_id, paths, index, ids)
+    elif name == J.APPEND_STROKES:
+        clip_id, frame, states = args
+        rpa.annotation_api.append_strokes(
+            clip_id, frame, [Stroke().__setstate__(state) for state in states])
+    elif name == J.APPEND_TEXTS:
+        clip_id, frame, states = args
+        rpa.annotation_api.append_texts(
+            clip_id, frame, [Text().__setstate__(state) for state in states])
+    elif name == J.SET_TEXT:
+        clip_id, frame, state = args
+        rpa.annotation_api.set_text(clip_id, frame, Text().__setstate__(state))
+    elif name == J.SET_RO_ANNOTATIONS:
+        clip_id, frame, states = args
+        rpa.annotation_api.set_ro_annotations(
+            {clip_id: {frame: [Annotation().__setstate__(state) for state in states]}})
+    elif name == J.DELETE_RO_ANNOTATIONS:
+        rpa.annotation_api.delete_ro_annotations(*args)
+    elif name == J.SET_RW_ANNOTATION:
+        clip_id, frame, state = args
+        if state is None:
+            rpa.annotation_api.delete_rw_annotation(clip_id, frame)
+        else:
+            rpa.annotation_api.set_rw_annotations(
+                {clip_id: {frame: Annotation().__setstate__(state)}})
+    elif name in (J.SET_RO_CCS, J.SET_RW_CCS):
+        clip_id, ccs = args
+        ccs = {clip_id: [
+            (frame, ColorCorrection().__setstate__(cc)) for frame, cc in ccs]}
+        if name == J.SET_RO_CCS: rpa.color_api.set_ro_ccs(ccs)
+        else: rpa.color_api.set_rw_ccs(ccs)
+    else:
+        getattr(session_api, name)(*args)
+
+
+def replay_session_journal_with_rpa(rpa, path:str)->int:
+    """
+    Replay the session journal at the given path with the rpa apis.
+
+    Returns:
+        (int): Number of records applied
+    """
+    return J.replay_journal(path, partial(apply_record_with_rpa, rpa))
+
+
+class SessionJournalRecorder(QtCore.QObject):
+    """
+    Records the edits made to the session through the rpa apis in a
+    session journal, using post delegates of the api methods.
+
+    The journal is flushed to the disk every FLUSH_INTERVAL ms, and is
+    compacted into a snapshot of the session once it holds more than
+    compact_interval records, so that replaying it stays fast.
+    """
+    FLUSH_INTERVAL = 1000 # ms
+    # Replaying 10000 records takes about 0.15 s, while restoring the
+    # snapshot of a session of 2000 clips with about 36000 strokes takes
+    # 0.6 to 0.8 s and compacting it 1.6 s, so a smaller interval would
+    # make compactions more frequent without making recovery much faster.
+    COMPACT_INTERVAL = 10000 # records
+
+    def __init__(self, rpa, journal_path:str, compact_interval:int=COMPACT_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.__rpa = rpa
+        self.__journal = SessionJournal(journal_path)
+        self.__compact_interval = compact_interval
+        # Set when a record could not be journaled, the next flush then
+        # compacts the journal so that it does not miss the edit
+        self.__needs_compaction = False
+        self.__is_recording = True
+        self.__playlist_ids = set()
+
+        session_api = self.__rpa.session_api
+        for method_name in SESSION_API_RECORDED_METHODS:
+            session_api.delegate_mngr.add_post_delegate(
+                getattr(session_api, method_name),
+                partial(self.__record_call, method_name))
+        for method_name in SESSION_API_EMPTYING_METHODS:
+            method = getattr(session_api, method_name)
+            session_api.delegate_mngr.add_pre_delegate(
+                method, self.__store_playlist_ids)
+            session_api.delegate_mngr.add_post_delegate(
+                method, self.__compact_if_playlist_created)
+
+        annotation_api = self.__rpa.annotation_api
+        for method_name in ANNOTATION_API_RW_METHODS:
+            annotation_api.delegate_mngr.add_post_delegate(
+                getattr(annotation_api, method_name), self.__record_rw_annotation)
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.append_strokes,
+            partial(self.__record_drawings, J.APPEND_STROKES))
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.append_texts,
+            partial(self.__record_drawings, J.APPEND_TEXTS))
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.set_text, self.__record_text)
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.set_rw_annotations, self.__record_rw_annotations)
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.set_ro_annotations, self.__record_ro_annotations)
+        annotation_api.delegate_mngr.add_post_delegate(
+            annotation_api.delete_ro_annotations,
+            partial(self.__record_call, J.DELETE_RO_ANNOTATIONS))
+
+        color_api = self.__rpa.color_api
+        for method_name in COLOR_API_RW_METHODS:
+            color_api.delegate_mngr.add_post_delegate(
+                getattr(color_api, method_name), self.__record_rw_ccs)
+        color_api.delegate_mngr.add_post_delegate(
+            color_api.set_read_only, self.__record_ro_and_rw_ccs)
+        color_api.delegate_mngr.add_post_delegate(
+            color_api.set_ro_ccs, self.__record_ro_ccs_of_clips)
+        color_api.delegate_mngr.add_post_delegate(
+            color_api.set_rw_ccs, self.__record_rw_ccs_of_clips)
+        color_api.delegate_mngr.add_post_delegate(
+            color_api.delete_ro_ccs, self.__record_ro_ccs_of_clips)
+
+        self.compact()
+        self.__timer = QtCore.QTimer(self)
+        self.__timer.timeout.connect(self.flush)
+        self.__timer.start(self.FLUSH_INTERVAL)
+
+    @property
+    def journal_path(self)->str:
+        return self.__journal.path
+
+    def flush(self):
+        if self.__needs_compaction or \
+            self.__journal.num_records > self.__compact_interval:
+            self.compact()
+        else:
+            self.__journal.flush()
+
+    def compact(self):
+        self.__journal.compact(get_session_snapshot(self.__rpa))
+        self.__needs_compaction = False
+
+    def close(self):
+        """
+        Flush the journal and stop recording.
+        """
+        self.__timer.stop()
+        self.flush()
+        self.__journal.close()
+        self.__is_recording = False
+
+    def __append(self, record):
+        if not self.__is_recording: return
+        if not self.__journal.append(record):
+            self.__needs_compaction = True
+
+    def __record_call(self, method_name, out, *args):
+        # Calls that failed did not edit the session
+        if out is False or out == []: return
+        self.__append([method_name, *args])
+
+    def __store_playlist_ids(self, *_):
+        self.__playlist_ids = set(self.__rpa.session_api.get_playlists())
+
+    def __compact_if_playlist_created(self, *_):
+        if not self.__is_recording: return
+        playlist_ids = set(self.__rpa.session_api.get_playlists())
+        if playlist_ids - self.__playlist_ids: self.compact()
+
+    def __record_rw_annotation(self, out, clip_id, frame, *_):
+        annotation = self.__rpa.annotation_api.get_rw_annotation(clip_id, frame)
+        self.__append([
+            J.SET_RW_ANNOTATION, clip_id, frame,
+            None if annotation is None else annotation.__getstate__()])
+
+    def __record_drawings(self, record_name, out, clip_id, frame, drawings):
+        if not out: return
+        self.__append([
+            record_name, clip_id, frame,
+            [drawing.__getstate__() for drawing in drawings]])
+
+    def __record_text(self, out, clip_id, frame, text):
+        if not out: return
+        self.__append([J.SET_TEXT, clip_id, frame, text.__getstate__()])
+
+    def __record_rw_annotations(self, out, annotations):
+        for clip_id, frame_annotations in annotations.items():
+            for frame in frame_annotations:
+                self.__record_rw_annotation(out, clip_id, frame)
+
+    def __record_ro_annotations(self, out, annotations):
+        for clip_id, frame_annotations in annotations.items():
+            for frame, annos in frame_annotations.items():
+                self.__append([
+                    J.SET_RO_ANNOTATIONS, clip_id, frame,
+                    [anno.__getstate__() for anno in annos]])
+
+    def __get_ccs_state(self, clip_id, is_ro):
+        color_api = self.__rpa.color_api
+        if is_ro: get_ccs, frames = color_api.get_ro_ccs, color_api.get_ro_frames(clip_id)
+        else: get_ccs, frames = color_api.get_rw_ccs, color_api.get_rw_frames(clip_id)
+        ccs = [(None, cc.__getstate__()) for cc in get_ccs(clip_id)]
+        for frame in frames:
+            ccs.extend((frame, cc.__getstate__()) for cc in get_ccs(clip_id, frame))
+        return ccs
+
+    def __record_rw_ccs(self, out, clip_id, *_):
+        self.__append([J.SET_RW_CCS, clip_id, self.__get_ccs_state(clip_id, False)])
+
+    def __record_ro_and_rw_ccs(self, out, clip_id, *_):
+        self.__append([J.SET_RO_CCS, clip_id, self.__get_ccs_state(clip_id, True)])
+        self.__record_rw_ccs(out, clip_id)
+
+    def __record_ro_ccs_of_clips(self, out, ccs):
+        for clip_id in ccs:
+            self.__append([J.SET_RO_CCS, clip_id, self.__get_ccs_state(clip_id, True)])
+
+    def __record_rw_ccs_of_clips(self, out, ccs):
+        for clip_id in ccs:
+            self.__record_rw_ccs(out, clip_id)
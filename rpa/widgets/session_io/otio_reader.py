@@ -1,11 +1,22 @@
-import uuid
-import opentimelineio as otio
-from rpa.session_state.annotations import Annotation
-from rpa.session_state.color_corrections import ColorCorrection
-from rpa.widgets.session_io import constants as C
-
-
-class OTIOReader(object):
+try:
+    from PySide2 import QtCore
+except ImportError:
+    from PySide6 import QtCore
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rpa.widgets.session_io.otio_session_decoder import \
+    read_otio_tracks, get_track_info, get_load_order, decode_track
+
+
+class OTIOReader(QtCore.QObject):
+    SIG_PLAYLIST_LOADED = QtCore.Signal(str, str, int, int)
+    # filepath, playlist_id, num_loaded_playlists, num_playlists
+    SIG_SESSION_LOADED = QtCore.Signal(str, bool, float) # filepath, success, load_time_ms
+
+    # Get emitted from the worker thread of read_otio_file_in_background
+    SIG_TRACKS_READ = QtCore.Signal(int, object) # load_id, tracks_info
+    SIG_TRACK_DECODED = QtCore.Signal(int, int, object) # load_id, track_index, track_data
+    SIG_READ_FAILED = QtCore.Signal(int, str) # load_id, error
 
     def __init__(self, rpa, main_window, feedback):
         super().__init__()
@@ -16,133 +27,177 @@ class OTIOReader(object):
         self.__feedback = feedback
         self.__status_bar = main_window.statusBar()
 
+        # Files are read one at a time on the worker thread, while their
+        # playlists are created on the GUI thread as they get decoded
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__loads = {} # load_id -> state of the load
+        self.__next_load_id = 0
+        self.SIG_TRACKS_READ.connect(self.__tracks_read)
+        self.SIG_TRACK_DECODED.connect(self.__track_decoded)
+        self.SIG_READ_FAILED.connect(self.__read_failed)
+
     def read_otio_file(self, filepath):
-        otio_timeline = otio.adapters.read_from_file(filepath)
-        success = self.__create_session_from_otio(otio_timeline)
+        """
+        Read the session of the given OTIO file and add its playlists to the
+        current session, the FG playlist being loaded first.
+
+        Returns:
+            (bool): True if the session was loaded
+        """
+        start_time = time.perf_counter()
+        try:
+            timeline_name, tracks = read_otio_tracks(filepath)
+        except Exception as exception:
+            print(f"Failed to load {filepath}: {exception}")
+            return self.__session_loaded(filepath, False, start_time)
 
+        try:
+            tracks_info = [get_track_info(track) for track in tracks]
+            playlist_ids = self.__create_playlists(tracks_info)
+            attrs, rw_attrs, keyable_attrs = self.__get_attrs()
+            for num_loaded, index in enumerate(get_load_order(tracks_info), 1):
+                self.__load_playlist(
+                    filepath, playlist_ids[index],
+                    decode_track(tracks[index], attrs, rw_attrs, keyable_attrs),
+                    num_loaded, len(tracks))
+        except Exception as exception:
+            print(f"Failed to load {timeline_name}: {exception}")
+            return self.__session_loaded(filepath, False, start_time)
+
+        return self.__session_loaded(filepath, True, start_time)
+
+    def read_otio_file_in_background(self, filepath, callback=None):
+        """
+        Same as read_otio_file but the file is parsed and decoded on a
+        worker thread, and each playlist is added to the session as soon as
+        it is decoded. Playlists are added in the order of the file, empty
+        at first, and are then filled in the FG, BG and file order.
+
+        Args:
+            filepath (str): Path of the OTIO file
+
+        Kwargs:
+            callback (Callable[[bool], None]):
+                Called with whether the session was loaded, once it is
+        """
+        load_id = self.__next_load_id
+        self.__next_load_id += 1
+        attrs, rw_attrs, keyable_attrs = self.__get_attrs()
+        self.__loads[load_id] = {
+            "filepath": filepath,
+            "callback": callback,
+            "start_time": time.perf_counter(),
+            "playlist_ids": [],
+            "num_loaded": 0}
+        self.__executor.submit(
+            self.__read, load_id, filepath, attrs, rw_attrs, keyable_attrs)
+
+    def __read(self, load_id, filepath, attrs, rw_attrs, keyable_attrs):
+        # Runs on the worker thread
+        try:
+            _, tracks = read_otio_tracks(filepath)
+            tracks_info = [get_track_info(track) for track in tracks]
+            self.SIG_TRACKS_READ.emit(load_id, tracks_info)
+            for index in get_load_order(tracks_info):
+                self.SIG_TRACK_DECODED.emit(
+                    load_id, index,
+                    decode_track(tracks[index], attrs, rw_attrs, keyable_attrs))
+        except Exception as exception:
+            self.SIG_READ_FAILED.emit(load_id, str(exception))
+
+    def __tracks_read(self, load_id, tracks_info):
+        load = self.__loads.get(load_id)
+        if load is None: return
+        try:
+            load["playlist_ids"] = self.__create_playlists(tracks_info)
+        except Exception as exception:
+            print(f"Failed to load {load['filepath']}: {exception}")
+            self.__finish_load(load_id, False)
+            return
+        if not tracks_info: self.__finish_load(load_id, True)
+
+    def __track_decoded(self, load_id, index, track_data):
+        load = self.__loads.get(load_id)
+        if load is None: return
+        playlist_ids = load["playlist_ids"]
+        load["num_loaded"] += 1
+        try:
+            # The playlist may have been deleted while it was being decoded
+            if playlist_ids[index] in self.__session_api.get_playlists():
+                self.__load_playlist(
+                    load["filepath"], playlist_ids[index], track_data,
+                    load["num_loaded"], len(playlist_ids))
+        except Exception as exception:
+            print(f"Failed to load {load['filepath']}: {exception}")
+            self.__finish_load(load_id, False)
+            return
+        if load["num_loaded"] == len(playlist_ids):
+            self.__finish_load(load_id, True)
+
+    def __read_failed(self, load_id, error):
+        load = self.__loads.get(load_id)
+        if load is None: return
+        print(f"Failed to load {load['filepath']}: {error}")
+        self.__finish_load(load_id, False)
+
+    def __finish_load(self, load_id, success):
+        load = self.__loads.pop(load_id)
+        self.__session_loaded(load["filepath"], success, load["start_time"])
+        if load["callback"] is not None: load["callback"](success)
+
+    def __get_attrs(self):
+        attrs = self.__session_api.get_attrs()
+        rw_attrs = self.__session_api.get_read_write_attrs()
+        keyable_attrs = self.__session_api.get_keyable_attrs()
+        return attrs, rw_attrs, keyable_attrs
+
+    def __create_playlists(self, tracks_info):
+        if not tracks_info: return []
+        playlist_ids = self.__session_api.create_playlists(
+            [playlist_name for playlist_name, _, _ in tracks_info])
+        for playlist_id, (_, is_fg, is_bg) in zip(playlist_ids, tracks_info):
+            if is_fg:
+                self.__session_api.set_fg_playlist(playlist_id)
+            if is_bg:
+                self.__session_api.set_bg_playlist(playlist_id)
+        return playlist_ids
+
+    def __load_playlist(
+        self, filepath, playlist_id, track_data, num_loaded, num_playlists):
+        clip_ids = track_data["clip_ids"]
+        if clip_ids:
+            self.__session_api.create_clips(
+                playlist_id, track_data["clip_paths"], ids=clip_ids)
+        if track_data["attr_values"]:
+            self.__session_api.set_attr_values(
+                [(playlist_id, *attr_value) \
+                 for attr_value in track_data["attr_values"]])
+        if track_data["key_values"]:
+            self.__session_api.set_attr_values_at(
+                [(playlist_id, *key_value) \
+                 for key_value in track_data["key_values"]])
+
+        # Feedback: Annotations & Color Corrections
+        if self.__feedback:
+            if track_data["rw_annos"]:
+                self.__annotation_api.set_rw_annotations(track_data["rw_annos"])
+            if track_data["rw_ccs"]:
+                self.__color_api.set_rw_ccs(track_data["rw_ccs"])
+
+        self.__status_bar.showMessage(
+            f"Loading session from {filepath}: "
+            f"{num_loaded}/{num_playlists} playlists")
+        self.SIG_PLAYLIST_LOADED.emit(
+            filepath, playlist_id, num_loaded, num_playlists)
+
+    def __session_loaded(self, filepath, success, start_time):
+        load_time_ms = (time.perf_counter() - start_time) * 1000.0
         if success:
             self.__status_bar.showMessage(
-                f"Loaded session from {filepath}", 3000)
-            return True
+                f"Loaded session from {filepath} in {load_time_ms / 1000.0:.1f} s",
+                3000)
         else:
             self.__status_bar.showMessage(
                 f"Failed to load session from {filepath}", 3000)
-            return False
-
-    def __create_session_from_otio(self, otio_timeline):
-        timeline_name = otio_timeline.name
-        fg_playlist_id = None
-        bg_playlist_id = None
-        rw_attrs_to_set = []
-        keyable_attrs_to_set = []
-        rw_annos = {}
-        rw_ccs = {}
-
-        attrs = self.__session_api.get_attrs()
-        rw_attrs = self.__session_api.get_read_write_attrs()
-
-        try:
-            tracks = otio_timeline.tracks
-            for track in tracks:
-                playlist_name = track.name if track.name else ""
-                playlist_id = self.__session_api.create_playlists([playlist_name])[0]
-
-                playlist_metadata = track.metadata.get(C.ITVIEW_METADATA_KEY)
-                is_fg = playlist_metadata.get("foreground", None)
-                is_bg = playlist_metadata.get("background", None)
-                if is_fg:
-                    fg_playlist_id = playlist_id
-                if is_bg:
-                    bg_playlist_id = playlist_id
-
-                clip_ids = []
-                clip_paths = []
-
-                for clip in track:
-                    clip_media = clip.media_reference.target_url
-
-                    if clip_media is None:
-                        continue
-
-                    clip_id = uuid.uuid4().hex
-                    clip_ids.append(clip_id)
-                    clip_paths.append(clip_media)
-                    clip_attr_values = clip.metadata[C.ITVIEW_METADATA_KEY]
-
-                    for attr_id, value in clip_attr_values.items():
-                        if attr_id in attrs:
-                            if self.__session_api.is_attr_keyable(attr_id):
-                                key_values = value.get("key_values")
-                                for frame, dynamic_value in key_values.items():
-                                    keyable_attrs_to_set.append(
-                                        (playlist_id, clip_id, attr_id, int(frame), float(dynamic_value)))
-                            elif attr_id in rw_attrs:
-                                rw_attrs_to_set.append((playlist_id, clip_id, attr_id, value))
-                        else:
-                            if attr_id == "annotations":
-                                for frame, anno in value["rw"].items():
-                                    rw_annos.setdefault(clip_id, {})[int(frame)] = \
-                                        Annotation().__setstate__(anno)
-                            elif attr_id == "color_corrections":
-                                for frame, cc in value["rw"]:
-                                    frame = int(frame) if frame is not None else None
-                                    converted_cc = self.__convert_cc_nodes(cc)
-                                    rw_ccs.setdefault(clip_id, []).append(
-                                        (frame, ColorCorrection().__setstate__(converted_cc)))
-
-                self.__session_api.create_clips(playlist_id, clip_paths, ids=clip_ids)
-
-            if rw_attrs_to_set:
-                self.__session_api.set_attr_values(rw_attrs_to_set)
-            if keyable_attrs_to_set:
-                self.__session_api.set_attr_values_at(keyable_attrs_to_set)
-
-            # Feedback: Annotations & Color Corrections
-            if self.__feedback:
-                if rw_annos:
-                    self.__annotation_api.set_rw_annotations(rw_annos)
-                if rw_ccs:
-                    self.__color_api.set_rw_ccs(rw_ccs)
-
-            if fg_playlist_id is not None:
-                self.__session_api.set_fg_playlist(fg_playlist_id)
-            if bg_playlist_id is not None:
-                self.__session_api.set_bg_playlist(bg_playlist_id)
-
-            return True
-
-        except Exception as exception:
-            print(f"Failed to load {timeline_name}: {exception}")
-            return False
-
-    def __convert_cc_nodes(self, cc):
-        color_timer = {}
-        grade = {}
-        converted_cc = {}
-
-        for cc_key, cc_value in cc.items():
-            if cc_key == "nodes":
-                for cc_node in cc_value:
-                    if cc_node.get("class_name") == "ColorTimer":
-                        for cc_node_key, cc_node_value in cc_node.items():
-                            if isinstance(cc_node_value, (otio._otio.AnyDictionary, dict)):
-                                color_timer[cc_node_key] = dict(cc_node_value)
-                            elif isinstance(cc_node_value, (otio._otio.AnyVector, tuple)):
-                                color_timer[cc_node_key] = tuple(cc_node_value)
-                            else:
-                                color_timer[cc_node_key] = cc_node_value
-                    if cc_node.get("class_name") == "Grade":
-                        for cc_node_key, cc_node_value in cc_node.items():
-                            if isinstance(cc_node_value, (otio._otio.AnyDictionary, dict)):
-                                grade[cc_node_key] = dict(cc_node_value)
-                            elif isinstance(cc_node_value, (otio._otio.AnyVector, tuple)):
-                                grade[cc_node_key] = tuple(cc_node_value)
-                            else:
-                                grade[cc_node_key] = cc_node_value
-            else:
-                converted_cc[cc_key] = cc_value
-
-        converted_cc["id"] = uuid.uuid4().hex
-        converted_cc["nodes"] = [color_timer, grade]
-
-        return converted_cc
+        self.SIG_SESSION_LOADED.emit(filepath, success, load_time_ms)
+        return success
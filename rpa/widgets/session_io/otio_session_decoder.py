@@ -0,0 +1,130 @@
+"""File with the functions that decode OTIO sessions, meant to run on a worker thread"""
+import json
+import uuid
+import opentimelineio as otio
+from typing import Dict, Iterable, List, Optional, Tuple
+from rpa.session_state.annotations import Annotation
+from rpa.session_state.color_corrections import ColorCorrection
+from rpa.widgets.session_io import constants as C
+
+
+def read_otio_tracks(filepath:str)->Tuple[str, List]:
+    """
+    Parse the OTIO file at the given path.
+
+    Returns:
+        (Tuple[str, List]): Name of the timeline and its tracks
+    """
+    otio_timeline = otio.adapters.read_from_file(filepath)
+    return otio_timeline.name, list(otio_timeline.tracks)
+
+
+def get_track_info(track)->Tuple[str, bool, bool]:
+    """
+    Returns:
+        (Tuple[str, bool, bool]):
+            Name of the playlist of the track and whether it is the FG and
+            the BG playlist
+    """
+    playlist_metadata = track.metadata.get(C.ITVIEW_METADATA_KEY) or {}
+    return (
+        track.name if track.name else "",
+        bool(playlist_metadata.get("foreground", False)),
+        bool(playlist_metadata.get("background", False)))
+
+
+def get_load_order(tracks_info:List[Tuple[str, bool, bool]])->List[int]:
+    """
+    Indexes of the tracks in the order their playlists are loaded in, the
+    FG playlist first and the BG playlist second so that they can be
+    viewed before the rest of the session is loaded.
+    """
+    def priority(index):
+        _, is_fg, is_bg = tracks_info[index]
+        return 0 if is_fg else 1 if is_bg else 2
+    return sorted(range(len(tracks_info)), key=priority)
+
+
+def get_media_path(media_reference)->Optional[str]:
+    # Image sequences are written as ImageSequenceReferences, which only
+    # have a target_url_base
+    if isinstance(media_reference, otio.schema.ImageSequenceReference):
+        return media_reference.target_url_base
+    return getattr(media_reference, "target_url", None)
+
+
+def decode_cc(cc:Dict)->ColorCorrection:
+    """
+    Decode the state of a color correction, giving it a new id so that it
+    does not clash with the color corrections already in the session.
+    """
+    return ColorCorrection().__setstate__(dict(cc, id=uuid.uuid4().hex))
+
+
+def decode_track(
+    track, attrs:Iterable[str], rw_attrs:Iterable[str],
+    keyable_attrs:Iterable[str])->Dict:
+    """
+    Decode the clips of the given track into the data needed to create
+    them in a playlist.
+
+    Args:
+        track (otio.schema.Track): Track of the playlist
+        attrs (Iterable[str]): Ids of the attrs of the session
+        rw_attrs (Iterable[str]): Ids of the read-write attrs
+        keyable_attrs (Iterable[str]): Ids of the keyable attrs
+
+    Returns:
+        (Dict): Paths and ids of the clips, with their attr values, key
+        values, rw annotations and rw color corrections
+    """
+    attrs = set(attrs)
+    rw_attrs = set(rw_attrs)
+    keyable_attrs = set(keyable_attrs)
+    clip_ids = []
+    clip_paths = []
+    attr_values = []
+    key_values = []
+    rw_annos = {}
+    rw_ccs = {}
+
+    for clip in track:
+        clip_media = get_media_path(clip.media_reference)
+        if clip_media is None:
+            continue
+
+        clip_id = uuid.uuid4().hex
+        clip_ids.append(clip_id)
+        clip_paths.append(clip_media)
+        # Reading the metadata through the OTIO bindings is an order of
+        # magnitude slower than having it serialized and parsed back as
+        # plain python objects
+        clip_metadata = json.loads(
+            clip.to_json_string()).get("metadata", {})
+        clip_attr_values = clip_metadata.get(C.ITVIEW_METADATA_KEY) or {}
+
+        for attr_id, value in clip_attr_values.items():
+            if attr_id in attrs:
+                if attr_id in keyable_attrs:
+                    for frame, dynamic_value in \
+                        (value.get("key_values") or {}).items():
+                        key_values.append(
+                            (clip_id, attr_id, int(frame), float(dynamic_value)))
+                elif attr_id in rw_attrs:
+                    attr_values.append((clip_id, attr_id, value))
+            elif attr_id == "annotations":
+                for frame, anno in value["rw"].items():
+                    rw_annos.setdefault(clip_id, {})[int(frame)] = \
+                        Annotation().__setstate__(anno)
+            elif attr_id == "color_corrections":
+                for frame, cc in value["rw"]:
+                    frame = int(frame) if frame is not None else None
+                    rw_ccs.setdefault(clip_id, []).append((frame, decode_cc(cc)))
+
+    return {
+        "clip_ids": clip_ids,
+        "clip_paths": clip_paths,
+        "attr_values": attr_values,
+        "key_values": key_values,
+        "rw_annos": rw_annos,
+        "rw_ccs": rw_ccs}
@@ -1,8 +1,15 @@
 import os
 import re
 import opentimelineio as otio
+from typing import Dict, List, Optional
 from rpa.widgets.session_io import constants as C
 
+# Attrs of the clips that OTIO clips and media references are made from
+MEDIA_ATTR_IDS = (
+    "media_path", "media_fps", "media_start_frame", "media_end_frame",
+    "key_in", "key_out")
+
+
 class OTIOWriter(object):
 
     def __init__(self, rpa, main_window, feedback):
@@ -15,21 +22,15 @@ class OTIOWriter(object):
         self.__status_bar = main_window.statusBar()
 
     def write_otio_file(self, file_path:str):
-        timeline = otio.schema.Timeline()
-
-        playlist_ids = self.__session_api.get_playlists()
-        for playlist_id in playlist_ids:
-            track = self.__create_otio_track(playlist_id)
-
-            clip_ids = self.__session_api.get_clips(playlist_id)
-            for clip_id in clip_ids:
-                clip = self.__create_otio_clip(playlist_id, clip_id)
-                track.append(clip)
-
-            timeline.tracks.append(track)
-
-        timeline.name = os.path.splitext(os.path.basename(file_path))[0]
-        success = otio.adapters.write_to_file(timeline, file_path)
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        playlists_data = [
+            (playlist_id, self.get_playlist_data(playlist_id)) \
+            for playlist_id in self.__session_api.get_playlists()]
+        timeline = create_otio_timeline(
+            name, playlists_data,
+            self.__session_api.get_fg_playlist(),
+            self.__session_api.get_bg_playlist())
+        success = write_otio_timeline(timeline, file_path)
         if success:
             self.__status_bar.showMessage(
                 f"Current session saved successfully in {file_path}", 3000)
@@ -37,158 +38,241 @@ class OTIOWriter(object):
         else:
             return False
 
-    def __create_otio_track(self, playlist_id:str):
-        playlist_name = self.__session_api.get_playlist_name(playlist_id)
-        playlist_metadata = self.__get_playlist_metadata(playlist_id)
-
-        track = otio.schema.Track(
-            name=playlist_name,
-            kind=otio.schema.TrackKind.Video
-        )
-        track.metadata[C.ITVIEW_METADATA_KEY] = playlist_metadata
-
-        return track
-
-    def __get_playlist_metadata(self, playlist_id:str):
-        playlist_metadata = {}
-        fg_playlist_id = self.__session_api.get_fg_playlist()
-        bg_playlist_id = self.__session_api.get_bg_playlist()
+    def get_playlist_data(
+        self, playlist_id:str, feedback_metadata:Optional[Dict]=None)->dict:
+        """
+        Get everything the OTIO track of the playlist is made from, as
+        plain python data that can be turned into OTIO objects by
+        create_otio_track on any thread. The attrs of the clips are fetched
+        by column, with one call per attr for the whole playlist, and their
+        feedback with a handful of batch calls for the whole playlist.
+
+        Kwargs:
+            feedback_metadata (Optional[Dict]): Feedback metadata of the
+                clips of the playlist by clip id, as returned by
+                get_feedback_metadata, to use instead of fetching it
+        """
+        clip_ids = self.__session_api.get_clips(playlist_id)
+        rw_attrs = self.__session_api.get_read_write_attrs()
+        keyable_attrs = self.__session_api.get_keyable_attrs()
+        rw_attrs = [rw_attr for rw_attr in rw_attrs if "sg_" not in rw_attr]
+
+        columns = {}
+        for attr_id in list(MEDIA_ATTR_IDS) + rw_attrs + keyable_attrs:
+            if attr_id not in columns:
+                columns[attr_id] = \
+                    self.__session_api.get_attr_column(playlist_id, attr_id)
+        default_values = {
+            attr_id: self.__session_api.get_default_attr_value(attr_id) \
+            for attr_id in rw_attrs + keyable_attrs}
+
+        if feedback_metadata is None:
+            feedback_metadata = \
+                self.get_feedback_metadata(clip_ids) if self.__feedback else {}
+
+        clips_data = []
+        for index, clip_id in enumerate(clip_ids):
+            clip_data = {
+                attr_id: columns[attr_id][index] for attr_id in MEDIA_ATTR_IDS}
+            clip_data["metadata"] = self.__get_clip_metadata(
+                index, rw_attrs, keyable_attrs, columns, default_values)
+            clip_data["metadata"].update(feedback_metadata.get(clip_id, {}))
+            clips_data.append(clip_data)
+
+        return {
+            "name": self.__session_api.get_playlist_name(playlist_id),
+            "clips": clips_data
+        }
 
-        if playlist_id == fg_playlist_id:
-            playlist_metadata["foreground"] = True
-        if playlist_id == bg_playlist_id:
-            playlist_metadata["background"] = True
+    def frames_to_otio_rational_times(self, start_frame:int, end_frame:int, fps:float):
+        return frames_to_otio_rational_times(start_frame, end_frame, fps)
 
-        return playlist_metadata
+    def __get_clip_metadata(
+        self, index, rw_attrs, keyable_attrs, columns, default_values):
+        clip_metadata = {}
 
-    def __create_otio_clip(self, playlist_id:str, clip_id:str):
-        media_reference = self.__create_media_reference(playlist_id, clip_id)
-        clip_metadata = self.__get_clip_metadata(playlist_id, clip_id)
+        for rw_attr in rw_attrs:
+            attr_value = columns[rw_attr][index]
+            if attr_value != default_values[rw_attr]:
+                clip_metadata[rw_attr] = attr_value
 
-        key_in = self.__session_api.get_attr_value(clip_id, "key_in")
-        key_out = self.__session_api.get_attr_value(clip_id, "key_out")
-        video_fps = self.__session_api.get_attr_value(clip_id, "media_fps")
-        start_frame = self.__session_api.get_attr_value(clip_id, "media_start_frame")
-        end_frame = self.__session_api.get_attr_value(clip_id, "media_end_frame")
+        for keyable_attr in keyable_attrs:
+            attr_value = columns[keyable_attr][index]
+            if attr_value != default_values[keyable_attr]:
+                key_value_dict = \
+                    {str(key): value for key, value in attr_value.get("key_values").items()}
+                clip_metadata.setdefault(keyable_attr, {})["key_values"] = key_value_dict
 
-        if start_frame == key_in and end_frame == key_out:
-            source_range = None
-        else:
-            source_range = self.__get_time_range(key_in, key_out, video_fps)
-        source_range = self.__get_time_range(key_in, key_out, video_fps)
+        return clip_metadata
 
-        clip = otio.schema.Clip(
-            media_reference=media_reference,
-            source_range=source_range
+    def get_feedback_metadata(self, clip_ids:List[str])->Dict[str, dict]:
+        """
+        Get the metadata of the rw annotations and modified rw color
+        corrections of the given clips, the clip ccs of each clip coming
+        before its frame ccs.
+
+        Returns:
+            (Dict[str, dict]): Metadata by clip id, for the clips that
+                have feedback
+        """
+        feedback_metadata = {}
+
+        # RW Annotations
+        anno_ids = [
+            (clip_id, frame) for clip_id, frames in \
+            zip(clip_ids, self.__annotation_api.get_rw_frames_many(clip_ids)) \
+            for frame in frames]
+        rw_annos = self.__annotation_api.get_rw_annotation_many(anno_ids)
+        for (clip_id, frame), rw_anno in zip(anno_ids, rw_annos):
+            if rw_anno is None: continue
+            feedback_metadata.setdefault(clip_id, {}).\
+                setdefault("annotations", {}).\
+                setdefault("rw", {})[str(frame)] = rw_anno.__getstate__()
+
+        # RW Clip & Frame CCs
+        cc_ids = [(clip_id, None) for clip_id in clip_ids]
+        cc_ids.extend(
+            (clip_id, frame) for clip_id, frames in \
+            zip(clip_ids, self.__color_api.get_rw_frames_many(clip_ids)) \
+            for frame in frames)
+        rw_ccs = [
+            (clip_id, frame, cc) for (clip_id, frame), ccs in \
+            zip(cc_ids, self.__color_api.get_rw_ccs_many(cc_ids)) \
+            for cc in ccs or []]
+        is_modified = self.__color_api.is_modified_many(
+            [(clip_id, cc.id) for clip_id, _, cc in rw_ccs])
+        for (clip_id, frame, cc), modified in zip(rw_ccs, is_modified):
+            if not modified: continue
+            feedback_metadata.setdefault(clip_id, {}).\
+                setdefault("color_corrections", {}).\
+                setdefault("rw", []).append(
+                    (None if frame is None else str(frame), cc.__getstate__()))
+
+        return feedback_metadata
+
+
+def create_otio_timeline(
+    name:str, playlists_data, fg_playlist_id=None, bg_playlist_id=None):
+    """
+    Create the OTIO timeline of the given (playlist_id, playlist_data)
+    pairs, where playlist_data comes from OTIOWriter.get_playlist_data.
+    """
+    timeline = otio.schema.Timeline()
+    for playlist_id, playlist_data in playlists_data:
+        timeline.tracks.append(create_otio_track(
+            playlist_data,
+            playlist_id == fg_playlist_id, playlist_id == bg_playlist_id))
+    timeline.name = name
+    return timeline
+
+
+def create_otio_track(playlist_data:dict, is_fg:bool=False, is_bg:bool=False):
+    track = otio.schema.Track(
+        name=playlist_data["name"],
+        kind=otio.schema.TrackKind.Video
+    )
+    playlist_metadata = {}
+    if is_fg:
+        playlist_metadata["foreground"] = True
+    if is_bg:
+        playlist_metadata["background"] = True
+    track.metadata[C.ITVIEW_METADATA_KEY] = playlist_metadata
+
+    for clip_data in playlist_data["clips"]:
+        track.append(create_otio_clip(clip_data))
+    return track
+
+
+def create_otio_clip(clip_data:dict):
+    video_fps = clip_data["media_fps"]
+    source_range = get_time_range(
+        clip_data["key_in"], clip_data["key_out"], video_fps)
+
+    clip = otio.schema.Clip(
+        media_reference=create_media_reference(clip_data),
+        source_range=source_range
+    )
+    clip.metadata[C.ITVIEW_METADATA_KEY] = clip_data["metadata"]
+    return clip
+
+
+def create_media_reference(clip_data:dict):
+    video_path = clip_data["media_path"]
+    available_range = get_time_range(
+        clip_data["media_start_frame"], clip_data["media_end_frame"],
+        clip_data["media_fps"])
+    is_img_seq, frame_zero_padding = is_image_sequence(video_path)
+
+    if is_img_seq:
+        media_ref = otio.schema.ImageSequenceReference(
+            target_url_base=video_path,
+            available_range=available_range,
+            frame_zero_padding=frame_zero_padding
+        )
+    else:
+        media_ref = otio.schema.ExternalReference(
+            target_url=video_path,
+            available_range=available_range
         )
-        clip.metadata[C.ITVIEW_METADATA_KEY] = clip_metadata
-
-        return clip
-
-    def __create_media_reference(self, playlist_id:str, clip_id:str):
-        video_path = self.__session_api.get_attr_value(clip_id, "media_path")
-        video_fps = self.__session_api.get_attr_value(clip_id, "media_fps")
-        start_frame = self.__session_api.get_attr_value(clip_id, "media_start_frame")
-        end_frame = self.__session_api.get_attr_value(clip_id, "media_end_frame")
-
-        available_range = self.__get_time_range(start_frame, end_frame, video_fps)
-        is_img_seq, frame_zero_padding = self.__is_image_sequence(video_path)
-
-        if is_img_seq:
-            media_ref = otio.schema.ImageSequenceReference(
-                target_url_base=video_path,
-                available_range=available_range,
-                frame_zero_padding=frame_zero_padding
-            )
-        else:
-            media_ref = otio.schema.ExternalReference(
-                target_url=video_path,
-                available_range=available_range
-            )
-
-        return media_ref
 
-    def __get_time_range(self, start_frame:int, end_frame:int, fps:float):
-        start_time, duration = \
-            self.frames_to_otio_rational_times(start_frame, end_frame, fps)
+    return media_ref
 
-        if not start_time or not duration:
-            return None
 
-        time_range = otio.opentime.TimeRange(
-            start_time=start_time,
-            duration=duration
-        )
-        return time_range
+def get_time_range(start_frame:int, end_frame:int, fps:float):
+    start_time, duration = \
+        frames_to_otio_rational_times(start_frame, end_frame, fps)
 
-    def frames_to_otio_rational_times(self, start_frame:int, end_frame:int, fps:float):
-        if start_frame is None or end_frame is None or not fps:
-            return None, None
-
-        start_time = otio.opentime.RationalTime(start_frame, rate=fps)
-        end_time_inclusive = otio.opentime.RationalTime(end_frame, rate=fps)
-        duration = otio.opentime.RationalTime.duration_from_start_end_time_inclusive(
-            start_time, end_time_inclusive)
-        return start_time, duration
-
-    def __is_image_sequence(self, media_path:str):
-        basename = os.path.basename(media_path)
-        frame_zero_padding = None
-        image_seq_pattern = re.findall("\.%0\d+d\.", basename)
-        if image_seq_pattern:
-            frame_zero_padding = int(re.search("\d+", image_seq_pattern[0]).group(0))
-        else:
-            image_seq_pattern = re.findall("\.\d+-\d+#|@+", basename)
-            if image_seq_pattern:
-                pattern = re.search("#|@+", image_seq_pattern[0]).group(0)
-                frame_zero_padding = 4 if "#" in pattern else len(pattern)
+    if not start_time or not duration:
+        return None
 
-        return (len(image_seq_pattern) == 1, frame_zero_padding)
+    time_range = otio.opentime.TimeRange(
+        start_time=start_time,
+        duration=duration
+    )
+    return time_range
 
-    def __get_clip_metadata(self, playlist_id:str, clip_id:str):
-        clip_metadata = {}
-        rw_attrs = self.__session_api.get_read_write_attrs()
-        keyable_attrs = self.__session_api.get_keyable_attrs()
 
-        for rw_attr in rw_attrs:
-            if "sg_" in rw_attr:
-                continue
-            default_attr_value = self.__session_api.get_default_attr_value(rw_attr)
-            attr_value = self.__session_api.get_attr_value(clip_id, rw_attr)
-            if attr_value != default_attr_value:
-                clip_metadata[rw_attr] = attr_value
+def frames_to_otio_rational_times(start_frame:int, end_frame:int, fps:float):
+    if start_frame is None or end_frame is None or not fps:
+        return None, None
 
-        for keyable_attr in keyable_attrs:
-            default_attr_value = self.__session_api.get_default_attr_value(keyable_attr)
-            attr_value = self.__session_api.get_attr_value(clip_id, keyable_attr)
-            if attr_value != default_attr_value:
-                key_value_dict = \
-                    {str(key): value for key, value in attr_value.get("key_values").items()}
-                clip_metadata.setdefault(keyable_attr, {})["key_values"] = key_value_dict
+    start_time = otio.opentime.RationalTime(start_frame, rate=fps)
+    end_time_inclusive = otio.opentime.RationalTime(end_frame, rate=fps)
+    duration = otio.opentime.RationalTime.duration_from_start_end_time_inclusive(
+        start_time, end_time_inclusive)
+    return start_time, duration
 
-        # Feedback: Annotations & Color Corrections
-        if self.__feedback:
-            # RW Annotations
-            for frame in self.__annotation_api.get_rw_frames(clip_id):
-                rw_anno = self.__annotation_api.get_rw_annotation(clip_id, frame)
-                clip_metadata.setdefault("annotations", {}).\
-                    setdefault("rw", {})[str(frame)] = rw_anno.__getstate__()
-
-            # RW Clip CCs
-            clip_rw_ccs = self.__color_api.get_rw_ccs(clip_id)
-            clip_rw_ccs = [(None, cc.__getstate__()) for cc in clip_rw_ccs if \
-                self.__color_api.is_modified(clip_id, cc.__getstate__().get("id"))]
-            if clip_rw_ccs:
-                clip_metadata.setdefault("color_corrections", {}).\
-                    setdefault("rw", []).extend(clip_rw_ccs)
-
-            # RW Frame CCs
-            for frame in self.__color_api.get_rw_frames(clip_id):
-                clip_rw_ccs = self.__color_api.get_rw_ccs(clip_id, frame)
-                clip_rw_ccs = [(str(frame), cc.__getstate__()) for cc in clip_rw_ccs if \
-                    self.__color_api.is_modified(clip_id, cc.__getstate__().get("id"))]
-                if clip_rw_ccs:
-                    clip_metadata.setdefault("color_corrections", {}).\
-                        setdefault("rw", []).extend(clip_rw_ccs)
 
-        return clip_metadata
+def is_image_sequence(media_path:str):
+    basename = os.path.basename(media_path)
+    frame_zero_padding = None
+    image_seq_pattern = re.findall("\.%0\d+d\.", basename)
+    if image_seq_pattern:
+        frame_zero_padding = int(re.search("\d+", image_seq_pattern[0]).group(0))
+    else:
+        image_seq_pattern = re.findall("\.\d+-\d+#|@+", basename)
+        if image_seq_pattern:
+            pattern = re.search("#|@+", image_seq_pattern[0]).group(0)
+            frame_zero_padding = 4 if "#" in pattern else len(pattern)
+
+    return (len(image_seq_pattern) == 1, frame_zero_padding)
+
+
+def write_otio_timeline(timeline, file_path:str)->bool:
+    """
+    Write the timeline to the given file by writing it to a temporary file
+    in the same directory first and renaming it, so that the file is never
+    left half written.
+    """
+    data = otio.adapters.write_to_string(timeline, "otio_json")
+    tmp_file_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_file_path, "w") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_file_path, file_path)
+    except OSError:
+        if os.path.exists(tmp_file_path): os.remove(tmp_file_path)
+        return False
+    return True
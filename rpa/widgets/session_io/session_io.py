@@ -1,4 +1,5 @@
 import os
+from functools import partial
 try:
     from PySide2 import QtCore, QtWidgets
     from PySide2.QtWidgets import QAction
@@ -102,7 +103,7 @@ class SessionIO(QtCore.QObject):
         if not filepath.endswith(C.OTIO_EXT):
             return
 
-        self.__otio_reader.read_otio_file(filepath)
+        self.__otio_reader.read_otio_file_in_background(filepath)
 
     def replace_session(self):
         filepath = self.__get_filepath_from_dialog(C.REPLACE)
@@ -115,7 +116,10 @@ class SessionIO(QtCore.QObject):
 
         self.__rpa.session_api.clear()
         playlist_ids = self.__rpa.session_api.get_playlists() # default playlist
-        success = self.__otio_reader.read_otio_file(filepath)
+        self.__otio_reader.read_otio_file_in_background(
+            filepath, partial(self.__session_replaced, playlist_ids))
+
+    def __session_replaced(self, playlist_ids, success):
         if success:
             self.__rpa.session_api.delete_playlists_permanently(playlist_ids)
 
@@ -13,9 +13,6 @@ from rpa.widgets.session_manager.clips_controller.clips_controller \
     import ClipsController
 from enum import Enum
 import json
-from rpa.session_state.annotations import Annotation
-from rpa.session_state.color_corrections import ColorCorrection
-import uuid
 
 
 class PrefKey(Enum):
@@ -236,82 +233,16 @@ class SessionManager:
         return clips_data
 
     def __get_clips_data(self, playlist, clips):
-        clips_data = {}
-        for clip in clips:
-            clip_data = {}
-
-            # Attrs
-            attr_values = {}
-            for attr_id, metadata in \
-            self.__rpa.session_api.get_attrs_metadata().items():
-                if metadata.get("is_read_only", True): continue
-                attr_values[attr_id] = self.__rpa.session_api.get_attr_value(
-                    clip, attr_id)
-            media_path_attr_ids = ["media_path"]
-            media_path_attr_ids.extend(self.__injected_media_path_attr_ids)
-            for attr_id in media_path_attr_ids:
-                attr_values[attr_id] = self.__rpa.session_api.get_attr_value(
-                    clip, attr_id)
-            clip_data["attrs"] = attr_values
-
-            # Custom Attrs
-            for attr_id in self.__rpa.session_api.get_custom_clip_attr_ids(clip):
-                clip_data.setdefault("custom_attrs", {})[attr_id] = \
-                    self.__rpa.session_api.get_custom_clip_attr(clip, attr_id)
-
-            # Annotations
-            for frame in self.__rpa.annotation_api.get_ro_frames(clip):
-                ro_annos = \
-                    self.__rpa.annotation_api.get_ro_annotations(clip, frame)
-                ro_annos = [annos.__getstate__() for annos in ro_annos]
-                clip_data.setdefault(
-                    "annotations", {}).setdefault("ro", {})[frame] = ro_annos
-
-            for frame in self.__rpa.annotation_api.get_rw_frames(clip):
-                rw_anno = \
-                    self.__rpa.annotation_api.get_rw_annotation(clip, frame)
-                clip_data.setdefault(
-                    "annotations", {}).setdefault("rw", {})[frame] = \
-                        rw_anno.__getstate__()
-
-            # Color Corrections
-            # RO Clip CCs
-            clip_ro_ccs = self.__rpa.color_api.get_ro_ccs(clip)
-            clip_ro_ccs = [(None, cc.__getstate__()) for cc in clip_ro_ccs]
-            clip_data.setdefault("color_corrections", {}).\
-                setdefault("ro", []).extend(clip_ro_ccs)
-            # RO Frame CCs
-            for frame in self.__rpa.color_api.get_ro_frames(clip):
-                clip_ro_ccs = self.__rpa.color_api.get_ro_ccs(clip, frame)
-                clip_ro_ccs = [(frame, cc.__getstate__()) for cc in clip_ro_ccs]
-                clip_data.setdefault("color_corrections", {}).\
-                    setdefault("ro", []).extend(clip_ro_ccs)
-
-            # RW Clip CCs
-            clip_rw_ccs = self.__rpa.color_api.get_rw_ccs(clip)
-            clip_rw_ccs = [(None, cc.__getstate__()) for cc in clip_rw_ccs]
-            clip_data.setdefault("color_corrections", {}).\
-                setdefault("rw", []).extend(clip_rw_ccs)
-            # RW Frame CCs
-            for frame in self.__rpa.color_api.get_rw_frames(clip):
-                clip_rw_ccs = self.__rpa.color_api.get_rw_ccs(clip, frame)
-                clip_rw_ccs = [(frame, cc.__getstate__()) for cc in clip_rw_ccs]
-                clip_data.setdefault("color_corrections", {}).\
-                    setdefault("rw", []).extend(clip_rw_ccs)
-
-            clips_data[clip] = clip_data
-
-        return clips_data
+        return self.__rpa.session_api.get_clips_snapshot(
+            clips, self.__injected_media_path_attr_ids)
 
     def __paste_clips(self, playlist, clips_data, index=None):
-        media_paths = []
-        for _, clip_data in clips_data.items():
-            attrs = clip_data.get("attrs")
-            if self.__get_media_path_for_paste and \
-            self.__get_media_path_for_paste(attrs) is not None:
-                media_paths.append(self.__get_media_path_for_paste(attrs))
-            else:
-                media_paths.append(attrs.get("media_path"))
+        if self.__get_media_path_for_paste:
+            for clip_data in clips_data.values():
+                attrs = clip_data.get("attrs")
+                media_path = self.__get_media_path_for_paste(attrs)
+                if media_path is not None:
+                    attrs["media_path"] = media_path
 
         clips = self.__rpa.session_api.get_clips(playlist)
         active_clips = self.__rpa.session_api.get_active_clips(playlist)
@@ -323,65 +254,8 @@ class SessionManager:
                 if index is None:
                     index = len(clips) - 1
 
-        clip_ids = self.__rpa.session_api.create_clips(
-            playlist, media_paths, index + 1)
-
-        cnt = 0
-        attr_values = []
-        ro_annos = {}
-        rw_annos = {}
-        ro_ccs = {}
-        rw_ccs = {}
-        for _, clip_data in clips_data.items():
-            clip_id = clip_ids[cnt]
-            cnt += 1
-
-            attrs = clip_data.get("attrs")
-            for attr_id, value in attrs.items():
-                media_path_attr_ids = ["media_path"]
-                media_path_attr_ids.extend(self.__injected_media_path_attr_ids)
-                if attr_id in ["media_path"]: continue
-                attr_values.append((playlist, clip_id,  attr_id, value))
-
-            custom_attrs = clip_data.get("custom_attrs")
-            if custom_attrs:
-                for attr_id, value in custom_attrs.items():
-                    self.__rpa.session_api.set_custom_clip_attr(clip_id, attr_id, value)
-
-            if clip_data.get("annotations"):
-                if clip_data["annotations"].get("ro"):
-                    for frame, annos in clip_data["annotations"]["ro"].items():
-                        annos = [Annotation().__setstate__(anno) for anno in annos]
-                        ro_annos.setdefault(clip_id, {})[int(frame)] = annos
-
-                if clip_data["annotations"].get("rw"):
-                    for frame, anno in clip_data["annotations"]["rw"].items():
-                        rw_annos.setdefault(clip_id, {})[int(frame)] = \
-                            Annotation().__setstate__(anno)
-
-            if clip_data.get("color_corrections"):
-                if clip_data["color_corrections"].get("ro"):
-                    for frame, ccs in clip_data["color_corrections"]["ro"]:
-                        cc_objects = []
-                        for cc in ccs:
-                            color_correction = ColorCorrection()
-                            color_correction.__setstate__(cc)
-                            color_correction.id = uuid.uuid4().hex
-                            cc_objects.append(color_correction)
-                        ro_ccs.setdefault(clip_id, []).append((int(frame), cc_objects))
-
-                if clip_data["color_corrections"].get("rw"):
-                    for frame, cc in clip_data["color_corrections"]["rw"]:
-                        frame = int(frame) if frame is not None else frame
-                        cc["id"] = uuid.uuid4().hex
-                        rw_ccs.setdefault(clip_id, []).append(
-                            (frame, ColorCorrection().__setstate__(cc)))
-
-        self.__rpa.session_api.set_attr_values(attr_values)
-        if ro_annos: self.__rpa.annotation_api.set_ro_annotations(ro_annos)
-        if rw_annos: self.__rpa.annotation_api.set_rw_annotations(rw_annos)
-        if ro_ccs: self.__rpa.color_api.set_ro_ccs(ro_ccs)
-        if rw_ccs: self.__rpa.color_api.set_rw_ccs(rw_ccs)
+        clip_ids = self.__rpa.session_api.restore_clips_snapshot(
+            playlist, clips_data, index + 1)
         self.__rpa.session_api.set_active_clips(playlist, clip_ids)
 
     def inject_get_media_path_for_paste(self, callable):
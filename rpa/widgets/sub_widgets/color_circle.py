@@ -56,6 +56,9 @@ class ColorCircle(QtWidgets.QWidget):
         self.setCursor(QtCore.Qt.PointingHandCursor)
 
         self.__hv_constraint = False
+        # Hue wheels and value overlays, rendered once per size and value
+        self.__circles_pixmap = None
+        self.__circles_key = None
         self.SIG_CONSTRAINT_HV.connect(self.__setHueValueConstraintFlag)
 
     @QtCore.Slot(bool)
@@ -70,10 +73,27 @@ class ColorCircle(QtWidgets.QWidget):
         self.outer_square = QtCore.QRect(0, 0, size + 40, size + 40)
         self.outer_square.moveCenter(self.rect().center())
         self.square.moveCenter(self.rect().center())
-
-    def paintEvent(self, ev):
+        self.__circles_pixmap = None
+
+    def __get_circles_pixmap(self):
+        pixel_ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), self.v, pixel_ratio)
+        if self.__circles_pixmap is not None and self.__circles_key == key:
+            return self.__circles_pixmap
+
+        pixmap = QtGui.QPixmap(self.size() * pixel_ratio)
+        pixmap.setDevicePixelRatio(pixel_ratio)
+        pixmap.fill(QtCore.Qt.transparent)
+        p = QtGui.QPainter(pixmap)
+        self.__draw_circles(p)
+        p.end()
+
+        self.__circles_pixmap = pixmap
+        self.__circles_key = key
+        return pixmap
+
+    def __draw_circles(self, p):
         center = QtCore.QPointF(self.width()/2, self.height()/2)
-        p = QtGui.QPainter(self)
         p.setRenderHint(QtGui.QPainter.Antialiasing)
         p.setViewport(self.margin, self.margin, self.width() -
                       2*self.margin, self.height()-2*self.margin)
@@ -109,6 +129,15 @@ class ColorCircle(QtWidgets.QWidget):
         p.setBrush(val_grad)
         p.drawEllipse(self.square)
 
+    def paintEvent(self, ev):
+        p = QtGui.QPainter(self)
+        p.drawPixmap(0, 0, self.__get_circles_pixmap())
+
+        # Only the selection markers are drawn on every repaint
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
+        p.setViewport(self.margin, self.margin, self.width() -
+                      2*self.margin, self.height()-2*self.margin)
+
         # Inner color selection circle
         p.setPen(QtCore.Qt.black)
         p.setBrush(QtGui.QColor(255.0, 255.0, 255.0))
@@ -0,0 +1,113 @@
+"""
+Benchmark of the repaints of ColorCircle while dragging, in ms per
+repaint. The widget is rendered offscreen into a QImage after each
+position of a drag over the hue and saturation circle, and after each
+position of a drag of the value.
+
+To compare with another version of the color circle, write it to a file
+and give its path with --baseline,
+
+.. code-block:: bash
+
+    git show <rev>:rpa/widgets/sub_widgets/color_circle.py \\
+        > /tmp/color_circle_baseline.py
+    QT_QPA_PLATFORM=offscreen python -m rpa.widgets.test_widgets.bench_color_circle \\
+        --baseline /tmp/color_circle_baseline.py
+"""
+import argparse
+import importlib.util
+import math
+import sys
+import time
+try:
+    from PySide2 import QtGui, QtWidgets
+except ImportError:
+    from PySide6 import QtGui, QtWidgets
+from rpa.widgets.sub_widgets.color_circle import ColorCircle
+
+SIZE = 270
+
+
+def load_color_circle_class(file_path):
+    spec = importlib.util.spec_from_file_location(
+        "color_circle_baseline", file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ColorCircle
+
+
+def drag_hue_saturation(circle, step, num_steps):
+    # Circles around the center, getting closer to it, the way a mouse
+    # drag would move the selection
+    center = circle.rect().center()
+    angle = 2 * math.pi * step / 60
+    distance = circle.radius * (1 - (step + 1) / num_steps)
+    circle.h, circle.s, circle.v = circle.map_color(
+        center.x() + distance * math.cos(angle),
+        center.y() + distance * math.sin(angle))
+
+
+def drag_value(circle, step, num_steps):
+    circle.v = 1 - step / num_steps
+
+
+DRAGS = (
+    ("hue/saturation drag", drag_hue_saturation),
+    ("value drag", drag_value),
+)
+
+
+def get_ms_per_repaint(
+    color_circle_class, drag, num_steps:int, num_repeats:int)->float:
+    """
+    Best time in ms of a repaint out of num_repeats drags of num_steps
+    positions, each followed by a repaint into an offscreen image.
+    """
+    circle = color_circle_class(size=SIZE)
+    circle.resize(SIZE, SIZE)
+    image = QtGui.QImage(SIZE, SIZE, QtGui.QImage.Format_ARGB32_Premultiplied)
+    # The first render sends the pending resize event to the widget
+    circle.render(image)
+
+    best_time = None
+    for _ in range(num_repeats):
+        start_time = time.perf_counter()
+        for step in range(num_steps):
+            drag(circle, step, num_steps)
+            circle.render(image)
+        run_time = time.perf_counter() - start_time
+        if best_time is None or run_time < best_time:
+            best_time = run_time
+    return 1000 * best_time / num_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--baseline", help="Path of a color_circle.py to compare with")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    versions = [("current", ColorCircle)]
+    if args.baseline:
+        versions.insert(
+            0, ("baseline", load_color_circle_class(args.baseline)))
+
+    print("".ljust(20) + "".join(
+        f"{name} (ms/repaint)".rjust(24) for name, _ in versions))
+    for drag_name, drag in DRAGS:
+        times = [
+            get_ms_per_repaint(
+                color_circle_class, drag, args.steps, args.repeats) \
+            for _, color_circle_class in versions]
+        line = drag_name.ljust(20) + \
+            "".join(f"{ms:.3f}".rjust(24) for ms in times)
+        if len(times) == 2:
+            line += f"{times[0] / times[1]:.2f}x".rjust(10)
+        print(line)
+
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication(sys.argv)
+    main()
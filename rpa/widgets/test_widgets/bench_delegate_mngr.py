@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of DelegateMngr.call, in calls per second, with 0, 1 and 5
+pre and post delegates on the called method.
+
+To compare with another version of the delegate manager, write it to a
+file and give its path with --baseline,
+
+.. code-block:: bash
+
+    git show <rev>:rpa/delegate_mngr.py > /tmp/delegate_mngr_baseline.py
+    python -m rpa.widgets.test_widgets.bench_delegate_mngr \\
+        --baseline /tmp/delegate_mngr_baseline.py
+"""
+import argparse
+import importlib.util
+import logging
+import time
+from rpa.delegate_mngr import DelegateMngr
+
+NUM_DELEGATES = (0, 1, 5)
+
+
+class Api:
+
+    def get_attr_value(self, clip_id, attr_id):
+        pass
+
+
+def core_delegate(clip_id, attr_id):
+    return 1
+
+
+def pre_delegate(clip_id, attr_id):
+    pass
+
+
+def post_delegate(out, clip_id, attr_id):
+    pass
+
+
+def load_delegate_mngr_class(file_path):
+    spec = importlib.util.spec_from_file_location(
+        "delegate_mngr_baseline", file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DelegateMngr
+
+
+def get_calls_per_second(
+    delegate_mngr_class, num_delegates:int, num_calls:int, num_repeats:int)->float:
+    """
+    Best number of calls per second out of num_repeats runs of num_calls
+    calls, with num_delegates pre and post delegates on the called method.
+    """
+    api = Api()
+    delegate_mngr = delegate_mngr_class(logging.getLogger("bench"))
+    delegate_mngr._set_core_delegate(api.get_attr_value, core_delegate)
+    for _ in range(num_delegates):
+        delegate_mngr.add_pre_delegate(api.get_attr_value, pre_delegate)
+        delegate_mngr.add_post_delegate(api.get_attr_value, post_delegate)
+
+    call = delegate_mngr.call
+    method = api.get_attr_value
+    args = ["clip_id", "attr_id"]
+    best_time = None
+    for _ in range(num_repeats):
+        start_time = time.perf_counter()
+        for _ in range(num_calls):
+            call(method, args)
+        run_time = time.perf_counter() - start_time
+        if best_time is None or run_time < best_time:
+            best_time = run_time
+    return num_calls / best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--baseline", help="Path of a delegate_mngr.py to compare with")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    versions = [("current", DelegateMngr)]
+    if args.baseline:
+        versions.insert(
+            0, ("baseline", load_delegate_mngr_class(args.baseline)))
+
+    print("pre/post delegates".ljust(20) + "".join(
+        f"{name} (calls/s)".rjust(22) for name, _ in versions))
+    for num_delegates in NUM_DELEGATES:
+        rates = [
+            get_calls_per_second(
+                delegate_mngr_class, num_delegates, args.calls, args.repeats) \
+            for _, delegate_mngr_class in versions]
+        line = str(num_delegates).ljust(20) + \
+            "".join(f"{rate:,.0f}".rjust(22) for rate in rates)
+        if len(rates) == 2:
+            line += f"{rates[1] / rates[0]:.2f}x".rjust(10)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
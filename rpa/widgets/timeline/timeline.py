@@ -438,14 +438,14 @@ class TimelineController(QtWidgets.QToolBar):
             clip_ids = self.__session_api.get_active_clips(self.__playlist_id)
             if not clip_ids:
                 clip_ids = self.__session_api.get_clips(self.__playlist_id)
+            clip_keys = {}
             for clip_id in clip_ids:
+                attr_keys = set()
                 for attr_id in DYNAMIC_TRANSFORM_ATTRS:
-                    attr_keys = self.__session_api.get_attr_keys(clip_id, attr_id)
-                    seq_frames = self.__timeline_api.get_seq_frames(clip_id, attr_keys)
-                    if seq_frames:
-                        first_seq_frame_only = [seqs[0] for _, seqs in seq_frames]
-                        seq_transform_keys = seq_transform_keys.union(first_seq_frame_only)
-                    seq_transform_keys = seq_transform_keys.union()
+                    attr_keys.update(
+                        self.__session_api.get_attr_keys(clip_id, attr_id))
+                clip_keys[clip_id] = list(attr_keys)
+            seq_transform_keys = self.__get_first_seq_frames(clip_keys)
             keys = [key for key in sorted(seq_transform_keys) if key != -1]
         return keys
 
@@ -463,24 +463,13 @@ class TimelineController(QtWidgets.QToolBar):
                 self.__playlist_id)
             if len(clip_ids) == 0:
                 clip_ids = self.__session_api.get_clips(self.__playlist_id)
-            annotation_rw_frames = []
-            annotation_ro_frames = []
-            annotation_ro_note_frames = []
-            for clip_id in clip_ids:
-                rw_frames = self.__annotation_api.get_rw_frames(clip_id)
-                rw_seq_frames = self.__timeline_api.get_seq_frames(clip_id, rw_frames)
-                if rw_seq_frames:
-                    annotation_rw_frames = [seqs[0] for _, seqs in rw_seq_frames]
-                
-                ro_frames = self.__annotation_api.get_ro_frames(clip_id)
-                ro_seq_frames = self.__timeline_api.get_seq_frames(clip_id, ro_frames)
-                if ro_seq_frames:
-                    annotation_ro_frames = [seqs[0] for _, seqs in ro_seq_frames]
-
-                ro_note_frames = self.__annotation_api.get_ro_note_frames(clip_id)
-                ro_note_seq_frames = self.__timeline_api.get_seq_frames(clip_id, ro_note_frames)
-                if ro_note_seq_frames:
-                    annotation_ro_note_frames = [seqs[0] for _, seqs in ro_note_seq_frames]
+            annotation_rw_frames = self.__get_first_seq_frames(dict(zip(
+                clip_ids, self.__annotation_api.get_rw_frames_many(clip_ids))))
+            annotation_ro_frames = self.__get_first_seq_frames(dict(zip(
+                clip_ids, self.__annotation_api.get_ro_frames_many(clip_ids))))
+            annotation_ro_note_frames = self.__get_first_seq_frames({
+                clip_id: self.__annotation_api.get_ro_note_frames(clip_id) \
+                for clip_id in clip_ids})
 
         self.__slider.set_annotation_rw_keys(annotation_rw_frames)
         self.__slider.set_annotation_ro_keys(annotation_ro_frames)
@@ -497,21 +486,18 @@ class TimelineController(QtWidgets.QToolBar):
             )
             if len(clip_ids) == 0:
                 clip_ids = self.__session_api.get_clips(self.__playlist_id)
-            cc_rw_frames = []
-            cc_ro_frames = []
-            for clip_id in clip_ids:
-                rw_frames = self.__color_api.get_rw_frames(clip_id)
-                rw_seq_frames = self.__timeline_api.get_seq_frames(clip_id, rw_frames)
-                if rw_seq_frames:
-                    cc_rw_frames = [seqs[0] for _, seqs in rw_seq_frames]
-                ro_frames = self.__color_api.get_ro_frames(clip_id)
-                ro_seq_frames = self.__timeline_api.get_seq_frames(clip_id, ro_frames)
-                if ro_seq_frames:
-                    cc_ro_frames = [seqs[0] for _, seqs in ro_seq_frames]
+            cc_rw_frames = self.__get_first_seq_frames(dict(zip(
+                clip_ids, self.__color_api.get_rw_frames_many(clip_ids))))
+            cc_ro_frames = self.__get_first_seq_frames(dict(zip(
+                clip_ids, self.__color_api.get_ro_frames_many(clip_ids))))
 
         self.__slider.set_cc_rw_keys(cc_rw_frames)
         self.__slider.set_cc_ro_keys(cc_ro_frames)
 
+    def __get_first_seq_frames(self, clip_frames):
+        seq_frames = self.__timeline_api.get_seq_frames_for_clips(clip_frames)
+        return sorted(set().union(*seq_frames.values()))
+
     def __copy_annotations(self):
         if not self.__selected_keys:
             return
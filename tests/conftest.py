@@ -0,0 +1,73 @@
+from itertools import count
+import pytest
+
+
+class FakeGL:
+    """
+    Stands in for the GL module, keeping track of the live resources and of
+    the calls that create, delete and upload them.
+    """
+    def __init__(self):
+        self.__next_id = count(1)
+        self.textures = set()
+        self.framebuffers = set()
+        self.buffers = set()
+        self.calls = []
+
+    def __getattr__(self, name):
+        # GL constants
+        if name.startswith("GL_"): return name
+        raise AttributeError(name)
+
+    def __gen(self, method, resources):
+        resource = next(self.__next_id)
+        resources.add(resource)
+        self.calls.append(method)
+        return resource
+
+    def __delete(self, method, resources, ids):
+        for resource in ids:
+            assert resource in resources, f"{method} of a deleted resource"
+            resources.remove(resource)
+        self.calls.append(method)
+
+    def glGenTextures(self, num):
+        return self.__gen("glGenTextures", self.textures)
+
+    def glGenFramebuffers(self, num):
+        return self.__gen("glGenFramebuffers", self.framebuffers)
+
+    def glGenBuffers(self, num):
+        return self.__gen("glGenBuffers", self.buffers)
+
+    def glDeleteTextures(self, ids):
+        self.__delete("glDeleteTextures", self.textures, ids)
+
+    def glDeleteFramebuffers(self, num, ids):
+        self.__delete("glDeleteFramebuffers", self.framebuffers, ids)
+
+    def glDeleteBuffers(self, num, ids):
+        self.__delete("glDeleteBuffers", self.buffers, ids)
+
+    def glBufferData(self, *args):
+        self.calls.append("glBufferData")
+
+    def glBufferSubData(self, *args):
+        self.calls.append("glBufferSubData")
+
+    def glBindFramebuffer(self, *args): pass
+    def glBindTexture(self, *args): pass
+    def glTexImage2D(self, *args): pass
+    def glFramebufferTexture2D(self, *args): pass
+    def glBindBuffer(self, *args): pass
+    def glBindBufferBase(self, *args): pass
+
+    def get_gen_delete_calls(self):
+        return [
+            call for call in self.calls \
+            if call.startswith("glGen") or call.startswith("glDelete")]
+
+
+@pytest.fixture
+def gl():
+    return FakeGL()
@@ -0,0 +1,129 @@
+import numpy as np
+from rpa.session_state.color_corrections import \
+    ColorCorrection, ColorTimer, Grade, Region, Shape
+from rpa.session_state.color_evaluator import \
+    apply_color_corrections, apply_color_timer, apply_grade, get_region_mask
+from rpa.session_state.utils import Point
+
+# Golden values are worked out by hand from the math of
+# color_corrector.glsl, for small fixed inputs
+
+# Values of an 8 bit mask texture
+EDGE_INSIDE = 191 / 255 # 0.75 rounded
+EDGE_OUTSIDE = 64 / 255 # 0.25 rounded
+
+
+def planes(*pixels):
+    # rgb planes of shape (3, 1, num_pixels)
+    return np.array(pixels, dtype=np.float32).T.reshape(3, 1, len(pixels))
+
+
+def pixels(rgb):
+    return rgb.reshape(3, -1).T
+
+
+def rectangle(left, bottom, right, top):
+    return Shape(points=[
+        Point(left, bottom), Point(right, bottom),
+        Point(right, top), Point(left, top)])
+
+
+def test_color_timer():
+    node = ColorTimer(
+        slope=(2.0, 1.0, 0.5), offset=(0.1, 0.0, -0.1), power=(1.0, 2.0, 1.0),
+        saturation=0.5)
+    rgb = apply_color_timer(planes((0.25, 0.5, 1.0), (0.5, 0.25, 0.2)), node)
+    np.testing.assert_allclose(
+        pixels(rgb),
+        [[0.631081, 0.684635, 0.531081],
+         [0.84573, 0.54573, 0.29573]], atol=1e-6)
+
+
+def test_muted_color_timer_is_not_applied():
+    node = ColorTimer(slope=(2.0, 2.0, 2.0), mute=True)
+    rgb = apply_color_timer(planes((0.25, 0.5, 1.0)), node)
+    np.testing.assert_array_equal(pixels(rgb), [[0.25, 0.5, 1.0]])
+
+
+def test_grade():
+    node = Grade(
+        blackpoint=(0.1, 0.0, 0.0), whitepoint=(0.9, 1.0, 1.0),
+        lift=(0.0, 0.1, 0.0), gain=(1.0, 1.0, 2.0), gamma=(1.0, 1.0, 2.0))
+    rgb = apply_grade(planes((0.5, 0.5, 0.5), (0.1, 0.0, 0.125)), node)
+    np.testing.assert_allclose(
+        pixels(rgb), [[0.5, 0.55, 1.0], [0.0, 0.1, 0.5]], atol=1e-6)
+
+
+def test_grade_multiply():
+    node = Grade(multiply=(2.0, 0.5, 1.0))
+    rgb = apply_grade(planes((0.25, 0.5, 0.75)), node)
+    np.testing.assert_allclose(pixels(rgb), [[0.5, 0.25, 0.75]], atol=1e-6)
+
+
+def test_region_mask_without_falloff():
+    # The bottom left quarter of the image, in the first rows of the mask
+    # since they are the top of the image
+    region = Region(shapes=[rectangle(0.0, 0.0, 0.5, 0.5)])
+    mask = get_region_mask(region, 4, 4)
+    np.testing.assert_array_equal(
+        mask,
+        [[0, 0, 0, 0],
+         [0, 0, 0, 0],
+         [1, 1, 0, 0],
+         [1, 1, 0, 0]])
+    assert mask.dtype == np.float32
+
+
+def test_region_mask_without_shapes_covers_the_image():
+    mask = get_region_mask(Region(), 3, 2)
+    np.testing.assert_array_equal(mask, np.ones((2, 3)))
+
+
+def test_region_mask_with_falloff():
+    # A falloff of 4 blurs by the kernel (0.25, 0.5, 0.25) along each axis,
+    # mirroring the mask at the borders of the image
+    region = Region(falloff=4, shapes=[rectangle(0.0, 0.0, 0.5, 1.0)])
+    mask = get_region_mask(region, 8, 4)
+    expected_row = [1, 1, 1, EDGE_INSIDE, EDGE_OUTSIDE, 0, 0, 0]
+    np.testing.assert_allclose(mask, [expected_row] * 4, atol=1e-6)
+
+
+def test_region_mask_corner_with_falloff():
+    region = Region(falloff=4, shapes=[rectangle(0.0, 0.0, 0.5, 0.5)])
+    mask = get_region_mask(region, 8, 8)[::-1] # rows going up
+    np.testing.assert_allclose(mask[0, :6], [1, 1, 1, EDGE_INSIDE, EDGE_OUTSIDE, 0], atol=1e-6)
+    np.testing.assert_allclose(mask[:6, 0], [1, 1, 1, EDGE_INSIDE, EDGE_OUTSIDE, 0], atol=1e-6)
+    # Each pass is stored in 8 bits before the next one
+    np.testing.assert_allclose(mask[3, 3], round(EDGE_INSIDE * 0.75 * 255) / 255, atol=1e-6)
+    np.testing.assert_allclose(mask[4, 4], 16 / 255, atol=1e-6)
+    np.testing.assert_allclose(mask[5, 5], 0, atol=1e-6)
+
+
+def test_region_color_correction_blends_by_the_mask():
+    image = np.full((4, 8, 4), 0.5, dtype=np.float32)
+    image[..., 3] = 1.0
+    cc = ColorCorrection(
+        nodes=[Grade(multiply=(2.0, 2.0, 2.0))],
+        region=Region(falloff=4, shapes=[rectangle(0.0, 0.0, 0.5, 1.0)]))
+    original = image.copy()
+    masks = {}
+    corrected = apply_color_corrections(image, [cc], masks)
+    expected_row = 0.5 + 0.5 * np.array(
+        [1, 1, 1, EDGE_INSIDE, EDGE_OUTSIDE, 0, 0, 0])
+    for channel in range(3):
+        np.testing.assert_allclose(
+            corrected[..., channel], [expected_row] * 4, atol=1e-6)
+    np.testing.assert_array_equal(corrected[..., 3], 1.0)
+    np.testing.assert_array_equal(image, original)
+    assert len(masks) == 1
+
+
+def test_color_corrections_are_applied_in_order():
+    image = np.full((1, 1, 3), 0.5, dtype=np.float32)
+    ccs = [
+        ColorCorrection(nodes=[ColorTimer(offset=(0.1, 0.1, 0.1))]),
+        ColorCorrection(nodes=[ColorTimer(slope=(2.0, 2.0, 2.0))], mute=True),
+        ColorCorrection(nodes=[
+            Grade(multiply=(2.0, 2.0, 2.0)), ColorTimer(offset=(-0.2, 0.0, 0.0))])]
+    corrected = apply_color_corrections(image, ccs)
+    np.testing.assert_allclose(corrected[0, 0], [1.0, 1.2, 1.2], atol=1e-6)
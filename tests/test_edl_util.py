@@ -0,0 +1,163 @@
+import random
+import pytest
+from rpa.open_rv.rpa_core.api import edl_util
+from rpa.open_rv.rpa_core.api.edl_util import EdlBuilder, build_edl
+from rpa.session_state.frame_map import FrameMap
+
+NUM_SEEDS = 100
+
+
+def expand_edl(edl):
+    # (source, source frame) of each frame of the sequence played by the EDL
+    frames, sources, ins, outs = edl
+    assert (sources[-1], ins[-1], outs[-1]) == (0, 0, 0)
+    expanded = []
+    for index in range(len(frames) - 1):
+        length = frames[index + 1] - frames[index]
+        assert length > 0
+        step = 0 if ins[index] == outs[index] else 1
+        assert outs[index] - ins[index] == (length - 1) * step
+        expanded.extend(
+            (sources[index], ins[index] + offset * step) \
+            for offset in range(length))
+    return expanded
+
+
+def expand_frame_maps(frame_maps):
+    return [
+        (source, frame) for source, frame_map in enumerate(frame_maps) \
+        for frame in frame_map.values()]
+
+
+def key_in_out_frame_map(start, end, key_in, key_out):
+    # What Clip.get_key_in_out_local_frame_map gives, as source frames
+    mid_start = max(start, key_in)
+    mid_end = min(end, key_out)
+    return FrameMap([
+        (start, start - key_in, 0),
+        (mid_start, mid_end - mid_start + 1, 1),
+        (end, key_out - end, 0)]).shifted(1 - start)
+
+
+def test_edl_of_consecutive_frames():
+    edl = build_edl([FrameMap.from_range(1, 10), FrameMap.from_range(1, 5)])
+    assert edl == ([1, 11, 16], [0, 1, 0], [1, 1, 0], [10, 5, 0])
+
+
+def test_edl_of_held_frames():
+    # Frame 3 is held for 4 more frames
+    frame_map = FrameMap.from_range(1, 6).hold(3, 4)
+    edl = build_edl([frame_map])
+    assert edl == ([1, 4, 8, 11], [0, 0, 0, 0], [1, 3, 4, 0], [3, 3, 6, 0])
+    assert expand_edl(edl) == expand_frame_maps([frame_map])
+
+
+def test_edl_of_dropped_frames():
+    frame_map = FrameMap.from_range(1, 10).drop(4, 3)
+    edl = build_edl([frame_map, FrameMap.from_range(1, 2)])
+    assert edl == ([1, 4, 8, 10], [0, 0, 1, 0], [1, 7, 1, 0], [3, 10, 2, 0])
+    assert expand_edl(edl) == expand_frame_maps([frame_map, FrameMap.from_range(1, 2)])
+
+
+def test_edl_of_key_in_out_outside_of_the_media():
+    # 3 frames before and 2 frames after the media hold its first and last
+    # frames, the first frame being played 4 times in a row
+    frame_map = key_in_out_frame_map(1001, 1010, 998, 1012)
+    edl = build_edl([frame_map])
+    assert edl == ([1, 5, 14, 16], [0, 0, 0, 0], [1, 2, 10, 0], [1, 10, 10, 0])
+    assert len(expand_edl(edl)) == 15
+
+
+def test_edl_of_key_in_out_inside_of_the_media():
+    frame_map = key_in_out_frame_map(1001, 1010, 1003, 1008)
+    edl = build_edl([frame_map, FrameMap.from_range(1, 4)])
+    assert edl == ([1, 7, 11], [0, 1, 0], [3, 1, 0], [8, 4, 0])
+
+
+def test_edl_of_clips_without_frames():
+    assert build_edl([]) == ([1], [0], [0], [0])
+    edl = build_edl([FrameMap(), FrameMap.from_range(1, 3)])
+    assert edl == ([1, 4], [1, 0], [1, 0], [3, 0])
+
+
+def random_frame_map(rnd):
+    frame_map = FrameMap.from_range(rnd.randrange(1, 5), rnd.randrange(5, 30))
+    for _ in range(rnd.randrange(4)):
+        if not frame_map: break
+        local_frame = rnd.randrange(1, len(frame_map) + 1)
+        if rnd.random() < 0.5:
+            frame_map = frame_map.hold(local_frame, rnd.randrange(1, 6))
+        else:
+            frame_map = frame_map.drop(local_frame, rnd.randrange(1, 6))
+    return frame_map
+
+
+@pytest.mark.parametrize("seed", range(NUM_SEEDS))
+def test_edl_plays_the_frames_of_the_clips(seed):
+    rnd = random.Random(seed)
+    frame_maps = [random_frame_map(rnd) for _ in range(rnd.randrange(1, 6))]
+    edl = build_edl(frame_maps)
+    assert expand_edl(edl) == expand_frame_maps(frame_maps)
+    assert edl[0][-1] == sum(len(frame_map) for frame_map in frame_maps) + 1
+
+
+@pytest.fixture
+def num_builds(monkeypatch):
+    builds = []
+    def counted_build_edl(frame_maps):
+        builds.append(frame_maps)
+        return build_edl(frame_maps)
+    monkeypatch.setattr(edl_util, "build_edl", counted_build_edl)
+    return lambda: len(builds)
+
+
+def test_edl_is_rebuilt_only_when_a_frame_map_is_replaced(num_builds):
+    builder = EdlBuilder()
+    clips = [("a", FrameMap.from_range(1, 10)), ("b", FrameMap.from_range(1, 5))]
+    edl = builder.build(clips)
+    assert builder.build(list(clips)) == edl
+    assert num_builds() == 1
+
+    # Editing the frames of a clip gives it a new frame map, even when its
+    # frames are the same
+    clips[1] = ("b", clips[1][1].hold(5, 2))
+    held_edl = builder.build(clips)
+    assert num_builds() == 2
+    assert held_edl == build_edl([frame_map for _, frame_map in clips])
+    clips[1] = ("b", FrameMap.from_range(1, 5))
+    assert builder.build(clips) == edl
+    assert num_builds() == 3
+
+
+def test_edl_of_another_sequence_is_built(num_builds):
+    builder = EdlBuilder()
+    frame_map = FrameMap.from_range(1, 10)
+    builder.build([("a", frame_map), ("b", frame_map)])
+    builder.build([("b", frame_map), ("a", frame_map)])
+    builder.build([("a", frame_map), ("b", frame_map)])
+    assert num_builds() == 2
+
+
+def test_least_recently_built_edls_are_evicted(num_builds):
+    builder = EdlBuilder()
+    frame_map = FrameMap.from_range(1, 10)
+    max_edls = EdlBuilder.MAX_CACHED_EDLS
+    for index in range(max_edls):
+        builder.build([(str(index), frame_map)])
+    # Building the EDL of clip 0 again makes clip 1 the least recent one
+    builder.build([("0", frame_map)])
+    builder.build([("new", frame_map)])
+    assert num_builds() == max_edls + 1
+
+    builder.build([("0", frame_map)])
+    assert num_builds() == max_edls + 1
+    builder.build([("1", frame_map)])
+    assert num_builds() == max_edls + 2
+
+
+def test_cached_edl_is_not_changed_by_its_users():
+    builder = EdlBuilder()
+    clips = [("a", FrameMap.from_range(1, 10))]
+    frames, _, _, _ = builder.build(clips)
+    frames.append(100)
+    assert builder.build(clips) == ([1, 11], [0, 0], [1, 0], [10, 0])
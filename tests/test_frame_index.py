@@ -0,0 +1,150 @@
+import random
+import pytest
+from rpa.session_state.annotations import \
+    Annotation, Annotations, Stroke, Text
+from rpa.session_state.color_corrections import \
+    ColorCorrection, ColorCorrections, ColorTimer, Grade
+from rpa.session_state.utils import Point
+
+# Random sequences of edits are applied to the stores, and after every edit
+# their indexed frames are checked against a full scan of their content
+
+NUM_SEEDS = 200
+NUM_STEPS = 60
+
+
+def scan_cc_frames(ccs, is_ro):
+    frames = set()
+    for frame, cc_ids in ccs.frame_ccs.items():
+        for cc_id in cc_ids:
+            cc = ccs.id_to_cc.get(cc_id)
+            if cc and bool(cc.is_ro) == is_ro and cc.is_modified:
+                frames.add(frame)
+    return frames
+
+
+def check_cc_index(ccs):
+    rw_frames = ccs.get_rw_frames()
+    ro_frames = ccs.get_ro_frames()
+    assert set(rw_frames) == scan_cc_frames(ccs, is_ro=False)
+    assert set(ro_frames) == scan_cc_frames(ccs, is_ro=True)
+    assert len(rw_frames) == len(set(rw_frames))
+    assert len(ro_frames) == len(set(ro_frames))
+    for frame, cc_ids in ccs.frame_ccs.items():
+        for cc_id in cc_ids:
+            assert ccs.get_frame_of_cc(cc_id) == frame
+    for cc_id in ccs.clip_ccs:
+        assert ccs.get_frame_of_cc(cc_id) is None
+
+
+def edit_ccs(ccs, rnd, name):
+    cc_ids = list(ccs.id_to_cc)
+    frame_cc_ids = [
+        cc_id for frame_cc_ids in ccs.frame_ccs.values() \
+        for cc_id in frame_cc_ids]
+    cc_id = rnd.choice(cc_ids) if cc_ids else None
+    cc = ccs.id_to_cc.get(cc_id)
+    edit = rnd.randrange(14)
+    if edit == 0:
+        ccs.append_ccs(["cc"], frame=rnd.choice([None, 1, 2, 3, 4]))
+    elif edit == 1 and cc:
+        ccs.append_nodes(cc_id, [rnd.choice(
+            [ColorTimer(), Grade(), ColorTimer(slope=(2, 1, 1))])])
+    elif edit == 2 and cc and cc.nodes:
+        ccs.set_node_properties(cc_id, 0, rnd.choice([
+            {"slope": [1, 1, 1], "blackpoint": [0, 0, 0], "saturation": 1},
+            {"saturation": 0.5},
+            {"blackpoint": [0.1, 0, 0]}]))
+    elif edit == 3 and cc:
+        ccs.create_region(cc_id)
+    elif edit == 4 and cc and cc.region:
+        ccs.set_region_falloff(cc_id, rnd.choice([0, 5]))
+    elif edit == 5 and cc:
+        ccs.set_read_only(cc_id, rnd.random() < 0.5)
+    elif edit == 6 and frame_cc_ids:
+        cc_id = rnd.choice(frame_cc_ids)
+        ccs.delete_ccs([cc_id], ccs.get_frame_of_cc(cc_id))
+    elif edit == 7 and cc:
+        ccs.clear_nodes(cc_id)
+    elif edit == 8 and cc:
+        ccs.delete_node(cc_id, 0)
+    elif edit == 9 and cc:
+        ccs.delete_region(cc_id)
+    elif edit == 10:
+        ccs.delete_ro_ccs()
+    elif edit == 11:
+        ccs.delete_rw_ccs()
+    elif edit == 12:
+        new_ccs = [
+            (rnd.choice([None, 2, 5]),
+             ColorCorrection(
+                id=f"{name}_{index}",
+                nodes=[ColorTimer(saturation=rnd.choice([1, 2]))])) \
+            for index in range(2)]
+        if rnd.random() < 0.5: ccs.set_ro_ccs(new_ccs)
+        else: ccs.set_rw_ccs(new_ccs)
+    elif edit == 13:
+        ccs = ColorCorrections().__setstate__(ccs.__getstate__())
+    return ccs
+
+
+@pytest.mark.parametrize("seed", range(NUM_SEEDS))
+def test_color_corrections_frame_index(seed):
+    rnd = random.Random(seed)
+    ccs = ColorCorrections()
+    for step in range(NUM_STEPS):
+        ccs = edit_ccs(ccs, rnd, f"{seed}_{step}")
+        check_cc_index(ccs)
+
+
+def check_annotations_index(annotations):
+    rw_frames = annotations.get_rw_frames()
+    ro_note_frames = annotations.get_ro_note_frames()
+    assert set(rw_frames) == {
+        frame for frame, annotation in annotations.rw_annos.items() \
+        if annotation.annotations}
+    assert set(ro_note_frames) == {
+        frame for frame, annos in annotations.ro_annos.items() \
+        if any(anno.is_note for anno in annos)}
+    assert len(rw_frames) == len(set(rw_frames))
+    assert len(ro_note_frames) == len(set(ro_note_frames))
+
+
+def edit_annotations(annotations, rnd):
+    frame = rnd.randrange(5)
+    edit = rnd.randrange(11)
+    if edit == 0:
+        annotations.append_strokes(frame, [Stroke()])
+    elif edit == 1:
+        annotations.append_texts(frame, [Text(text="text")])
+    elif edit == 2:
+        annotations.set_text(
+            frame, Text(text="edit", position=Point(rnd.randrange(2), 0)))
+    elif edit == 3:
+        annotations.set_rw_annotation(
+            frame, Annotation(rnd.choice([[], [Stroke()]])))
+    elif edit == 4:
+        annotations.delete_rw(frame)
+    elif edit == 5:
+        annotations.clear(frame)
+    elif edit == 6:
+        annotations.undo(frame)
+    elif edit == 7:
+        annotations.redo(frame)
+    elif edit == 8:
+        annotations.set_ro_annotations(
+            frame, [Annotation(is_note=rnd.random() < 0.5)])
+    elif edit == 9:
+        annotations.delete_ro()
+    elif edit == 10:
+        annotations = Annotations().__setstate__(annotations.__getstate__())
+    return annotations
+
+
+@pytest.mark.parametrize("seed", range(NUM_SEEDS))
+def test_annotations_frame_index(seed):
+    rnd = random.Random(seed)
+    annotations = Annotations()
+    for _ in range(NUM_STEPS):
+        annotations = edit_annotations(annotations, rnd)
+        check_annotations_index(annotations)
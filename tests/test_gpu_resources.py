@@ -0,0 +1,94 @@
+import pytest
+from rpa.open_rv.rpa_core.api.gpu_resources import GpuResourcePool
+
+
+@pytest.fixture
+def pool(gl):
+    return GpuResourcePool(gl)
+
+
+def render_frame(pool, mask_keys, data, width=64, height=32):
+    # What the color api core does for every frame it renders
+    for key in mask_keys:
+        _, is_new = pool.get_mask(key, width, height, mask_keys)
+        if is_new: pool.get_render_targets(width, height)
+    pool.upload_ssbo(data, 3)
+
+
+def test_static_frames_do_not_create_or_delete_resources(gl, pool):
+    render_frame(pool, ["a", "b"], b"\x01" * 16)
+    num_calls = len(gl.get_gen_delete_calls())
+    for _ in range(100):
+        render_frame(pool, ["a", "b"], b"\x01" * 16)
+    assert len(gl.get_gen_delete_calls()) == num_calls
+    assert pool.num_masks == 2
+
+
+def test_render_targets_are_recreated_when_the_resolution_changes(gl, pool):
+    targets = pool.get_render_targets(64, 32)
+    assert pool.get_render_targets(64, 32) == targets
+    new_targets = pool.get_render_targets(128, 64)
+    assert new_targets != targets
+    assert len(gl.framebuffers) == 1
+    assert len(gl.textures) == 2
+
+
+def test_least_recently_used_masks_are_evicted(gl, pool):
+    max_masks = GpuResourcePool.MAX_CACHED_MASKS
+    textures = {key: pool.get_mask(key, 8, 8)[0] for key in range(max_masks)}
+    # Using mask 0 again makes mask 1 the least recently used one
+    assert pool.get_mask(0, 8, 8) == (textures[0], False)
+
+    pool.get_mask("new", 8, 8)
+    assert pool.num_masks == max_masks
+    assert textures[1] not in gl.textures
+    assert textures[0] in gl.textures
+    assert pool.get_mask(1, 8, 8)[1]
+
+
+def test_masks_in_use_are_not_evicted(gl, pool):
+    max_masks = GpuResourcePool.MAX_CACHED_MASKS
+    textures = {key: pool.get_mask(key, 8, 8)[0] for key in range(max_masks)}
+
+    # Masks 0 to 2 are the least recently used ones but are used by the
+    # frame being rendered, so mask 3 is evicted instead
+    pool.get_mask("new", 8, 8, in_use=[0, 1, 2, "new"])
+    assert all(textures[key] in gl.textures for key in (0, 1, 2))
+    assert textures[3] not in gl.textures
+
+    # The cache grows over its size when all its masks are in use
+    in_use = list(range(max_masks)) + ["new", "other"]
+    pool.get_mask("other", 8, 8, in_use=in_use)
+    assert pool.num_masks == max_masks + 1
+
+
+def test_ssbo_is_uploaded_only_when_its_data_changes(gl, pool):
+    assert pool.upload_ssbo(b"\x01" * 16, 3)
+    assert not pool.upload_ssbo(b"\x01" * 16, 3)
+    assert gl.calls.count("glBufferData") == 1
+
+    # Data of the same size is uploaded in place
+    assert pool.upload_ssbo(b"\x02" * 16, 3)
+    assert gl.calls.count("glBufferSubData") == 1
+    assert gl.calls.count("glBufferData") == 1
+
+    # Data of another size needs a new buffer store
+    assert pool.upload_ssbo(b"\x02" * 32, 3)
+    assert gl.calls.count("glBufferData") == 2
+    assert gl.calls.count("glGenBuffers") == 1
+
+
+def test_release_deletes_all_resources(gl, pool):
+    render_frame(pool, ["a", "b", "c"], b"\x01" * 16)
+    assert gl.textures and gl.framebuffers and gl.buffers
+
+    pool.release()
+    assert not gl.textures
+    assert not gl.framebuffers
+    assert not gl.buffers
+    assert pool.num_masks == 0
+
+    # The pool can be used again after it is released
+    render_frame(pool, ["a"], b"\x01" * 16)
+    assert pool.num_masks == 1
+    assert pool.upload_ssbo(b"\x02" * 16, 3)
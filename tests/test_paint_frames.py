@@ -0,0 +1,197 @@
+import random
+import pytest
+from rpa.open_rv.rpa_core.api.paint_frames import PaintComponent, PaintFrames
+from rpa.session_state.annotations import Stroke, Text
+from rpa.session_state.utils import Color, Point
+
+WIDTH = 1920
+HEIGHT = 1080
+PAINT_NODE = "sourceGroup000000_paint"
+
+NUM_SEEDS = 100
+NUM_STEPS = 40
+
+
+class FakePropStore:
+    """
+    Stands in for prop_util, keeping the properties of the paint nodes in
+    a dict and counting the properties written and deleted.
+    """
+    def __init__(self):
+        self.props = {f"{PAINT_NODE}.paint.nextId": [0]}
+        self.num_writes = 0
+        self.num_deletes = 0
+
+    def get_property(self, prop):
+        return list(self.props.get(prop, []))
+
+    def set_property(self, prop, values):
+        if not values:
+            self.delete_property(prop)
+            return
+        self.props[prop] = list(values)
+        self.num_writes += 1
+
+    def delete_property(self, prop):
+        if self.props.pop(prop, None) is not None:
+            self.num_deletes += 1
+
+    def reset_counts(self):
+        self.num_writes = 0
+        self.num_deletes = 0
+
+
+@pytest.fixture
+def store():
+    return FakePropStore()
+
+
+@pytest.fixture
+def paint_frames(store):
+    return PaintFrames(store)
+
+
+def stroke(x, y, color=(1.0, 0.0, 0.0, 1.0), width=2.0):
+    return Stroke(
+        width=width, color=Color(*color),
+        points=[Point(x, y), Point(x + 0.1, y + 0.1), Point(x + 0.2, y)])
+
+
+def text(value, x=0.5, y=0.5):
+    return Text(text=value, position=Point(x, y))
+
+
+def components(annotations, creator="artist"):
+    return [
+        PaintComponent.from_stroke(annotation, creator, WIDTH, HEIGHT) \
+        if isinstance(annotation, Stroke) else \
+        PaintComponent.from_text(annotation, creator, WIDTH, HEIGHT) \
+        for annotation in annotations]
+
+
+def check_frame(store, frame, frame_components):
+    # The store holds the given components and nothing else for the frame
+    names = store.get_property(f"{PAINT_NODE}.frame:{frame}.order")
+    assert len(names) == len(frame_components)
+    assert len(set(names)) == len(names)
+    for name, component in zip(names, frame_components):
+        kind, _, name_frame, creator = name.split(":")
+        assert (kind, int(name_frame), creator) == \
+            (component.kind, frame, component.creator)
+        for suffix, values in component.props:
+            assert store.props[f"{PAINT_NODE}.{name}.{suffix}"] == values
+    frame_props = {
+        prop for prop in store.props \
+        if prop.split(".")[1].split(":")[2:3] == [str(frame)]}
+    assert frame_props == {
+        f"{PAINT_NODE}.{name}.{suffix}" \
+        for name, component in zip(names, frame_components) \
+        for suffix, _ in component.props}
+
+
+def test_unchanged_redraw_writes_nothing(store, paint_frames):
+    annotations = [stroke(0.1, 0.1), text("note"), stroke(0.5, 0.5)]
+    paint_frames.write(PAINT_NODE, 1, components(annotations))
+    store.reset_counts()
+
+    # Components are made again from the annotations on every redraw
+    paint_frames.write(PAINT_NODE, 1, components(annotations))
+    assert store.num_writes == 0
+    assert store.num_deletes == 0
+
+
+def test_moved_stroke_writes_its_points_only(store, paint_frames):
+    annotations = [stroke(0.1, 0.1), stroke(0.3, 0.3), stroke(0.5, 0.5)]
+    names = paint_frames.write(PAINT_NODE, 1, components(annotations))
+    store.reset_counts()
+
+    annotations[1] = stroke(0.4, 0.3)
+    assert paint_frames.write(PAINT_NODE, 1, components(annotations)) == names
+    assert store.num_writes == 1
+    assert store.num_deletes == 0
+
+    annotations[0] = stroke(0.2, 0.1)
+    annotations[2] = stroke(0.6, 0.5)
+    store.reset_counts()
+    paint_frames.write(PAINT_NODE, 1, components(annotations))
+    assert store.num_writes == 2
+    check_frame(store, 1, components(annotations))
+
+
+def test_reordered_strokes_only_write_the_order(store, paint_frames):
+    annotations = [stroke(0.1, 0.1), stroke(0.3, 0.3)]
+    names = paint_frames.write(PAINT_NODE, 1, components(annotations))
+    store.reset_counts()
+
+    new_names = paint_frames.write(
+        PAINT_NODE, 1, components(annotations[::-1]))
+    assert new_names == names[::-1]
+    assert store.num_writes == 1
+    assert store.num_deletes == 0
+
+
+def test_frame_is_cleared_when_the_paint_node_was_recreated(store, paint_frames):
+    annotations = [stroke(0.1, 0.1)]
+    paint_frames.write(PAINT_NODE, 1, components(annotations))
+    # The paint node is deleted and created again without components
+    store.props = {f"{PAINT_NODE}.paint.nextId": [0]}
+
+    paint_frames.write(PAINT_NODE, 1, components(annotations))
+    check_frame(store, 1, components(annotations))
+
+
+def edit_annotations(annotations, rnd):
+    edit = rnd.randrange(7)
+    index = rnd.randrange(len(annotations)) if annotations else None
+    if edit == 0 or index is None:
+        annotations.insert(
+            rnd.randrange(len(annotations) + 1),
+            stroke(rnd.random(), rnd.random()))
+    elif edit == 1:
+        annotations.append(text(rnd.choice(["a", "b"]), rnd.random()))
+    elif edit == 2:
+        del annotations[index]
+    elif edit == 3 and isinstance(annotations[index], Stroke):
+        # Moved
+        annotations[index] = stroke(rnd.random(), rnd.random())
+    elif edit == 4 and isinstance(annotations[index], Stroke):
+        annotations[index] = stroke(
+            0.5, 0.5, color=rnd.choice([(0.0, 1.0, 0.0, 1.0), (1.0, 0.0, 0.0, 1.0)]),
+            width=rnd.choice([1.0, 2.0]))
+    elif edit == 5:
+        rnd.shuffle(annotations)
+    elif edit == 6:
+        annotations[:] = annotations[index:] + annotations[:index]
+
+
+@pytest.mark.parametrize("seed", range(NUM_SEEDS))
+def test_random_edits(seed, store, paint_frames):
+    rnd = random.Random(seed)
+    frames = {frame: [] for frame in (1, 2)}
+    for _ in range(NUM_STEPS):
+        frame = rnd.choice(list(frames))
+        annotations = frames[frame]
+        action = rnd.randrange(10)
+        if action == 0:
+            paint_frames.forget(PAINT_NODE, frame)
+        elif action == 1:
+            appended = [stroke(rnd.random(), rnd.random())]
+            paint_frames.append(PAINT_NODE, frame, components(appended))
+            annotations.extend(appended)
+        else:
+            edit_annotations(annotations, rnd)
+            paint_frames.write(PAINT_NODE, frame, components(annotations))
+        # Frames that were forgotten or never written are cleared when they
+        # are written next, so only the others are redrawn
+        known_frames = {
+            frame: annotations for frame, annotations in frames.items() \
+            if paint_frames.get_components(PAINT_NODE, frame) is not None}
+        for frame, annotations in known_frames.items():
+            check_frame(store, frame, components(annotations))
+
+        # Redrawing the frames again writes nothing
+        store.reset_counts()
+        for frame, annotations in known_frames.items():
+            paint_frames.write(PAINT_NODE, frame, components(annotations))
+        assert store.num_writes == 0
+        assert store.num_deletes == 0
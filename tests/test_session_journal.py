@@ -0,0 +1,199 @@
+import gc
+import json
+import uuid
+from functools import partial
+import pytest
+from rpa.session_state.session import Session
+from rpa.session_state import session_journal as J
+from rpa.session_state.session_journal import SessionJournal
+from rpa.session_state.annotations import Stroke, Text
+from rpa.session_state.color_corrections import ColorCorrection, ColorTimer
+from rpa.session_state.utils import Point
+
+
+class Recorder:
+    """
+    Applies records to a live session and journals them, the way the
+    SessionJournalRecorder does with the rpa apis.
+    """
+    def __init__(self, path, **kwargs):
+        self.session = Session()
+        self.journal = SessionJournal(str(path), **kwargs)
+        self.compact()
+
+    def record(self, *record):
+        record = list(record)
+        J.apply_record(self.session, record)
+        # The journal only ever holds json values
+        assert self.journal.append(json.loads(json.dumps(record)))
+
+    def compact(self):
+        self.journal.compact(J.get_session_snapshot(self.session))
+
+    def clear(self):
+        # The session creates a new empty playlist when it is cleared, whose
+        # id can not be replayed, so the recorder compacts the journal
+        self.session.clear()
+        self.compact()
+
+    def close(self):
+        self.journal.flush()
+        self.journal.close()
+
+
+def get_state(session):
+    return json.dumps(J.get_session_snapshot(session), sort_keys=True, default=str)
+
+
+def replay(path):
+    session = Session()
+    num_records = J.replay_journal(str(path), partial(J.apply_record, session))
+    return session, num_records
+
+
+def new_ids(count):
+    return [uuid.uuid4().hex for _ in range(count)]
+
+
+def stroke_state(*points):
+    return Stroke(points=[Point(x, y) for x, y in points]).__getstate__()
+
+
+def cc_state(slope):
+    return ColorCorrection(
+        id=uuid.uuid4().hex, name="cc", nodes=[ColorTimer(slope=slope)]).__getstate__()
+
+
+def create_session(recorder, num_clips=5):
+    playlist_ids = new_ids(2)
+    recorder.record("create_playlists", ["one", "two"], None, playlist_ids)
+    recorder.record("set_fg_playlist", playlist_ids[0])
+    clip_ids = new_ids(num_clips)
+    recorder.record(
+        "create_clips", playlist_ids[0],
+        [f"/media/{index}.mov" for index in range(num_clips)], None, clip_ids)
+    return playlist_ids, clip_ids
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+def test_replay_matches_live_session(journal_path):
+    recorder = Recorder(journal_path)
+    playlist_ids, clip_ids = create_session(recorder)
+    for value in range(1, 4):
+        recorder.record(
+            "set_attr_values", [[playlist_ids[0], clip_ids[0], "key_in", value]])
+    recorder.record(J.APPEND_STROKES, clip_ids[1], 3, [stroke_state((0, 0), (1, 1))])
+    recorder.record(J.APPEND_STROKES, clip_ids[1], 3, [stroke_state((0, 1), (1, 0))])
+    recorder.record(J.APPEND_TEXTS, clip_ids[2], 5, [Text(text="note").__getstate__()])
+    recorder.record(J.SET_RW_CCS, clip_ids[3], [(None, cc_state((1.1, 1.0, 1.0)))])
+    recorder.record(J.SET_RW_CCS, clip_ids[3], [(2, cc_state((0.9, 1.0, 1.0)))])
+    recorder.record("move_clips_by_offset", 2, [clip_ids[0]])
+    recorder.record("move_clips_to_index", 0, [clip_ids[4]])
+    recorder.record("delete_clips_permanently", [clip_ids[2]])
+    recorder.record("set_playlist_name", playlist_ids[1], "renamed")
+    recorder.record("delete_playlists", [playlist_ids[1]])
+    recorder.record("set_custom_session_attr", "reviewed", True)
+    recorder.record("set_custom_playlist_attr", playlist_ids[0], "dept", "comp")
+    recorder.record("set_custom_clip_attr", clip_ids[1], "status", "final")
+    recorder.close()
+
+    session, num_records = replay(journal_path)
+    assert num_records == recorder.journal.num_records
+    assert get_state(session) == get_state(recorder.session)
+    assert session.get_custom_session_attr("reviewed") is True
+    assert session.get_custom_playlist_attr(playlist_ids[0], "dept") == "comp"
+    assert session.get_custom_clip_attr(clip_ids[1], "status") == "final"
+    assert session.get_clip(clip_ids[0]).get_attr_value("key_in") == 3
+    annotation = session.get_clip(clip_ids[1]).annotations.get_rw_annotation(3)
+    assert len(annotation.annotations) == 2
+
+
+def test_replay_after_compaction(journal_path):
+    recorder = Recorder(journal_path)
+    playlist_ids, clip_ids = create_session(recorder)
+    recorder.record(J.APPEND_STROKES, clip_ids[0], 1, [stroke_state((0, 0), (1, 1))])
+    recorder.record("set_custom_playlist_attr", playlist_ids[1], "dept", "anim")
+    recorder.compact()
+    recorder.record("set_bg_playlist", playlist_ids[1])
+    recorder.record(J.APPEND_STROKES, clip_ids[0], 1, [stroke_state((1, 0), (0, 1))])
+    recorder.close()
+
+    session, num_records = replay(journal_path)
+    assert num_records == 3
+    assert get_state(session) == get_state(recorder.session)
+    assert session.get_custom_playlist_attr(playlist_ids[1], "dept") == "anim"
+
+
+def test_replay_after_clear(journal_path):
+    recorder = Recorder(journal_path)
+    create_session(recorder)
+    recorder.record("set_custom_session_attr", "reviewed", True)
+    recorder.clear()
+    # Edits of the playlist the session created when it was cleared
+    playlist_id = recorder.session.get_playlist_ids()[0]
+    clip_ids = new_ids(2)
+    recorder.record("create_clips", playlist_id, ["/media/a.mov", "/media/b.mov"], None, clip_ids)
+    recorder.record("set_attr_values", [[playlist_id, clip_ids[1], "key_in", 7]])
+    recorder.close()
+
+    session, _ = replay(journal_path)
+    assert get_state(session) == get_state(recorder.session)
+    assert session.get_playlist_ids() == [playlist_id]
+    assert session.get_playlist(playlist_id).clip_ids == clip_ids
+    assert session.get_custom_session_attr("reviewed") is None
+
+
+def test_replay_ignores_torn_last_record(journal_path):
+    recorder = Recorder(journal_path)
+    playlist_ids, _ = create_session(recorder)
+    recorder.record("set_bg_playlist", playlist_ids[1])
+    recorder.close()
+    with open(journal_path, "a") as file:
+        file.write('["set_fg_playlist", "' + playlist_ids[1][:8])
+
+    session, num_records = replay(journal_path)
+    assert num_records == recorder.journal.num_records
+    assert get_state(session) == get_state(recorder.session)
+    assert session.viewport.fg == playlist_ids[0]
+
+
+def test_replay_restores_the_garbage_collector(journal_path):
+    recorder = Recorder(journal_path)
+    create_session(recorder)
+    recorder.close()
+
+    replay(journal_path)
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+
+    # Objects frozen by the application stay frozen
+    gc.freeze()
+    try:
+        num_frozen = gc.get_freeze_count()
+        replay(journal_path)
+        assert gc.get_freeze_count() == num_frozen
+    finally:
+        gc.unfreeze()
+
+
+def test_unflushed_records_are_coalesced(journal_path):
+    recorder = Recorder(journal_path)
+    _, clip_ids = create_session(recorder)
+    for slope in (1.1, 1.2, 1.3):
+        recorder.record(J.SET_RW_CCS, clip_ids[0], [(None, cc_state((slope, 1.0, 1.0)))])
+    # The three records of the same clip take a single line
+    assert recorder.journal.num_records == 5
+    recorder.close()
+
+    session, _ = replay(journal_path)
+    assert get_state(session) == get_state(recorder.session)
+
+
+def test_append_rejects_records_that_are_not_json(journal_path):
+    journal = SessionJournal(str(journal_path))
+    assert not journal.append(["set_custom_session_attr", "attr", object()])
+    assert journal.num_records == 0
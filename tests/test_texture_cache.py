@@ -0,0 +1,103 @@
+import pytest
+from rpa.open_rv.rpa_core.api.texture_cache import TextureCache
+
+TEXTURE_BYTES = 100
+
+
+@pytest.fixture
+def cache(gl):
+    return TextureCache(gl, max_bytes=3 * TEXTURE_BYTES)
+
+
+def add_texture(gl, cache, key, num_bytes=TEXTURE_BYTES):
+    # What the viewport api core does when an overlay is not cached
+    assert cache.acquire(key) is None
+    return cache.add(key, gl.glGenTextures(1), num_bytes)
+
+
+def test_acquire_hits_and_misses(gl, cache):
+    assert cache.acquire("a") is None
+    texture = cache.add("a", gl.glGenTextures(1), TEXTURE_BYTES)
+    assert cache.acquire("a") == texture
+    assert cache.stats == {
+        "hits": 1, "misses": 1, "evictions": 0, "textures": 1,
+        "bytes": TEXTURE_BYTES}
+
+
+def test_released_textures_are_evicted_least_recently_used_first(gl, cache):
+    textures = {key: add_texture(gl, cache, key) for key in "abc"}
+    for key in "abc": cache.release(key)
+    # Using a again makes b the least recently used texture
+    assert cache.acquire("a") == textures["a"]
+    cache.release("a")
+
+    add_texture(gl, cache, "d")
+    assert textures["b"] not in gl.textures
+    assert textures["a"] in gl.textures and textures["c"] in gl.textures
+    assert cache.acquire("b") is None
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["bytes"] == 3 * TEXTURE_BYTES
+
+
+def test_acquired_textures_are_not_evicted(gl, cache):
+    textures = {key: add_texture(gl, cache, key) for key in "abc"}
+    cache.release("c")
+
+    # The cache grows over its size when all its other textures are acquired
+    add_texture(gl, cache, "d")
+    add_texture(gl, cache, "e")
+    assert textures["c"] not in gl.textures
+    assert cache.stats["textures"] == 4
+    assert all(textures[key] in gl.textures for key in "ab")
+
+    # Released textures are evicted down to the size of the cache
+    cache.release("a")
+    assert textures["a"] not in gl.textures
+    assert cache.stats["bytes"] == 3 * TEXTURE_BYTES
+
+
+def test_texture_added_twice_is_not_leaked(gl, cache):
+    texture = add_texture(gl, cache, "a")
+    # Another overlay rendered the same key in the meantime
+    duplicate = gl.glGenTextures(1)
+    assert cache.add("a", duplicate, TEXTURE_BYTES) == texture
+    assert duplicate not in gl.textures
+    assert cache.stats["textures"] == 1
+
+    # The texture is acquired twice, so it needs to be released twice
+    cache.release("a")
+    add_texture(gl, cache, "b")
+    add_texture(gl, cache, "c")
+    add_texture(gl, cache, "d")
+    assert texture in gl.textures
+    cache.release("a")
+    assert texture not in gl.textures
+
+
+def test_replace_deletes_the_replaced_texture(gl, cache):
+    assert cache.replace("a", gl.glGenTextures(1), TEXTURE_BYTES) is None
+    texture = add_texture(gl, cache, "a")
+    new_texture = gl.glGenTextures(1)
+    assert cache.replace("a", new_texture, 2 * TEXTURE_BYTES) == new_texture
+    assert texture not in gl.textures
+    assert cache.acquire("a") == new_texture
+    assert cache.stats["bytes"] == 2 * TEXTURE_BYTES
+
+    # Growing a texture evicts the released ones
+    other_texture = add_texture(gl, cache, "b")
+    cache.release("b")
+    cache.replace("a", new_texture, 3 * TEXTURE_BYTES)
+    assert other_texture not in gl.textures
+    assert new_texture in gl.textures
+
+
+def test_clear_deletes_all_textures(gl, cache):
+    for key in "abc": add_texture(gl, cache, key)
+    cache.release("a")
+    cache.clear()
+    assert not gl.textures
+    assert cache.stats["textures"] == 0
+    assert cache.stats["bytes"] == 0
+    # Releasing a texture that was cleared does nothing
+    cache.release("b")
+    assert gl.get_gen_delete_calls().count("glDeleteTextures") == 1